@@ -0,0 +1,1883 @@
+from dataclasses import dataclass, field
+from typing import Literal, Optional, Sequence
+import numpy as np
+from compact_profile import CompactProfile, CompactProfileBatch
+
+Tiebreak = Literal["first_place", "borda"]
+
+
+@dataclass(frozen=True)
+class ArrayElection:
+    """
+    The outcome of an election run by one of the array engines. Exposes the part of votekit's
+    ``Election`` interface that the metrics use, in the same tuple-of-frozensets format.
+
+    Attributes:
+        ranking (tuple[frozenset[str], ...]): The final ranking, with ties as sets.
+        elected (tuple[frozenset[str], ...]): The elected candidates in order of election.
+        scores (dict[str, float]): The first round scores of the candidates cast.
+    """
+
+    ranking: tuple[frozenset[str], ...]
+    elected: tuple[frozenset[str], ...]
+    scores: dict[str, float] = field(default_factory=dict)
+
+    def get_ranking(self) -> tuple[frozenset[str], ...]:
+        return self.ranking
+
+    def get_elected(self) -> tuple[frozenset[str], ...]:
+        return self.elected
+
+
+def _require_strict(profile: CompactProfile) -> None:
+    if profile.has_ties:
+        raise ValueError("The array election engines require ballots without ties.")
+
+
+def _padded_score_vector(
+    score_vector: Optional[Sequence[float]], max_ranking_length: int
+) -> np.ndarray:
+    """
+    Pads (or truncates) a score vector to one entry per ranking position. ``None`` stands for
+    the conventional Borda vector (n, n-1, ..., 1) with n the maximum ranking length.
+    """
+    if score_vector is None:
+        score_vector = range(max_ranking_length, 0, -1)
+
+    padded = np.zeros(max_ranking_length, dtype=np.float64)
+    values = np.asarray(list(score_vector), dtype=np.float64)[:max_ranking_length]
+    padded[: len(values)] = values
+    return padded
+
+
+def score_vector_matrix(
+    score_vectors: Sequence[Optional[Sequence[float]]], max_ranking_length: int
+) -> np.ndarray:
+    """
+    Stacks a family of score vectors into one matrix, each padded to one entry per ranking
+    position as in ``_padded_score_vector``.
+
+    Args:
+        score_vectors (Sequence[Optional[Sequence[float]]]): The score vectors. None is the
+            conventional Borda vector.
+        max_ranking_length (int): The maximum ranking length of the profile.
+
+    Returns:
+        np.ndarray: Array of shape (n_vectors, max_ranking_length).
+    """
+    matrix = np.zeros((len(score_vectors), max_ranking_length))
+    for i, score_vector in enumerate(score_vectors):
+        matrix[i] = _padded_score_vector(score_vector, max_ranking_length)
+    return matrix
+
+
+def position_counts(profile: CompactProfile) -> np.ndarray:
+    """
+    The weight of the ballots ranking each candidate at each position, from which any
+    positional score is one matrix product.
+
+    Args:
+        profile (CompactProfile): Profile to count. Must not contain tied rankings.
+
+    Returns:
+        np.ndarray: Array of shape (n_candidates, max_ranking_length) whose (c, p) entry is
+            the weight of the ballots ranking c at position p.
+    """
+    _require_strict(profile)
+    n_positions = profile.max_ranking_length
+    # Unranked entries fall in an extra column that is dropped.
+    cols = np.broadcast_to(np.arange(profile.n_candidates), profile.ranks.shape)
+    flat = cols * (n_positions + 1) + np.minimum(profile.ranks, n_positions)
+    counts = np.bincount(
+        flat.ravel(),
+        weights=np.broadcast_to(profile.weights[:, None], profile.ranks.shape).ravel(),
+        minlength=profile.n_candidates * (n_positions + 1),
+    )
+    return counts.reshape(profile.n_candidates, n_positions + 1)[:, :n_positions]
+
+
+def positional_scores(
+    profile: CompactProfile, score_vector: Optional[Sequence[float]]
+) -> np.ndarray:
+    """
+    Scores every candidate with a positional score vector using one weighted bincount.
+    Contributions are summed in ballot order, as votekit's ``score_profile_from_rankings``
+    does. Integer points and weights give exactly votekit's scores. Fractional ones can
+    differ from them in the last bits when identical ballots have been grouped.
+
+    Args:
+        profile (CompactProfile): Profile to score. Must not contain tied rankings.
+        score_vector (Optional[Sequence[float]]): Points awarded to each position, padded with
+            zeros. None is the conventional Borda vector.
+
+    Returns:
+        np.ndarray: Array of shape (n_candidates,) with the scores.
+    """
+    _require_strict(profile)
+    sv = _padded_score_vector(score_vector, profile.max_ranking_length)
+
+    # Unranked entries index the zero padding. Adding their zero contributions leaves every
+    # partial sum unchanged.
+    points = np.zeros(profile.unranked + 1)
+    points[: len(sv)] = sv
+    contributions = points[profile.ranks] * profile.weights[:, None]
+    cols = np.broadcast_to(np.arange(profile.n_candidates), profile.ranks.shape)
+    return np.bincount(
+        cols.ravel(), weights=contributions.ravel(), minlength=profile.n_candidates
+    )
+
+
+def _cast_mask(profile: CompactProfile) -> np.ndarray:
+    return ((profile.ranks != profile.unranked) & (profile.weights > 0)[:, None]).any(
+        axis=0
+    )
+
+
+def _score_ranking(
+    candidates: Sequence[str], scores: np.ndarray, eligible: np.ndarray
+) -> list[frozenset[str]]:
+    """
+    Groups the eligible candidates into sets of equal score, from highest to lowest, like
+    votekit's ``score_dict_to_ranking``. Integer scores are summed exactly and compared
+    exactly. Otherwise scores within a relative 1e-9 of the next higher one count as equal,
+    so that ties under fractional points or weights do not depend on the order in which
+    they were summed. Votekit compares its float sums exactly, so it can split such a tie
+    and the two engines then rank the candidates differently.
+    """
+    eligible_idx = np.flatnonzero(eligible)
+    order = eligible_idx[np.argsort(-scores[eligible_idx], kind="stable")]
+    sorted_scores = scores[order]
+    if np.array_equal(sorted_scores, np.round(sorted_scores)):
+        tolerance = 0.0
+    else:
+        tolerance = 1e-9 * (1 + np.abs(sorted_scores).max(initial=0))
+    starts = np.flatnonzero(np.diff(sorted_scores) < -tolerance) + 1
+    return [
+        frozenset(candidates[i] for i in group)
+        for group in np.split(order, starts)
+        if len(group)
+    ]
+
+
+def _break_tie(
+    tied: frozenset[str], candidates: Sequence[str], tiebreak_scores: np.ndarray
+) -> list[frozenset[str]]:
+    """
+    Orders a tied set by descending tiebreak score. Where votekit would fall back to a random
+    order because the tiebreak scores also tie, candidates are ordered lexicographically so
+    that results are reproducible.
+    """
+    index = {c: i for i, c in enumerate(candidates)}
+    return [
+        frozenset({c})
+        for c in sorted(tied, key=lambda c: (-tiebreak_scores[index[c]], c))
+    ]
+
+
+def _elect_from_ranking(
+    ranking: list[frozenset[str]],
+    m: int,
+    candidates: Sequence[str],
+    tiebreak_scores,
+) -> tuple[tuple[frozenset[str], ...], tuple[frozenset[str], ...]]:
+    """
+    Elects the top m candidates of a set ranking, breaking a tie that straddles the last seat
+    like votekit's ``elect_cands_from_set_ranking``. ``tiebreak_scores`` is a zero argument
+    callable so that the tiebreak scores are only computed when a tie needs them.
+
+    Returns:
+        tuple[tuple[frozenset[str], ...], tuple[frozenset[str], ...]]: The elected and the
+            remaining candidates.
+    """
+    if m < 1:
+        raise ValueError("m must be strictly positive")
+    if m > sum(len(s) for s in ranking):
+        raise ValueError("m must be no more than the number of candidates.")
+
+    elected: list[frozenset[str]] = []
+    n_elected = 0
+    for i, c_set in enumerate(ranking):
+        if n_elected + len(c_set) > m:
+            tiebroken = _break_tie(c_set, candidates, tiebreak_scores())
+            n_open = m - n_elected
+            return (
+                tuple(elected + tiebroken[:n_open]),
+                tuple(tiebroken[n_open:] + ranking[i + 1 :]),
+            )
+        elected.append(c_set)
+        n_elected += len(c_set)
+        if n_elected == m:
+            return tuple(elected), tuple(ranking[i + 1 :])
+
+    return tuple(elected), tuple()
+
+
+def tiebreak_score_vector(tiebreak: Tiebreak) -> Optional[list[float]]:
+    """
+    The score vector behind votekit's "first_place" and "borda" tiebreaks.
+    """
+    if tiebreak == "first_place":
+        return [1]
+    elif tiebreak == "borda":
+        return None
+    raise ValueError(f"Tiebreak {tiebreak!r} is not supported by the array engines.")
+
+
+def positional_election(
+    profile: CompactProfile,
+    m: int,
+    score_vector: Optional[Sequence[float]],
+    tiebreak: Tiebreak,
+) -> ArrayElection:
+    """
+    Runs a positional scoring election (Borda, k-approval, plurality, ...) on a compact
+    profile. Produces the same ranking and elected set as votekit's ``Borda`` and
+    ``Plurality`` with the given score vector and tiebreak.
+
+    Args:
+        profile (CompactProfile): Profile to conduct the election on.
+        m (int): Number of seats to elect.
+        score_vector (Optional[Sequence[float]]): Score vector. None is the conventional Borda
+            vector of the profile's maximum ranking length.
+        tiebreak (Tiebreak): Tiebreak used when a tie straddles the last seat.
+
+    Returns:
+        ArrayElection: The outcome of the election.
+    """
+    return positional_elections_for_seats(profile, [m], score_vector, tiebreak)[0]
+
+
+def positional_elections_for_seats(
+    profile: CompactProfile,
+    seat_counts: Sequence[int],
+    score_vector: Optional[Sequence[float]],
+    tiebreak: Tiebreak,
+) -> list[ArrayElection]:
+    """
+    Runs a positional scoring election for several seat counts. The scores and the ranking
+    of score levels do not depend on the number of seats, so they are computed once, and only
+    the tie straddling the last seat is broken for each seat count.
+
+    Args:
+        profile (CompactProfile): Profile to conduct the elections on.
+        seat_counts (Sequence[int]): Number of seats to elect in each election.
+        score_vector (Optional[Sequence[float]]): Score vector. None is the conventional Borda
+            vector of the profile's maximum ranking length.
+        tiebreak (Tiebreak): Tiebreak used when a tie straddles the last seat.
+
+    Returns:
+        list[ArrayElection]: The outcome for each seat count, in the given order.
+    """
+    cast = _cast_mask(profile)
+    if cast.sum() < max(seat_counts, default=0):
+        raise ValueError("Not enough candidates received votes to be elected.")
+
+    scores = positional_scores(profile, score_vector)
+    ranking = _score_ranking(profile.candidates, scores, cast)
+    tiebreak_scores: list[np.ndarray] = []
+
+    def lazy_tiebreak_scores() -> np.ndarray:
+        if not tiebreak_scores:
+            tiebreak_scores.append(
+                positional_scores(profile, tiebreak_score_vector(tiebreak))
+            )
+        return tiebreak_scores[0]
+
+    cast_scores = {
+        c: float(scores[i]) for i, c in enumerate(profile.candidates) if cast[i]
+    }
+    elections = []
+    for m in seat_counts:
+        elected, remaining = _elect_from_ranking(
+            ranking, m, profile.candidates, lazy_tiebreak_scores
+        )
+        elections.append(
+            ArrayElection(
+                ranking=tuple(s for s in elected + remaining if len(s) != 0),
+                elected=elected,
+                scores=dict(cast_scores),
+            )
+        )
+    return elections
+
+
+def _advance_pointers(
+    pointers: np.ndarray,
+    order: np.ndarray,
+    sorted_ranks: np.ndarray,
+    alive: np.ndarray,
+    unranked: int,
+) -> None:
+    """
+    Moves each ballot's current-preference pointer past the candidates that are no longer in
+    the running, stopping at the first live candidate or at the end of the ranking. Updates
+    ``pointers`` in place.
+    """
+    rows = np.arange(len(pointers))
+    while len(rows) > 0:
+        at = pointers[rows]
+        stuck = (sorted_ranks[rows, at] != unranked) & ~alive[order[rows, at]]
+        rows = rows[stuck]
+        pointers[rows] += 1
+
+
+@dataclass(eq=False)
+class _STVState:
+    """
+    The state of an STV count at the start of a round.
+    """
+
+    pointers: np.ndarray
+    weights: np.ndarray
+    # The order in which votekit holds the ballots. Tallies are summed in this order so
+    # that fractional tallies agree with votekit's to the last bit.
+    sequence: np.ndarray
+    alive: np.ndarray
+    elected: list[frozenset[str]]
+    eliminated: list[frozenset[str]]
+    n_elected: int
+
+    def copy(self) -> "_STVState":
+        return _STVState(
+            pointers=self.pointers.copy(),
+            weights=self.weights.copy(),
+            sequence=self.sequence.copy(),
+            alive=self.alive.copy(),
+            elected=list(self.elected),
+            eliminated=list(self.eliminated),
+            n_elected=self.n_elected,
+        )
+
+
+@dataclass(frozen=True, eq=False)
+class _STVBallots:
+    """
+    The ballots of a profile sorted into preference order for an STV count, with one extra
+    unranked column so that an exhausted pointer stays in bounds.
+    """
+
+    profile: CompactProfile
+    order: np.ndarray
+    sorted_ranks: np.ndarray
+
+    @classmethod
+    def from_profile(cls, profile: CompactProfile) -> "_STVBallots":
+        n_ballots = profile.n_ballots
+        order = np.argsort(profile.ranks, axis=1, kind="stable")
+        sorted_ranks = np.take_along_axis(profile.ranks, order, axis=1)
+        return cls(
+            profile=profile,
+            order=np.hstack([order, np.zeros((n_ballots, 1), dtype=order.dtype)]),
+            sorted_ranks=np.hstack(
+                [
+                    sorted_ranks,
+                    np.full((n_ballots, 1), profile.unranked, dtype=sorted_ranks.dtype),
+                ]
+            ),
+        )
+
+    def initial_state(self) -> _STVState:
+        n_ballots = self.profile.n_ballots
+        return _STVState(
+            pointers=np.zeros(n_ballots, dtype=np.int64),
+            weights=self.profile.weights.copy(),
+            sequence=np.arange(n_ballots),
+            alive=np.ones(self.profile.n_candidates, dtype=bool),
+            elected=[],
+            eliminated=[],
+            n_elected=0,
+        )
+
+    def advance(self, state: _STVState) -> None:
+        _advance_pointers(
+            state.pointers,
+            self.order,
+            self.sorted_ranks,
+            state.alive,
+            self.profile.unranked,
+        )
+
+    def tally(self, state: _STVState) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        The votes of each candidate, the candidates still receiving votes, and the current
+        preference of each ballot (-1 once it is exhausted).
+        """
+        profile = self.profile
+        rows = np.arange(profile.n_ballots)
+        active = (state.weights > 0) & (
+            self.sorted_ranks[rows, state.pointers] != profile.unranked
+        )
+        first = np.where(active, self.order[rows, state.pointers], -1)
+        in_play = state.sequence[active[state.sequence]]
+        scores = np.bincount(
+            first[in_play], weights=state.weights[in_play], minlength=profile.n_candidates
+        )
+        cast = state.alive & (profile.ranks[active] != profile.unranked).any(axis=0)
+        return scores, cast, first
+
+
+@dataclass(frozen=True, eq=False)
+class _STVRound:
+    """
+    One recorded round of an STV count: the state it started from, its tallies and the
+    decision taken, as returned by ``_stv_decision``.
+    """
+
+    state: _STVState
+    scores: np.ndarray
+    cast: np.ndarray
+    first: np.ndarray
+    kind: str
+    decided: tuple[frozenset[str], ...]
+
+
+def _stv_decision(
+    scores: np.ndarray,
+    cast: np.ndarray,
+    remaining: list[frozenset[str]],
+    threshold: int,
+    n_open: int,
+    candidates: Sequence[str],
+    tiebreak_scores: np.ndarray,
+) -> tuple[str, list[frozenset[str]]]:
+    """
+    Decides a round of an STV count: "elect" with the sets over the quota, "elect_rest" with
+    every remaining set when they exactly fill the open seats, or "eliminate" with the
+    candidate with the fewest votes.
+    """
+    index = {c: i for i, c in enumerate(candidates)}
+    cast_idx = np.flatnonzero(cast)
+    if (scores[cast_idx] >= threshold).any():
+        over = []
+        for c_set in remaining:
+            if scores[index[next(iter(c_set))]] < threshold:
+                break
+            over.append(c_set)
+        return "elect", over
+
+    if len(cast_idx) == n_open:
+        return "elect_rest", list(remaining)
+
+    lowest = remaining[-1]
+    if len(lowest) > 1:
+        lowest = _break_tie(lowest, candidates, tiebreak_scores)[-1]
+    return "eliminate", [lowest]
+
+
+def _apply_stv_decision(
+    ballots: _STVBallots,
+    state: _STVState,
+    kind: str,
+    decided: list[frozenset[str]],
+    scores: np.ndarray,
+    first: np.ndarray,
+    threshold: int,
+) -> None:
+    """
+    Carries out a decision of ``_stv_decision`` on the state, in place.
+    """
+    profile = ballots.profile
+    if kind == "elect":
+        transferred = []
+        for c_set in decided:
+            # Iterating the set itself visits the candidates in votekit's order.
+            c_idx = profile.candidate_indices(list(c_set))
+            for c in c_idx:
+                transfer_value = (scores[c] - threshold) / scores[c]
+                holds = first == c
+                state.weights[holds] = state.weights[holds] * transfer_value
+                transferred.append(state.sequence[first[state.sequence] == c])
+            state.alive[c_idx] = False
+        # votekit lists the transferred ballots first, then the rest in their old order.
+        was_transferred = np.zeros(profile.n_ballots, dtype=bool)
+        was_transferred[np.concatenate(transferred)] = True
+        state.sequence = np.concatenate(
+            transferred + [state.sequence[~was_transferred[state.sequence]]]
+        )
+        state.elected.extend(decided)
+        state.n_elected += sum(len(s) for s in decided)
+
+    elif kind == "elect_rest":
+        state.elected.extend(decided)
+        state.n_elected += sum(len(s) for s in decided)
+        state.alive[:] = False
+
+    else:
+        state.eliminated.extend(decided)
+        state.alive[profile.candidate_indices(sorted(decided[0]))] = False
+
+
+def _run_stv(
+    ballots: _STVBallots,
+    m: int,
+    threshold: int,
+    tiebreak_scores: np.ndarray,
+    state: _STVState,
+    rounds: Optional[list[_STVRound]] = None,
+) -> tuple[ArrayElection, _STVState]:
+    """
+    Counts an STV election from the given state until every seat is filled, appending each
+    round to ``rounds`` when it is given.
+
+    Returns:
+        tuple[ArrayElection, _STVState]: The outcome, with the scores of the first round
+            counted, and the final state.
+    """
+    candidates = ballots.profile.candidates
+    scores, cast, first = ballots.tally(state)
+    first_round_scores = {
+        c: float(scores[i]) for i, c in enumerate(candidates) if cast[i]
+    }
+    remaining = _score_ranking(candidates, scores, cast)
+
+    while state.n_elected < m:
+        if not remaining:
+            raise ValueError("Ballots were exhausted before all seats were filled.")
+
+        kind, decided = _stv_decision(
+            scores,
+            cast,
+            remaining,
+            threshold,
+            m - state.n_elected,
+            candidates,
+            tiebreak_scores,
+        )
+        if rounds is not None:
+            rounds.append(
+                _STVRound(state.copy(), scores, cast, first, kind, tuple(decided))
+            )
+        _apply_stv_decision(ballots, state, kind, decided, scores, first, threshold)
+
+        ballots.advance(state)
+        scores, cast, first = ballots.tally(state)
+        remaining = _score_ranking(candidates, scores, cast)
+
+    election = ArrayElection(
+        ranking=tuple(
+            s for s in state.elected + remaining + state.eliminated[::-1] if len(s) != 0
+        ),
+        elected=tuple(state.elected),
+        scores=first_round_scores,
+    )
+    return election, state
+
+
+def _stv_threshold(profile: CompactProfile, m: int) -> int:
+    """
+    Checks that an STV election can be run and returns its Droop quota, fixed from the
+    initial total weight.
+    """
+    _require_strict(profile)
+    if m <= 0:
+        raise ValueError("m must be positive.")
+    # Ballots emptied by removing candidates carry no weight and are ignored.
+    if ((profile.ranks == profile.unranked).all(axis=1) & (profile.weights > 0)).any():
+        raise ValueError("Ballots must have rankings.")
+    if _cast_mask(profile).sum() < m:
+        raise ValueError("Not enough candidates received votes to be elected.")
+    return int(profile.total_weight / (m + 1) + 1)
+
+
+def stv_election(profile: CompactProfile, m: int) -> ArrayElection:
+    """
+    Runs a fractional transfer STV election with the Droop quota on a compact profile.
+    Produces the same ranking and elected set as votekit's ``STV`` with its defaults
+    (simultaneous election of every candidate over the quota).
+
+    Each ballot keeps a pointer to its current preference and every round is a single
+    weighted bincount over those pointers. The quota is fixed from the initial total weight.
+    In a round where some candidates reach the quota, all of them are elected and the ballots
+    they hold are transferred at the value (votes - quota) / votes. Otherwise, if exactly as
+    many candidates are still receiving votes as there are open seats, they are all elected.
+    Otherwise the candidate with the fewest first-place votes is eliminated, with ties broken
+    by first-place votes in the initial profile. Candidates who stop appearing on ballots with
+    positive weight drop out of the ranking, as they do in votekit.
+
+    Where votekit would break an elimination tie at random, the lexicographically last
+    candidate is eliminated instead, and where votekit runs out of candidates before filling
+    every seat a ValueError is raised.
+
+    Args:
+        profile (CompactProfile): Profile to conduct the election on.
+        m (int): Number of seats to elect.
+
+    Returns:
+        ArrayElection: The outcome of the election.
+    """
+    threshold = _stv_threshold(profile, m)
+    ballots = _STVBallots.from_profile(profile)
+    election, _ = _run_stv(
+        ballots,
+        m,
+        threshold,
+        positional_scores(profile, [1]),
+        ballots.initial_state(),
+    )
+    return election
+
+
+@dataclass(frozen=True, eq=False)
+class STVCheckpoints:
+    """
+    The round by round record of an STV count, from which the count on the profile without
+    one candidate restarts partway through instead of from the first round.
+
+    Until the removed candidate leaves the original count, the count without it differs
+    only in the ballots the candidate holds, which sit with their next preference instead,
+    and in the quota if some ballots rank only that candidate. Adding those ballots to the
+    recorded tallies gives the tallies without the candidate, and as long as they lead to
+    the same decision, and a round electing candidates has the same quota and gives them
+    none of those ballots, the two counts go through identical states. Once the candidate is
+    eliminated, the count without it is in the same state as the original one. The count
+    without the candidate therefore restarts from the first round where this cannot be
+    shown, or from the end of the original count if it never happens. Decisions on tallies
+    that are not whole numbers are only trusted when no comparison is within a relative
+    1e-9 of changing, since the added ballots are summed in a different order than a recount
+    would sum them.
+
+    Attributes:
+        ballots (_STVBallots): The sorted ballots of the profile.
+        m (int): Number of seats.
+        threshold (int): The Droop quota.
+        rounds (tuple[_STVRound, ...]): The recorded rounds.
+        whole_weights (tuple[bool, ...]): Whether every ballot weight is a whole number at
+            the start of each round.
+        final_state (_STVState): The state after the last round.
+        election (ArrayElection): The outcome of the original count.
+    """
+
+    ballots: _STVBallots
+    m: int
+    threshold: int
+    rounds: tuple[_STVRound, ...]
+    whole_weights: tuple[bool, ...]
+    final_state: _STVState
+    election: ArrayElection
+
+    @classmethod
+    def from_profile(cls, profile: CompactProfile, m: int) -> "STVCheckpoints":
+        """
+        Runs the STV count on the full profile, recording every round.
+
+        Args:
+            profile (CompactProfile): Profile to conduct the election on.
+            m (int): Number of seats to elect.
+
+        Returns:
+            STVCheckpoints: The record of the count.
+        """
+        threshold = _stv_threshold(profile, m)
+        ballots = _STVBallots.from_profile(profile)
+        rounds: list[_STVRound] = []
+        election, final_state = _run_stv(
+            ballots,
+            m,
+            threshold,
+            positional_scores(profile, [1]),
+            ballots.initial_state(),
+            rounds,
+        )
+        return cls(
+            ballots=ballots,
+            m=m,
+            threshold=threshold,
+            rounds=tuple(rounds),
+            whole_weights=tuple(
+                bool(np.array_equal(r.state.weights, np.round(r.state.weights)))
+                for r in rounds
+            ),
+            final_state=final_state,
+            election=election,
+        )
+
+    def _state_without(self, state: _STVState, removed: int) -> _STVState:
+        """
+        The state of the count without a candidate corresponding to a recorded state.
+        """
+        name = frozenset({self.ballots.profile.candidates[removed]})
+        state = state.copy()
+        state.alive[removed] = False
+        state.eliminated = [s for s in state.eliminated if s != name]
+        self.ballots.advance(state)
+        return state
+
+    def _round_matches(
+        self,
+        recorded: _STVRound,
+        removed: int,
+        threshold: int,
+        tiebreak_scores: np.ndarray,
+        exact: bool,
+    ) -> bool:
+        """
+        Whether the count without the candidate, with its own quota and tiebreak scores,
+        takes the same decision as the recorded round, with the same transfers.
+        """
+        ballots = self.ballots
+        candidates = ballots.profile.candidates
+        state = recorded.state
+        if recorded.kind == "elect_rest":
+            return False
+
+        # The ballots held by the removed candidate move to their next preference.
+        pile = np.flatnonzero(recorded.first == removed)
+        alive = state.alive.copy()
+        alive[removed] = False
+        pointers = state.pointers[pile].copy()
+        order, sorted_ranks = ballots.order[pile], ballots.sorted_ranks[pile]
+        _advance_pointers(pointers, order, sorted_ranks, alive, ballots.profile.unranked)
+        rows = np.arange(len(pile))
+        moves = sorted_ranks[rows, pointers] != ballots.profile.unranked
+        gain = np.bincount(
+            order[rows, pointers][moves],
+            weights=state.weights[pile][moves],
+            minlength=len(candidates),
+        )
+
+        scores = recorded.scores + gain
+        cast_idx = np.flatnonzero(recorded.cast & alive)
+        tolerance = 0.0 if exact else 1e-9 * threshold
+        if not exact and (np.abs(scores[cast_idx] - threshold) <= tolerance).any():
+            return False
+
+        over = cast_idx[scores[cast_idx] >= threshold]
+        if recorded.kind == "elect":
+            # The surplus transferred depends on the quota and on the votes of the elected.
+            elected = ballots.profile.candidate_indices(
+                [c for c_set in recorded.decided for c in c_set]
+            )
+            return (
+                threshold == self.threshold
+                and set(over) == set(elected)
+                and not gain[elected].any()
+            )
+        if len(over) > 0 or len(cast_idx) == self.m - state.n_elected:
+            return False
+
+        lowest_score = scores[cast_idx].min()
+        lowest = cast_idx[scores[cast_idx] <= lowest_score + tolerance]
+        if len(lowest) > 1 and not exact:
+            return False
+        lowest_set = frozenset(candidates[i] for i in lowest)
+        if len(lowest_set) > 1:
+            lowest_set = _break_tie(lowest_set, candidates, tiebreak_scores)[-1]
+        return lowest_set == recorded.decided[0]
+
+    def election_without(self, removed: str) -> ArrayElection:
+        """
+        Runs the STV count on the profile without a candidate, restarting from the latest
+        recorded round the removal provably leaves unaffected. The outcome is that of
+        ``stv_election`` on ``profile.remove(removed)``.
+
+        Args:
+            removed (str): The candidate to remove.
+
+        Returns:
+            ArrayElection: The outcome of the election without the candidate.
+        """
+        election, _ = self._replay(removed)
+        return election
+
+    def resume_round(self, removed: str) -> int:
+        """
+        The round from which the count without a candidate restarts.
+
+        Args:
+            removed (str): The candidate to remove.
+
+        Returns:
+            int: The number of recorded rounds skipped.
+        """
+        _, resume = self._replay(removed, count=False)
+        return resume
+
+    def _replay(
+        self, removed: str, count: bool = True
+    ) -> tuple[Optional[ArrayElection], int]:
+        ballots = self.ballots
+        profile = ballots.profile
+        r = int(profile.candidate_indices(removed)[0])
+
+        ranked = profile.ranks != profile.unranked
+        ranked[:, r] = False
+        keeps_ranking = ranked.any(axis=1)
+        if (_cast_mask(profile) & ranked.any(axis=0)).sum() < self.m:
+            raise ValueError("Not enough candidates received votes to be elected.")
+        threshold = int(float(profile.weights[keeps_ranking].sum()) / (self.m + 1) + 1)
+
+        initial = self._state_without(self.rounds[0].state, r)
+        scores, cast, _ = ballots.tally(initial)
+        # The first-place votes of the profile without the candidate, which break ties.
+        tiebreak_scores = scores
+
+        for resume, recorded in enumerate(self.rounds):
+            if recorded.kind == "eliminate" and recorded.decided[0] == frozenset(
+                {profile.candidates[r]}
+            ):
+                continue
+            if not self._round_matches(
+                recorded, r, threshold, tiebreak_scores, self.whole_weights[resume]
+            ):
+                break
+        else:
+            resume = len(self.rounds)
+
+        if not count:
+            return None, resume
+
+        state = (
+            self.final_state if resume == len(self.rounds) else self.rounds[resume].state
+        )
+        election, _ = _run_stv(
+            ballots,
+            self.m,
+            threshold,
+            tiebreak_scores,
+            self._state_without(state, r),
+        )
+        return (
+            ArrayElection(
+                ranking=election.ranking,
+                elected=election.elected,
+                scores={
+                    c: float(scores[i])
+                    for i, c in enumerate(profile.candidates)
+                    if cast[i]
+                },
+            ),
+            resume,
+        )
+
+
+def bernstein_radius(shares: np.ndarray, sample_size: float, log_term: float) -> np.ndarray:
+    """
+    The empirical Bernstein radius (Maurer and Pontil, 2009) of means of quantities between
+    0 and 1 over a sample, bounding each sample variance by its mean. With ``log_term`` set
+    to ``log(4 * k / failure)``, all k population means are within their radius of the
+    sample means with probability at least ``1 - failure``. Unlike Hoeffding's radius it
+    shrinks with the share, so small tallies are told apart from far fewer draws.
+
+    Args:
+        shares (np.ndarray): The sample means, or upper bounds on them.
+        sample_size (float): Number of draws.
+        log_term (float): The logarithmic confidence term.
+
+    Returns:
+        np.ndarray: The radius of each mean.
+    """
+    n = sample_size - 1
+    return np.sqrt(2 * np.maximum(shares, 0) * log_term / n) + 7 * log_term / (3 * n)
+
+
+def ranking_blocks(
+    candidates: Sequence[str],
+    order: Sequence[int],
+    lower: np.ndarray,
+    upper: np.ndarray,
+) -> list[frozenset[str]]:
+    """
+    Splits a ranking into consecutive blocks whose order is certain when every score is only
+    known to lie in an interval. The ranking is cut wherever every candidate above the cut
+    has a lower bound over the upper bound of every candidate below it, so only the order
+    within a block is left open.
+
+    Args:
+        candidates (Sequence[str]): The candidate index table.
+        order (Sequence[int]): Indices of the ranked candidates, from first to last.
+        lower (np.ndarray): Lower bounds on the scores, indexed like ``candidates``.
+        upper (np.ndarray): Upper bounds on the scores, indexed like ``candidates``.
+
+    Returns:
+        list[frozenset[str]]: The blocks, from first to last.
+    """
+    order = np.asarray(order, dtype=np.int64)
+    if len(order) == 0:
+        return []
+    floor_above = np.minimum.accumulate(lower[order])
+    ceiling_below = np.maximum.accumulate(upper[order][::-1])[::-1]
+    cuts = np.flatnonzero(floor_above[:-1] > ceiling_below[1:]) + 1
+    return [frozenset(candidates[i] for i in block) for block in np.split(order, cuts)]
+
+
+def _decided(recorded: _STVRound) -> set[str]:
+    return {c for c_set in recorded.decided for c in c_set}
+
+
+def _group_intake(
+    ballots: _STVBallots, recorded: _STVRound, group: np.ndarray, weights: np.ndarray
+) -> np.ndarray:
+    """
+    The weight of the ballots held by a group of candidates that each member could receive
+    while the group is eliminated, whatever the order: a ballot can reach every member of
+    the group ranked after its current preference with only members or eliminated
+    candidates in between.
+    """
+    profile = ballots.profile
+    rows = np.flatnonzero((recorded.first >= 0) & group[recorded.first])
+    at = recorded.state.pointers[rows] + 1
+    intake = np.zeros(profile.n_candidates)
+    while len(rows) > 0:
+        ranked = ballots.sorted_ranks[rows, at] != profile.unranked
+        rows, at = rows[ranked], at[ranked]
+        candidate = ballots.order[rows, at]
+        member = group[candidate]
+        intake += np.bincount(
+            candidate[member], weights=weights[rows[member]], minlength=len(intake)
+        )
+        passed = member | ~recorded.state.alive[candidate]
+        rows, at = rows[passed], at[passed] + 1
+    return intake
+
+
+def certified_stv_ranking(
+    checkpoints: STVCheckpoints,
+    population_cast: np.ndarray,
+    quota_share: float,
+    sample_size: float,
+    log_term: float,
+) -> list[frozenset[str]]:
+    """
+    Bounds the STV ranking of a population from a count on a sample of its ballots, drawn
+    with replacement and weighted by how often each was drawn. As a share of the population,
+    every tally of the population count is the mean over the population of a ballot weight
+    between 0 and 1. Assuming the sample mean of each of those weights is within its
+    ``bernstein_radius`` of it, the recorded rounds give an interval around every tally, and
+    transfer values are bounded from the tallies of the candidates elected. Round by round,
+    as long as the intervals force the decision the sample count took, the population count
+    takes it too. The k lowest candidates may also be certified together, as in a bulk
+    exclusion, when none of them can overtake anyone else even after receiving every vote
+    of the others it is ranked after; they are then eliminated first in some order and leave
+    the same state behind. The candidates the certified rounds elect or eliminate are
+    placed, and the ones left when a round cannot be certified share one block in the middle
+    of the ranking.
+
+    The bound relies on at most (n_candidates + 1) * n_candidates tallies and
+    n_candidates**3 bulk exclusion tallies of the population count.
+
+    Args:
+        checkpoints (STVCheckpoints): The recorded count on the sample.
+        population_cast (np.ndarray): Boolean array marking the candidates ranked on some
+            ballot of the population, indexed like the sample's candidates.
+        quota_share (float): The Droop quota of the population count as a share of the
+            population's weight.
+        sample_size (float): Number of ballots drawn.
+        log_term (float): The logarithmic confidence term of ``bernstein_radius``.
+
+    Returns:
+        list[frozenset[str]]: Blocks of the ranking, from first to last, whose order is
+            certain while the order within each block is not.
+    """
+    profile = checkpoints.ballots.profile
+    candidates = profile.candidates
+    n_cands = profile.n_candidates
+    lower = profile.weights.copy()
+    upper = profile.weights.copy()
+
+    def share_bounds(low: np.ndarray, high: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        radius = bernstein_radius(high / sample_size, sample_size, log_term)
+        return low / sample_size - radius, high / sample_size + radius
+
+    def tally_bounds(first: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        held = first >= 0
+        return share_bounds(
+            np.bincount(first[held], weights=lower[held], minlength=n_cands),
+            np.bincount(first[held], weights=upper[held], minlength=n_cands),
+        )
+
+    rounds = checkpoints.rounds
+    top: list[frozenset[str]] = []
+    bottom: list[frozenset[str]] = []
+    alive = population_cast
+    i = 0
+    while i < len(rounds):
+        recorded = rounds[i]
+        alive = recorded.state.alive & population_cast
+        live = np.flatnonzero(alive)
+        # A candidate missing from the sample may still hold ballots in the population.
+        if not np.array_equal(recorded.cast, alive):
+            break
+        low, high = tally_bounds(recorded.first)
+        over = low[live] >= quota_share
+        if not (over | (high[live] < quota_share)).all():
+            break
+        by_score = live[np.argsort(-recorded.scores[live], kind="stable")]
+        n_open = checkpoints.m - recorded.state.n_elected
+
+        if over.any():
+            elected = by_score[low[by_score] >= quota_share]
+            if recorded.kind != "elect" or _decided(recorded) != {
+                candidates[c] for c in elected
+            }:
+                break
+            top.extend(ranking_blocks(candidates, elected, low, high))
+            for c in elected:
+                holds = recorded.first == c
+                lower[holds] *= 1 - quota_share / low[c]
+                upper[holds] *= 1 - quota_share / high[c]
+            i += 1
+            continue
+
+        if len(live) == n_open:
+            if recorded.kind != "elect_rest":
+                break
+            top.extend(ranking_blocks(candidates, by_score, low, high))
+            i += 1
+            continue
+
+        n_excluded = None
+        for k in range(1, len(live) - n_open + 1):
+            excluded, rest = by_score[-k:], by_score[:-k]
+            floor = low[rest].min()
+            if high[excluded].max() >= floor:
+                continue
+            if k > 1:
+                # The rest only gain votes while the k lowest are eliminated, and must not
+                # reach the quota meanwhile.
+                if high[rest].max() + high[excluded].sum() >= quota_share:
+                    continue
+                group = np.zeros(n_cands, dtype=bool)
+                group[excluded] = True
+                held = recorded.first >= 0
+                own = np.bincount(
+                    recorded.first[held], weights=upper[held], minlength=n_cands
+                )
+                _, most = share_bounds(
+                    np.zeros(n_cands),
+                    own + _group_intake(checkpoints.ballots, recorded, group, upper),
+                )
+                if most[excluded].max() >= floor:
+                    continue
+            n_excluded = k
+            break
+        if n_excluded is None:
+            break
+        recorded_exclusions = rounds[i : i + n_excluded]
+        if (
+            len(recorded_exclusions) < n_excluded
+            or any(
+                r.kind != "eliminate"
+                or not np.array_equal(r.cast, r.state.alive & population_cast)
+                for r in recorded_exclusions
+            )
+            or set().union(*map(_decided, recorded_exclusions))
+            != {candidates[c] for c in by_score[-n_excluded:]}
+        ):
+            break
+        bottom.insert(0, frozenset(candidates[c] for c in by_score[-n_excluded:]))
+        i += n_excluded
+    else:
+        _, cast, first = checkpoints.ballots.tally(checkpoints.final_state)
+        alive = checkpoints.final_state.alive & population_cast
+        live = np.flatnonzero(alive)
+        if np.array_equal(cast, alive):
+            low, high = tally_bounds(first)
+            scores = np.bincount(
+                first[first >= 0],
+                weights=checkpoints.final_state.weights[first >= 0],
+                minlength=n_cands,
+            )
+            by_score = live[np.argsort(-scores[live], kind="stable")]
+            return top + ranking_blocks(candidates, by_score, low, high) + bottom
+
+    middle = frozenset(candidates[c] for c in np.flatnonzero(alive))
+    return top + ([middle] if middle else []) + bottom
+
+
+@dataclass(frozen=True, eq=False)
+class RemovalPositionCounts:
+    """
+    A sufficient statistic for positional scoring after removing any single candidate.
+    Removing candidate r moves every candidate ranked below r up one position and leaves the
+    rest in place, so the weight of ballots ranking c at position p, together with the weight
+    of those that also rank r above c, gives the scores of every single-candidate removal
+    without condensing the profile or running an election.
+
+    Attributes:
+        candidates (tuple[str, ...]): The candidate index table.
+        counts (np.ndarray): Array of shape (n_candidates, max_ranking_length) whose (c, p)
+            entry is the weight of the ballots ranking c at position p.
+        above (np.ndarray): Array of shape (n_candidates, n_candidates, max_ranking_length)
+            whose (r, c, p) entry is the weight of the ballots ranking c at position p and r
+            above c.
+        cast (np.ndarray): Boolean array of shape (n_candidates,) marking the candidates
+            ranked on a ballot with positive weight.
+        max_ranking_length (int): The maximum ranking length of the profile.
+    """
+
+    candidates: tuple[str, ...]
+    counts: np.ndarray
+    above: np.ndarray
+    cast: np.ndarray
+    max_ranking_length: int
+
+    @classmethod
+    def from_profile(
+        cls, profile: CompactProfile, max_chunk_entries: int = 1 << 22
+    ) -> "RemovalPositionCounts":
+        """
+        Accumulates the counts in one pass over the ballots.
+
+        Args:
+            profile (CompactProfile): Profile to summarize. Must not contain tied rankings.
+            max_chunk_entries (int, optional): Upper bound on the number of ballot-candidate
+                entries held in memory at once. Defaults to 2**22.
+
+        Returns:
+            RemovalPositionCounts: The statistic of the profile.
+        """
+        _require_strict(profile)
+        n_cands = profile.n_candidates
+        n_positions = profile.max_ranking_length
+        chunk_size = max(1, max_chunk_entries // max(1, n_cands))
+
+        counts = np.zeros((n_cands, n_positions))
+        above = np.zeros((n_cands, n_cands, n_positions))
+        for start in range(0, profile.n_ballots, chunk_size):
+            ranks = profile.ranks[start : start + chunk_size]
+            weights = profile.weights[start : start + chunk_size]
+            for p in range(n_positions):
+                at_p = ranks == p
+                counts[:, p] += weights @ at_p
+                # On a strict ballot, r is above the candidate at position p iff r is ranked
+                # at an earlier position.
+                above[:, :, p] += ((ranks < p) * weights[:, None]).T @ at_p
+
+        return cls(
+            candidates=profile.candidates,
+            counts=counts,
+            above=above,
+            cast=_cast_mask(profile),
+            max_ranking_length=n_positions,
+        )
+
+    def scores(self, score_vector: Optional[Sequence[float]]) -> np.ndarray:
+        """
+        The scores of the candidates in the full profile.
+
+        Args:
+            score_vector (Optional[Sequence[float]]): Score vector. None is the conventional
+                Borda vector.
+
+        Returns:
+            np.ndarray: Array of shape (n_candidates,) with the scores.
+        """
+        return self.counts @ _padded_score_vector(score_vector, self.max_ranking_length)
+
+    def scores_without(self, score_vector: Optional[Sequence[float]]) -> np.ndarray:
+        """
+        The scores of the candidates after removing each candidate in turn.
+
+        Args:
+            score_vector (Optional[Sequence[float]]): Score vector. None is the conventional
+                Borda vector.
+
+        Returns:
+            np.ndarray: Array of shape (n_candidates, n_candidates) whose row r holds the
+                scores after removing candidate r. Entry (r, r) is meaningless.
+        """
+        return self.family_scores_without([score_vector])[0]
+
+    def family_scores_without(
+        self, score_vectors: Sequence[Optional[Sequence[float]]]
+    ) -> np.ndarray:
+        """
+        The scores of the candidates after removing each candidate in turn, under every
+        score vector of a family at once.
+
+        Args:
+            score_vectors (Sequence[Optional[Sequence[float]]]): The score vectors. None is
+                the conventional Borda vector.
+
+        Returns:
+            np.ndarray: Array of shape (n_vectors, n_candidates, n_candidates) whose (v, r)
+                row holds the scores under vector v after removing candidate r. Entries
+                (v, r, r) are meaningless.
+        """
+        matrix = score_vector_matrix(score_vectors, self.max_ranking_length)
+        # A candidate at position p with the removed candidate above it moves to p - 1.
+        gains = np.zeros_like(matrix)
+        gains[:, 1:] = matrix[:, :-1] - matrix[:, 1:]
+        scores = (self.counts @ matrix.T).T
+        return scores[:, None, :] + np.einsum("rcp,vp->vrc", self.above, gains)
+
+
+def removal_gain_bounds(
+    profile: CompactProfile, score_vector: Optional[Sequence[float]]
+) -> np.ndarray:
+    """
+    Bounds how many points any single candidate can gain when each candidate is removed.
+    With a non-increasing score vector, removing r moves the candidates below r up one
+    position each, so every candidate ranked below position q gains at most the largest step
+    of the score vector after q on a ballot ranking r at q. Candidates never lose points.
+
+    Args:
+        profile (CompactProfile): Profile to bound. Must not contain tied rankings.
+        score_vector (Optional[Sequence[float]]): Non-increasing score vector. None is the
+            conventional Borda vector.
+
+    Returns:
+        np.ndarray: Array of shape (n_candidates,) whose entry r bounds the gain of every
+            other candidate when r is removed.
+    """
+    _require_strict(profile)
+    sv = _padded_score_vector(score_vector, profile.max_ranking_length)
+    steps = sv[:-1] - sv[1:]
+    if np.any(steps < 0):
+        raise ValueError("Removal gains are only bounded for non-increasing score vectors.")
+
+    # largest_step_after[q] is the largest step between two positions below q.
+    largest_step_after = np.zeros_like(sv)
+    if len(steps):
+        largest_step_after[:-1] = np.maximum.accumulate(steps[::-1])[::-1]
+
+    points = np.zeros(profile.unranked + 1)
+    points[: len(sv)] = largest_step_after
+    return (points[profile.ranks] * profile.weights[:, None]).sum(axis=0)
+
+
+def positional_elections_without_each(
+    counts: RemovalPositionCounts,
+    seats: Sequence[Optional[int]],
+    score_vector: Optional[Sequence[float]],
+    tiebreak: Tiebreak,
+) -> list[Optional[ArrayElection]]:
+    """
+    Runs a positional election on the profile without each candidate, reading the scores off
+    a ``RemovalPositionCounts`` instead of condensing the profile. The outcomes are those of
+    ``positional_election`` on the condensed profiles, provided the scores are computed
+    exactly, which holds when the ballot weights are integers.
+
+    Args:
+        counts (RemovalPositionCounts): The statistic of the full profile.
+        seats (Sequence[Optional[int]]): Number of seats to elect after removing each
+            candidate, in candidate index order. None skips that candidate.
+        score_vector (Optional[Sequence[float]]): Score vector. None is the conventional Borda
+            vector of the profile's maximum ranking length.
+        tiebreak (Tiebreak): Tiebreak used when a tie straddles the last seat.
+
+    Returns:
+        list[Optional[ArrayElection]]: The outcome after removing each candidate, or None for
+            the skipped candidates.
+    """
+    return positional_family_elections_without_each(
+        counts, seats, [score_vector], [tiebreak]
+    )[0]
+
+
+def positional_family_elections(
+    profile: CompactProfile,
+    score_vectors: Sequence[Optional[Sequence[float]]],
+    tiebreaks: Sequence[Tiebreak],
+    seat_counts: Sequence[int],
+) -> list[list[ArrayElection]]:
+    """
+    Runs a family of positional elections (any k-approval, truncated Borda, Dowdall, ...) on
+    one profile. Every score vector is one row of a single product with the
+    ``position_counts`` of the profile, so adding a rule to the family costs a matrix row
+    rather than a pass over the ballots. The outcomes are those of ``positional_election``
+    provided the scores are computed exactly, which holds when the ballot weights and the
+    score vectors are integers.
+
+    Args:
+        profile (CompactProfile): Profile to conduct the elections on. Must not contain tied
+            rankings.
+        score_vectors (Sequence[Optional[Sequence[float]]]): The score vectors. None is the
+            conventional Borda vector of the profile's maximum ranking length.
+        tiebreaks (Sequence[Tiebreak]): The tiebreak of each score vector.
+        seat_counts (Sequence[int]): Number of seats to elect in each election.
+
+    Returns:
+        list[list[ArrayElection]]: The outcome under each score vector, for each seat count.
+    """
+    cast = _cast_mask(profile)
+    if cast.sum() < max(seat_counts, default=0):
+        raise ValueError("Not enough candidates received votes to be elected.")
+
+    counts = position_counts(profile)
+    n_positions = profile.max_ranking_length
+    scores = counts @ score_vector_matrix(score_vectors, n_positions).T
+    tiebreak_scores: dict[Tiebreak, np.ndarray] = {}
+
+    def lazy_tiebreak_scores(tiebreak: Tiebreak) -> np.ndarray:
+        if tiebreak not in tiebreak_scores:
+            tiebreak_scores[tiebreak] = counts @ _padded_score_vector(
+                tiebreak_score_vector(tiebreak), n_positions
+            )
+        return tiebreak_scores[tiebreak]
+
+    elections = []
+    for v, tiebreak in enumerate(tiebreaks):
+        ranking = _score_ranking(profile.candidates, scores[:, v], cast)
+        cast_scores = {
+            c: float(scores[i, v]) for i, c in enumerate(profile.candidates) if cast[i]
+        }
+        vector_elections = []
+        for m in seat_counts:
+            elected, remaining = _elect_from_ranking(
+                ranking,
+                m,
+                profile.candidates,
+                lambda tiebreak=tiebreak: lazy_tiebreak_scores(tiebreak),
+            )
+            vector_elections.append(
+                ArrayElection(
+                    ranking=tuple(s for s in elected + remaining if len(s) != 0),
+                    elected=elected,
+                    scores=dict(cast_scores),
+                )
+            )
+        elections.append(vector_elections)
+    return elections
+
+
+def positional_family_elections_without_each(
+    counts: RemovalPositionCounts,
+    seats: Sequence[Optional[int]],
+    score_vectors: Sequence[Optional[Sequence[float]]],
+    tiebreaks: Sequence[Tiebreak],
+) -> list[list[Optional[ArrayElection]]]:
+    """
+    Runs a family of positional elections on the profile without each candidate, reading
+    the scores under every score vector off one ``RemovalPositionCounts``. The outcomes are
+    those of ``positional_election`` on the condensed profiles, provided the scores are
+    computed exactly, which holds when the ballot weights and the score vectors are
+    integers.
+
+    Args:
+        counts (RemovalPositionCounts): The statistic of the full profile.
+        seats (Sequence[Optional[int]]): Number of seats to elect after removing each
+            candidate, in candidate index order. None skips that candidate.
+        score_vectors (Sequence[Optional[Sequence[float]]]): The score vectors. None is the
+            conventional Borda vector of the profile's maximum ranking length.
+        tiebreaks (Sequence[Tiebreak]): The tiebreak of each score vector.
+
+    Returns:
+        list[list[Optional[ArrayElection]]]: For each score vector, the outcome after
+            removing each candidate, or None for the skipped candidates.
+    """
+    scores = counts.family_scores_without(score_vectors)
+    tiebreak_scores: dict[Tiebreak, np.ndarray] = {}
+
+    def removal_tiebreak_scores(tiebreak: Tiebreak, r: int) -> np.ndarray:
+        if tiebreak not in tiebreak_scores:
+            tiebreak_scores[tiebreak] = counts.scores_without(
+                tiebreak_score_vector(tiebreak)
+            )
+        return tiebreak_scores[tiebreak][r]
+
+    elections: list[list[Optional[ArrayElection]]] = []
+    for v, tiebreak in enumerate(tiebreaks):
+        vector_elections: list[Optional[ArrayElection]] = []
+        for r, m in enumerate(seats):
+            if m is None:
+                vector_elections.append(None)
+                continue
+
+            cast = counts.cast.copy()
+            cast[r] = False
+            if cast.sum() < m:
+                raise ValueError("Not enough candidates received votes to be elected.")
+
+            ranking = _score_ranking(counts.candidates, scores[v, r], cast)
+            elected, remaining = _elect_from_ranking(
+                ranking,
+                m,
+                counts.candidates,
+                lambda tiebreak=tiebreak, r=r: removal_tiebreak_scores(tiebreak, r),
+            )
+            vector_elections.append(
+                ArrayElection(
+                    ranking=tuple(s for s in elected + remaining if len(s) != 0),
+                    elected=elected,
+                    scores={
+                        c: float(scores[v, r, i])
+                        for i, c in enumerate(counts.candidates)
+                        if cast[i]
+                    },
+                )
+            )
+        elections.append(vector_elections)
+
+    return elections
+
+
+@dataclass(frozen=True, eq=False)
+class BatchPositionCounts:
+    """
+    The ``RemovalPositionCounts`` of every profile in a ``CompactProfileBatch``, accumulated
+    for the whole batch in one pass per ranking position.
+
+    Attributes:
+        candidates (tuple[str, ...]): The candidate index table.
+        counts (np.ndarray): Array of shape (n_profiles, n_candidates, max_ranking_length)
+            whose (i, c, p) entry is the weight of the ballots of profile i ranking c at
+            position p.
+        above (np.ndarray): Array of shape (n_profiles, n_candidates, n_candidates,
+            max_ranking_length) whose (i, r, c, p) entry is the weight of the ballots of
+            profile i ranking c at position p and r above c.
+        cast (np.ndarray): Boolean array of shape (n_profiles, n_candidates) marking the
+            candidates ranked on a ballot with positive weight in each profile.
+        max_ranking_lengths (np.ndarray): Array of shape (n_profiles,) with the maximum
+            ranking length of each profile.
+    """
+
+    candidates: tuple[str, ...]
+    counts: np.ndarray
+    above: np.ndarray
+    cast: np.ndarray
+    max_ranking_lengths: np.ndarray
+
+    @classmethod
+    def from_batch(cls, batch: CompactProfileBatch) -> "BatchPositionCounts":
+        """
+        Accumulates the counts of every profile in the batch.
+
+        Args:
+            batch (CompactProfileBatch): Batch to summarize. Must not contain tied rankings.
+
+        Returns:
+            BatchPositionCounts: The statistic of each profile.
+        """
+        if batch.has_ties:
+            raise ValueError("The array election engines require ballots without ties.")
+        n_profiles, n_cands = batch.n_profiles, batch.n_candidates
+        n_positions = int(batch.max_ranking_lengths.max())
+
+        # Column p of the candidates sorted by rank holds the candidate at position p, if
+        # the ballot is that long, since strict rankings are condensed.
+        order = np.argsort(batch.ranks, axis=1, kind="stable")
+        sorted_ranks = np.take_along_axis(batch.ranks, order, axis=1)
+        counts = np.zeros(n_profiles * n_cands * n_positions)
+        above = np.zeros(n_profiles * n_cands * n_cands * n_positions)
+        for p in range(min(n_positions, n_cands)):
+            rows = np.flatnonzero(sorted_ranks[:, p] == p)
+            at_p = order[rows, p]
+            profile_rows = batch.profile_index[rows]
+            weights = batch.weights[rows]
+            counts += np.bincount(
+                (profile_rows * n_cands + at_p) * n_positions + p,
+                weights=weights,
+                minlength=len(counts),
+            )
+            if p == 0:
+                continue
+            ranked_above = order[rows, :p]
+            above += np.bincount(
+                (
+                    ((profile_rows[:, None] * n_cands + ranked_above) * n_cands)
+                    + at_p[:, None]
+                ).ravel()
+                * n_positions
+                + p,
+                weights=np.repeat(weights, p),
+                minlength=len(above),
+            )
+
+        counts = counts.reshape(n_profiles, n_cands, n_positions)
+        return cls(
+            candidates=batch.candidates,
+            counts=counts,
+            above=above.reshape(n_profiles, n_cands, n_cands, n_positions),
+            cast=counts.sum(axis=2) > 0,
+            max_ranking_lengths=batch.max_ranking_lengths,
+        )
+
+    @classmethod
+    def from_replicate_weights(
+        cls,
+        profile: CompactProfile,
+        weights: np.ndarray,
+        max_chunk_entries: int = 1 << 22,
+    ) -> "BatchPositionCounts":
+        """
+        Accumulates the counts of many reweightings of the same ballots, such as bootstrap
+        replicates, as one product of the weight matrix with the position indicators of the
+        ballots.
+
+        Args:
+            profile (CompactProfile): The ballots. Must not contain tied rankings.
+            weights (np.ndarray): Array of shape (n_replicates, n_ballots) whose row i holds
+                the ballot weights of replicate i.
+            max_chunk_entries (int, optional): Upper bound on the number of indicator entries
+                held in memory at once. Defaults to 2**22.
+
+        Returns:
+            BatchPositionCounts: The statistic of each replicate.
+        """
+        _require_strict(profile)
+        n_cands = profile.n_candidates
+        n_positions = profile.max_ranking_length
+        n_replicates = weights.shape[0]
+        positions = np.arange(n_positions)
+        chunk_size = max(1, max_chunk_entries // max(1, n_cands * n_cands * n_positions))
+
+        counts = np.zeros((n_replicates, n_cands * n_positions))
+        above = np.zeros((n_replicates, n_cands * n_cands * n_positions))
+        for start in range(0, profile.n_ballots, chunk_size):
+            ranks = profile.ranks[start : start + chunk_size]
+            chunk_weights = weights[:, start : start + chunk_size]
+            at = ranks[:, :, None] == positions
+            counts += chunk_weights @ at.reshape(len(ranks), -1)
+            # On a strict ballot, r is above the candidate at position p iff r is ranked
+            # at an earlier position.
+            is_above = (ranks[:, :, None, None] < positions) & at[:, None, :, :]
+            above += chunk_weights @ is_above.reshape(len(ranks), -1)
+
+        counts = counts.reshape(n_replicates, n_cands, n_positions)
+        return cls(
+            candidates=profile.candidates,
+            counts=counts,
+            above=above.reshape(n_replicates, n_cands, n_cands, n_positions),
+            cast=counts.sum(axis=2) > 0,
+            max_ranking_lengths=np.full(n_replicates, n_positions),
+        )
+
+    def select(self, rows: np.ndarray) -> "BatchPositionCounts":
+        """
+        The statistic of the given profiles only.
+
+        Args:
+            rows (np.ndarray): Indices of the profiles to keep.
+
+        Returns:
+            BatchPositionCounts: The statistic of the selected profiles.
+        """
+        return BatchPositionCounts(
+            candidates=self.candidates,
+            counts=self.counts[rows],
+            above=self.above[rows],
+            cast=self.cast[rows],
+            max_ranking_lengths=self.max_ranking_lengths[rows],
+        )
+
+    def score_matrix(self, score_vector: Optional[Sequence[float]]) -> np.ndarray:
+        """
+        The score vector of each profile, padded to its own maximum ranking length, which
+        only matters for the conventional Borda vector.
+
+        Returns:
+            np.ndarray: Array of shape (n_profiles, max_ranking_length).
+        """
+        n_positions = self.counts.shape[2]
+        matrix = np.zeros((len(self.max_ranking_lengths), n_positions))
+        for length in np.unique(self.max_ranking_lengths):
+            matrix[self.max_ranking_lengths == length, :length] = _padded_score_vector(
+                score_vector, int(length)
+            )
+        return matrix
+
+    def scores(self, score_vector: Optional[Sequence[float]]) -> np.ndarray:
+        """
+        The scores of the candidates in each profile.
+
+        Returns:
+            np.ndarray: Array of shape (n_profiles, n_candidates).
+        """
+        return np.einsum("xcp,xp->xc", self.counts, self.score_matrix(score_vector))
+
+    def scores_without(self, score_vector: Optional[Sequence[float]]) -> np.ndarray:
+        """
+        The scores of the candidates in each profile after removing each candidate in turn.
+
+        Returns:
+            np.ndarray: Array of shape (n_profiles, n_candidates, n_candidates) whose (i, r)
+                row holds the scores in profile i after removing candidate r. Entries
+                (i, r, r) are meaningless.
+        """
+        matrix = self.score_matrix(score_vector)
+        gains = np.zeros_like(matrix)
+        gains[:, 1:] = matrix[:, :-1] - matrix[:, 1:]
+        return self.scores(score_vector)[:, None, :] + np.einsum(
+            "xrcp,xp->xrc", self.above, gains
+        )
+
+
+def batch_ranking_orders(
+    candidates: Sequence[str],
+    scores: np.ndarray,
+    tiebreak_scores: np.ndarray,
+    eligible: np.ndarray,
+    m: int,
+) -> np.ndarray:
+    """
+    Orders the candidates of many positional elections at once, as the ranking of
+    ``positional_election`` unpacked with ties in lexicographic order: by descending score,
+    with a tie straddling the last seat broken by the tiebreak scores, and any other tie by
+    name. The scores must be exact for the ties to match.
+
+    Args:
+        candidates (Sequence[str]): The candidate index table.
+        scores (np.ndarray): Array of shape (..., n_candidates) with the scores of each
+            election.
+        tiebreak_scores (np.ndarray): Array of the same shape with the tiebreak scores.
+        eligible (np.ndarray): Boolean array of the same shape marking the candidates that
+            can be ranked in each election.
+        m (int): Number of seats to elect.
+
+    Returns:
+        np.ndarray: Array of the same shape whose last axis lists candidate indices from
+            first to last, with the ineligible candidates at the end.
+    """
+    if m < 1:
+        raise ValueError("m must be strictly positive")
+    if (eligible.sum(axis=-1) < m).any():
+        raise ValueError("Not enough candidates received votes to be elected.")
+
+    masked = np.where(eligible, scores, -np.inf)
+    last_seat_score = -np.sort(-masked, axis=-1)[..., m - 1, None]
+    at_last_seat = eligible & (scores == last_seat_score)
+    n_above = (eligible & (scores > last_seat_score)).sum(axis=-1)
+    straddles = n_above + at_last_seat.sum(axis=-1) > m
+
+    name_rank = np.argsort(np.argsort(np.asarray(candidates)))
+    return np.lexsort(
+        (
+            np.broadcast_to(name_rank, scores.shape),
+            np.where(at_last_seat & straddles[..., None], -tiebreak_scores, 0),
+            np.where(eligible, -scores, np.inf),
+        ),
+        axis=-1,
+    )
+
+
+# Candidate indices are packed four bits per ranking position, so the packed engines below
+# handle at most this many candidates.
+MAX_PACKED_CANDIDATES = 16
+
+
+@dataclass(frozen=True, eq=False)
+class BallotTypes:
+    """
+    The distinct ballots of a profile, each packed into a 64-bit integer holding the
+    candidate index at every ranking position (four bits per position, first position in the
+    lowest bits) and a bitmask of the candidates it ranks, with the summed weight of the
+    ballots of that type. Candidate i is bit i of every mask, and a set of remaining
+    candidates is the mask of their bits, so removing a subset is a single mask operation.
+
+    Attributes:
+        candidates (tuple[str, ...]): The candidate index table.
+        orders (np.ndarray): Array of shape (n_types,) and dtype uint64 with the packed
+            rankings.
+        masks (np.ndarray): Array of shape (n_types,) and dtype int64 with the bitmask of the
+            candidates ranked by each type.
+        weights (np.ndarray): Array of shape (n_types,) with the total weight of each type.
+        max_ranking_length (int): The maximum ranking length of the profile.
+    """
+
+    candidates: tuple[str, ...]
+    orders: np.ndarray
+    masks: np.ndarray
+    weights: np.ndarray
+    max_ranking_length: int
+
+    @classmethod
+    def from_profile(cls, profile: CompactProfile) -> "BallotTypes":
+        """
+        Packs the ballots with positive weight and merges the identical ones.
+
+        Args:
+            profile (CompactProfile): Profile to pack. Must not contain tied rankings and
+                must have at most ``MAX_PACKED_CANDIDATES`` candidates.
+
+        Returns:
+            BallotTypes: The ballot types of the profile.
+        """
+        _require_strict(profile)
+        n_cands = profile.n_candidates
+        if n_cands > MAX_PACKED_CANDIDATES:
+            raise ValueError(
+                f"Ballot types hold at most {MAX_PACKED_CANDIDATES} candidates, "
+                f"found {n_cands}."
+            )
+
+        ranked = profile.ranks != profile.unranked
+        rows = ranked.any(axis=1) & (profile.weights > 0)
+        ranks, ranked = profile.ranks[rows], ranked[rows]
+
+        # On a strict ballot, sorting the candidates by rank lists them in ranking order,
+        # with the unranked candidates last.
+        order = np.argsort(ranks, axis=1, kind="stable").astype(np.uint64)
+        lengths = ranked.sum(axis=1)
+        packed = np.zeros(len(ranks), dtype=np.uint64)
+        for p in range(profile.max_ranking_length):
+            packed |= np.where(lengths > p, order[:, p], 0).astype(np.uint64) << np.uint64(
+                4 * p
+            )
+        masks = ranked.astype(np.int64) @ (np.int64(1) << np.arange(n_cands, dtype=np.int64))
+
+        keys, inverse = np.unique(
+            np.stack([packed, masks.astype(np.uint64)], axis=1),
+            axis=0,
+            return_inverse=True,
+        )
+        return cls(
+            candidates=profile.candidates,
+            orders=keys[:, 0],
+            masks=keys[:, 1].astype(np.int64),
+            weights=np.bincount(
+                inverse.ravel(), weights=profile.weights[rows], minlength=len(keys)
+            ),
+            max_ranking_length=profile.max_ranking_length,
+        )
+
+    @property
+    def n_candidates(self) -> int:
+        return len(self.candidates)
+
+    @property
+    def cast(self) -> int:
+        """
+        Bitmask of the candidates ranked on at least one ballot.
+        """
+        return int(np.bitwise_or.reduce(self.masks, initial=0))
+
+    def predecessor_weights(self) -> np.ndarray:
+        """
+        The weight of the ballots ranking each candidate below each set of candidates.
+
+        Returns:
+            np.ndarray: Array of shape (n_candidates, 2**n_candidates) whose (c, A) entry is
+                the weight of the ballots on which the candidates ranked above c are exactly
+                those of mask A.
+        """
+        n_cands = self.n_candidates
+        n_masks = 1 << n_cands
+        lengths = np.bitwise_count(self.masks)
+        above = np.zeros(len(self.orders), dtype=np.int64)
+        weights = np.zeros(n_cands * n_masks)
+        for p in range(self.max_ranking_length):
+            active = lengths > p
+            cand = ((self.orders >> np.uint64(4 * p)) & np.uint64(15)).astype(np.int64)
+            weights += np.bincount(
+                (cand * n_masks + above)[active],
+                weights=self.weights[active],
+                minlength=n_cands * n_masks,
+            )
+            above |= np.where(active, np.int64(1) << cand, 0)
+        return weights.reshape(n_cands, n_masks)
+
+
+def _subset_bits(n_cands: int) -> np.ndarray:
+    """
+    Boolean array of shape (2**n_cands, n_cands) whose row K marks the bits set in K.
+    """
+    return (np.arange(1 << n_cands)[:, None] >> np.arange(n_cands)) & 1 == 1
+
+
+def approval_scores_for_all_subsets(types: BallotTypes, k: int) -> np.ndarray:
+    """
+    The k-approval scores of the candidates for every set of remaining candidates at once. A
+    candidate is among the first k of a condensed ballot when fewer than k of the remaining
+    candidates are ranked above it, so its score under the remaining set K sums
+    ``predecessor_weights`` over the masks A with fewer than k bits of K. That sum is a
+    subset-sum (zeta) transform graded by the size of A & K, run over the bits one at a time
+    on the whole array.
+
+    Args:
+        types (BallotTypes): The ballot types of the profile.
+        k (int): Number of approved positions. Plurality is 1.
+
+    Returns:
+        np.ndarray: Array of shape (2**n_candidates, n_candidates) whose (K, c) entry is the
+            score of c in the profile restricted to the candidates of mask K. Entries for
+            candidates outside K are meaningless.
+    """
+    n_cands = types.n_candidates
+    k = max(1, min(k, types.max_ranking_length))
+    graded = np.zeros((k, n_cands, 1 << n_cands))
+    graded[0] = types.predecessor_weights()
+
+    # Before the bit b step, the bits below b of the last axis are bits of K and the rest
+    # are bits of A; graded[j] holds the weight whose A shares j of the processed bits with K.
+    for b in range(n_cands):
+        split = graded.reshape(k, n_cands, -1, 2, 1 << b)
+        lo, hi = split[:, :, :, 0, :].copy(), split[:, :, :, 1, :].copy()
+        split[:, :, :, 0, :] = lo + hi
+        split[:, :, :, 1, :] = lo
+        split[1:, :, :, 1, :] += hi[:-1]
+
+    return graded.sum(axis=0).T
+
+
+def borda_scores_for_all_subsets(types: BallotTypes) -> np.ndarray:
+    """
+    The Borda scores, with the profile's maximum ranking length as the top score, of the
+    candidates for every set of remaining candidates. A candidate ranked on a ballot scores
+    the maximum ranking length less the number of remaining candidates above it.
+
+    Args:
+        types (BallotTypes): The ballot types of the profile.
+
+    Returns:
+        np.ndarray: Array of shape (2**n_candidates, n_candidates) laid out like
+            ``approval_scores_for_all_subsets``.
+    """
+    predecessors = types.predecessor_weights()
+    bits = _subset_bits(types.n_candidates)
+    # above[c, b] is the weight of the ballots ranking b above c.
+    above = predecessors @ bits
+    return types.max_ranking_length * predecessors.sum(axis=1) - bits @ above.T
+
+
+def approval_elections_for_subsets(
+    types: BallotTypes,
+    k: int,
+    tiebreak: Tiebreak,
+    remaining_masks: Sequence[int],
+    seats: Sequence[int],
+) -> list[ArrayElection]:
+    """
+    Runs a k-approval election for each set of remaining candidates from scores computed for
+    every subset at once. The outcomes are those of ``positional_election`` on the condensed
+    profiles, provided the scores are computed exactly, which holds when the ballot weights
+    are integers.
+
+    Args:
+        types (BallotTypes): The ballot types of the full profile.
+        k (int): Number of approved positions. Plurality is 1.
+        tiebreak (Tiebreak): Tiebreak used when a tie straddles the last seat.
+        remaining_masks (Sequence[int]): Bitmasks of the remaining candidates of each
+            election.
+        seats (Sequence[int]): Number of seats to elect in each election.
+
+    Returns:
+        list[ArrayElection]: The outcome of each election.
+    """
+    scores = approval_scores_for_all_subsets(types, k)
+    tiebreak_scores: list[np.ndarray] = []
+
+    def subset_tiebreak_scores(mask: int) -> np.ndarray:
+        if not tiebreak_scores:
+            tiebreak_scores.append(
+                approval_scores_for_all_subsets(types, 1)
+                if tiebreak == "first_place"
+                else borda_scores_for_all_subsets(types)
+            )
+        return tiebreak_scores[0][mask]
+
+    bits = np.int64(1) << np.arange(types.n_candidates, dtype=np.int64)
+    full_cast = types.cast
+    elections = []
+    for mask, m in zip(remaining_masks, seats):
+        cast = (full_cast & mask & bits) != 0
+        if cast.sum() < m:
+            raise ValueError("Not enough candidates received votes to be elected.")
+
+        ranking = _score_ranking(types.candidates, scores[mask], cast)
+        elected, remaining = _elect_from_ranking(
+            ranking, m, types.candidates, lambda: subset_tiebreak_scores(mask)
+        )
+        elections.append(
+            ArrayElection(
+                ranking=tuple(s for s in elected + remaining if len(s) != 0),
+                elected=elected,
+                scores={
+                    c: float(scores[mask, i])
+                    for i, c in enumerate(types.candidates)
+                    if cast[i]
+                },
+            )
+        )
+
+    return elections
@@ -0,0 +1,626 @@
+from collections import OrderedDict
+from dataclasses import dataclass
+from functools import cached_property
+from typing import Optional, Sequence, Union
+import numpy as np
+import pandas as pd
+from votekit import Ballot, PreferenceProfile
+
+
+# Ranking entries that hold a position in the votekit dataframe but list no candidate.
+_SKIPPED_ENTRIES = (frozenset({"~"}), frozenset())
+
+
+def _rank_dtype(max_ranking_length: int) -> type:
+    """
+    Smallest signed integer type whose maximum can serve as the unranked sentinel.
+    """
+    return np.int8 if max_ranking_length < np.iinfo(np.int8).max else np.int16
+
+
+def _condense_ranks(ranks: np.ndarray, unranked: int) -> np.ndarray:
+    """
+    Renumbers the positions in every row of a rank matrix so that they are consecutive
+    starting from 0, preserving order and ties. Unranked entries are left untouched.
+
+    Args:
+        ranks (np.ndarray): Array of shape (n_ballots, n_candidates) of positions.
+        unranked (int): The sentinel used for unranked candidates.
+
+    Returns:
+        np.ndarray: The condensed rank matrix, with the same shape and dtype as ``ranks``.
+    """
+    is_ranked = ranks != unranked
+    if not is_ranked.any():
+        return ranks.copy()
+
+    n_positions = int(ranks[is_ranked].max()) + 1
+    rows, cols = np.nonzero(is_ranked)
+    occupied = np.zeros((ranks.shape[0], n_positions), dtype=bool)
+    occupied[rows, ranks[rows, cols]] = True
+    n_occupied_up_to = np.cumsum(occupied, axis=1)
+
+    condensed = np.full_like(ranks, unranked)
+    condensed[rows, cols] = n_occupied_up_to[rows, ranks[rows, cols]] - 1
+    return condensed
+
+
+def _encode_ranking_cells(
+    cells: np.ndarray, cand_index: dict[str, int], max_ranking_length: int
+) -> np.ndarray:
+    """
+    Encodes the ranking cells of a votekit dataframe as the rank matrix of a
+    ``CompactProfile``. Cells that are not frozensets, such as missing values, and skipped
+    entries list no candidate.
+
+    Args:
+        cells (np.ndarray): Object array of shape (n_ballots, n_positions) with the ranking
+            cells of each ballot.
+        cand_index (dict[str, int]): The index of each candidate.
+        max_ranking_length (int): The maximum ranking length, which sets the rank dtype.
+
+    Returns:
+        np.ndarray: Array of shape (n_ballots, n_candidates) with the position of each
+            candidate on each ballot.
+    """
+    dtype = _rank_dtype(max_ranking_length)
+    ranks = np.full((cells.shape[0], len(cand_index)), np.iinfo(dtype).max, dtype=dtype)
+    if cells.size == 0:
+        return ranks
+
+    codes, uniques = pd.factorize(cells.ravel())
+    codes = codes.reshape(cells.shape)
+
+    members = [
+        (
+            []
+            if not isinstance(u, frozenset) or u in _SKIPPED_ENTRIES
+            else sorted(cand_index[c] for c in u)
+        )
+        for u in uniques
+    ]
+    n_members = np.array([len(m) for m in members], dtype=np.int64)
+    member_offsets = np.cumsum(n_members) - n_members
+    flat_members = np.array([c for m in members for c in m], dtype=np.int64)
+
+    # Missing cells are coded -1 and list no candidate either.
+    is_listed = np.zeros(codes.shape, dtype=bool)
+    is_listed[codes >= 0] = n_members[codes[codes >= 0]] > 0
+    positions = np.cumsum(is_listed, axis=1) - 1
+
+    rows, cols = np.nonzero(is_listed)
+    cell_codes = codes[rows, cols]
+    reps = n_members[cell_codes]
+    within_cell = np.arange(reps.sum()) - np.repeat(np.cumsum(reps) - reps, reps)
+    cand_entries = flat_members[np.repeat(member_offsets[cell_codes], reps) + within_cell]
+
+    # A candidate repeated on a ballot keeps its first position.
+    np.minimum.at(
+        ranks,
+        (np.repeat(rows, reps), cand_entries),
+        np.repeat(positions[rows, cols], reps).astype(dtype),
+    )
+    return ranks
+
+
+@dataclass(frozen=True, eq=False)
+class CompactProfile:
+    """
+    An integer-encoded copy of a ranked ``PreferenceProfile`` for the metric hot paths.
+
+    Candidates are replaced by their index in ``candidates`` and every ballot is stored as the
+    position at which it ranks each candidate, so ``ranks[i, j]`` is the (0-indexed) position
+    of ``candidates[j]`` on ballot ``i``. Candidates a ballot leaves off hold the ``unranked``
+    sentinel, which compares greater than every real position, so "a is ranked before b" is a
+    plain integer comparison. Skipped positions are condensed away and candidates tied on a
+    ballot share a position.
+
+    Attributes:
+        candidates (tuple[str, ...]): The candidate index table.
+        ranks (np.ndarray): Array of shape (n_ballots, n_candidates) with the position of each
+            candidate on each ballot.
+        weights (np.ndarray): Array of shape (n_ballots,) with the weight of each ballot.
+        max_ranking_length (int): The maximum ranking length of the source profile.
+    """
+
+    candidates: tuple[str, ...]
+    ranks: np.ndarray
+    weights: np.ndarray
+    max_ranking_length: int
+
+    @classmethod
+    def from_profile(
+        cls, profile: PreferenceProfile, deduplicate: bool = False
+    ) -> "CompactProfile":
+        """
+        Builds the compact representation of a ranked profile.
+
+        Args:
+            profile (PreferenceProfile): The profile to encode.
+            deduplicate (bool, optional): Whether to group identical ballots, as
+                ``deduplicate`` does. Defaults to False, which keeps one row per row of the
+                profile.
+
+        Returns:
+            CompactProfile: The encoded profile.
+        """
+        candidates = tuple(profile.candidates)
+        cand_index = {c: i for i, c in enumerate(candidates)}
+        max_ranking_length = profile.max_ranking_length
+        n_ballots = len(profile.df)
+
+        weights = profile.df["Weight"].to_numpy(dtype=np.float64)
+        cells = profile.df[
+            [f"Ranking_{i}" for i in range(1, max_ranking_length + 1)]
+        ].to_numpy(dtype=object)
+        ranks = _encode_ranking_cells(
+            cells.reshape(n_ballots, max_ranking_length), cand_index, max_ranking_length
+        )
+
+        compact_profile = cls(
+            candidates=candidates,
+            ranks=ranks,
+            weights=weights,
+            max_ranking_length=max_ranking_length,
+        )
+        return compact_profile.deduplicate() if deduplicate else compact_profile
+
+    @property
+    def unranked(self) -> int:
+        """
+        The sentinel position held by candidates that a ballot does not rank.
+        """
+        return int(np.iinfo(self.ranks.dtype).max)
+
+    @property
+    def n_ballots(self) -> int:
+        return self.ranks.shape[0]
+
+    @property
+    def n_candidates(self) -> int:
+        return len(self.candidates)
+
+    @property
+    def total_weight(self) -> float:
+        return float(self.weights.sum())
+
+    @cached_property
+    def candidates_cast(self) -> tuple[str, ...]:
+        """
+        Candidates ranked on at least one ballot with positive weight, in index order.
+        """
+        cast = ((self.ranks != self.unranked) & (self.weights > 0)[:, None]).any(axis=0)
+        return tuple(c for c, is_cast in zip(self.candidates, cast) if is_cast)
+
+    @cached_property
+    def has_ties(self) -> bool:
+        """
+        Whether any ballot ranks two candidates at the same position.
+        """
+        if self.n_candidates < 2:
+            return False
+        sorted_ranks = np.sort(self.ranks, axis=1)
+        return bool(
+            (
+                (sorted_ranks[:, 1:] == sorted_ranks[:, :-1])
+                & (sorted_ranks[:, 1:] != self.unranked)
+            ).any()
+        )
+
+    def candidate_indices(self, candidates: Union[str, Sequence[str]]) -> np.ndarray:
+        """
+        Looks up the indices of the given candidate(s) in the candidate table.
+
+        Args:
+            candidates (Union[str, Sequence[str]]): A candidate or a sequence of candidates.
+
+        Returns:
+            np.ndarray: The indices of the candidates.
+        """
+        if isinstance(candidates, str):
+            candidates = [candidates]
+        lookup = {c: i for i, c in enumerate(self.candidates)}
+        try:
+            return np.array([lookup[c] for c in candidates], dtype=np.int64)
+        except KeyError as e:
+            raise ValueError(f"Candidate {e.args[0]!r} is not in the profile.") from e
+
+    def remove(self, removed: Union[str, Sequence[str]]) -> "CompactProfileView":
+        """
+        Removes the given candidate(s), giving a view of the profile that mirrors votekit's
+        ``remove_and_condense_ranked_profile``, including keeping ``max_ranking_length``.
+        The ballots are not copied; see ``CompactProfileView``.
+
+        Args:
+            removed (Union[str, Sequence[str]]): Candidate or candidates to remove.
+
+        Returns:
+            CompactProfileView: The profile without the removed candidates.
+        """
+        keep = np.ones(self.n_candidates, dtype=bool)
+        keep[self.candidate_indices(removed)] = False
+        return CompactProfileView(self, keep)
+
+    def deduplicate(self) -> "CompactProfile":
+        """
+        Groups identical ballots into one with their summed weight, so that the elections
+        scale with the number of distinct ballots rather than the number of voters. Each
+        group takes the place of its first ballot, and ballots without weight are dropped.
+        Ballots that rank no candidate are grouped into one row like any other, so the total
+        weight the UM metrics divide by is kept.
+
+        Returns:
+            CompactProfile: The profile with one row per distinct ballot.
+        """
+        rows = self.weights > 0
+        ranks = np.ascontiguousarray(self.ranks[rows])
+        weights = self.weights[rows]
+
+        row_keys = ranks.view(np.dtype((np.void, ranks.dtype.itemsize * ranks.shape[1])))
+        _, first, inverse = np.unique(
+            row_keys.ravel(), return_index=True, return_inverse=True
+        )
+        order = np.argsort(first)
+        group = np.empty_like(order)
+        group[order] = np.arange(len(order))
+
+        return CompactProfile(
+            candidates=self.candidates,
+            ranks=ranks[first[order]],
+            weights=np.bincount(
+                group[inverse.ravel()], weights=weights, minlength=len(order)
+            ),
+            max_ranking_length=self.max_ranking_length,
+        )
+
+    def to_profile(self) -> PreferenceProfile:
+        """
+        Decodes the compact representation back into a votekit ``PreferenceProfile``.
+
+        Returns:
+            PreferenceProfile: The decoded profile.
+        """
+        order = np.argsort(self.ranks, axis=1, kind="stable")
+        sorted_ranks = np.take_along_axis(self.ranks, order, axis=1)
+        unranked = self.unranked
+
+        ballots = []
+        for cand_row, rank_row, weight in zip(order, sorted_ranks, self.weights):
+            ranking: list[set[str]] = []
+            last_position = None
+            for cand, position in zip(cand_row, rank_row):
+                if position == unranked:
+                    break
+                if position != last_position:
+                    ranking.append(set())
+                    last_position = position
+                ranking[-1].add(self.candidates[cand])
+            ballots.append(
+                Ballot(
+                    ranking=tuple(frozenset(s) for s in ranking), weight=float(weight)
+                )
+            )
+
+        return PreferenceProfile(
+            ballots=tuple(ballots),
+            candidates=self.candidates,
+            max_ranking_length=self.max_ranking_length,
+        )
+
+
+class CompactProfileView(CompactProfile):
+    """
+    A ``CompactProfile`` with some of its candidates removed, as a candidate mask over the
+    ballots of the full profile rather than a condensed copy. It can be used anywhere a
+    ``CompactProfile`` is accepted.
+
+    The rank matrix of the remaining candidates is only condensed when it is first read.
+    Ballots that rank none of the remaining candidates stay in place with weight zero, so
+    they do not count towards any tally or the total weight, just as votekit drops them.
+    Removing more candidates from a view masks the same full profile again, so a chain of
+    removals never copies the ballots. The new view remembers the one it was made from,
+    and if that view's ranks are already condensed, its own are condensed from those by
+    dropping the newly removed columns instead of starting over from the full profile.
+
+    Attributes:
+        base (CompactProfile): The full profile.
+        keep (np.ndarray): Boolean array of shape (base.n_candidates,) marking the
+            remaining candidates.
+        parent (Optional[CompactProfileView]): The view this one was made from, held until
+            the ranks are condensed.
+    """
+
+    base: CompactProfile
+    keep: np.ndarray
+    parent: Optional["CompactProfileView"]
+
+    def __init__(
+        self,
+        base: CompactProfile,
+        keep: np.ndarray,
+        parent: Optional["CompactProfileView"] = None,
+    ):
+        object.__setattr__(self, "base", base)
+        object.__setattr__(self, "keep", keep)
+        object.__setattr__(self, "parent", parent)
+
+    def __repr__(self) -> str:
+        return f"CompactProfileView(candidates={self.candidates!r}, n_ballots={self.n_ballots})"
+
+    @cached_property
+    def candidates(self) -> tuple[str, ...]:
+        return tuple(c for c, k in zip(self.base.candidates, self.keep) if k)
+
+    @property
+    def max_ranking_length(self) -> int:
+        return self.base.max_ranking_length
+
+    @property
+    def unranked(self) -> int:
+        return self.base.unranked
+
+    @property
+    def n_ballots(self) -> int:
+        return self.base.n_ballots
+
+    @cached_property
+    def is_nonempty(self) -> np.ndarray:
+        """
+        Whether each ballot ranks at least one of the remaining candidates.
+        """
+        return (self.ranks != self.unranked).any(axis=1)
+
+    @cached_property
+    def ranks(self) -> np.ndarray:
+        source_ranks, source_keep = self.base.ranks, self.keep
+        if self.parent is not None and "ranks" in self.parent.__dict__:
+            source_ranks, source_keep = self.parent.ranks, self.keep[self.parent.keep]
+        object.__setattr__(self, "parent", None)
+
+        kept = source_ranks[:, source_keep]
+        if self.base.has_ties:
+            return _condense_ranks(kept, self.unranked)
+
+        # On strict ballots each removed candidate ranked above a remaining one moves it up
+        # by exactly one position.
+        removed = source_ranks[:, ~source_keep]
+        shift = (removed[:, None, :] < kept[:, :, None]).sum(axis=2, dtype=kept.dtype)
+        return np.where(kept == self.unranked, kept, kept - shift)
+
+    @cached_property
+    def weights(self) -> np.ndarray:
+        return np.where(self.is_nonempty, self.base.weights, 0.0)
+
+    @property
+    def total_weight(self) -> float:
+        return float(self.base.weights[self.is_nonempty].sum())
+
+    @cached_property
+    def has_ties(self) -> bool:
+        # Removing candidates cannot create a tie.
+        if not self.base.has_ties:
+            return False
+        return CompactProfile.has_ties.func(self)
+
+    def remove(self, removed: Union[str, Sequence[str]]) -> "CompactProfileView":
+        keep = self.keep.copy()
+        keep[np.flatnonzero(self.keep)[self.candidate_indices(removed)]] = False
+        return CompactProfileView(self.base, keep, parent=self)
+
+    def materialize(self) -> CompactProfile:
+        """
+        Copies the view into a standalone ``CompactProfile`` without the emptied ballots.
+
+        Returns:
+            CompactProfile: The condensed profile.
+        """
+        rows = self.is_nonempty & (self.base.weights > 0)
+        return CompactProfile(
+            candidates=self.candidates,
+            ranks=self.ranks[rows],
+            weights=self.base.weights[rows],
+            max_ranking_length=self.max_ranking_length,
+        )
+
+    def to_profile(self) -> PreferenceProfile:
+        return self.materialize().to_profile()
+
+
+class SubsetViewCache:
+    """
+    A bounded LRU cache of one profile with different sets of candidates removed, for
+    walking the subset lattice. The profile for a removed set is made by removing its last
+    candidate from the cached profile for the rest of the set and regrouping the ballots,
+    so it is condensed from its parent's distinct ballots. Visiting the subsets of each
+    size in ``itertools.combinations`` order, level by level, uses each parent for a run of
+    consecutive children, so a small cache serves almost every lookup.
+
+    Args:
+        profile (CompactProfile): The full profile.
+        max_size (int, optional): Maximum number of views kept. Defaults to 32.
+
+    Attributes:
+        hits (int): Number of profiles made from a cached parent.
+        misses (int): Number of profiles whose parent had to be made first, or was the full
+            profile.
+    """
+
+    def __init__(self, profile: CompactProfile, max_size: int = 32):
+        self.profile = profile
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._views: OrderedDict = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._views)
+
+    def view(self, removed: Sequence[str]) -> CompactProfile:
+        """
+        The profile without the given candidates, with identical ballots grouped.
+
+        Args:
+            removed (Sequence[str]): Candidates to remove, in the order the lattice is
+                walked. The parent is the profile without all but the last of them.
+
+        Returns:
+            CompactProfile: The reduced profile, or the full profile if nothing is removed.
+        """
+        key = tuple(removed)
+        if not key:
+            return self.profile
+
+        view = self._views.get(key)
+        if view is not None:
+            self._views.move_to_end(key)
+            return view
+
+        if len(key) > 1 and key[:-1] in self._views:
+            self.hits += 1
+        else:
+            self.misses += 1
+        # Every view is regrouped, so its children start from its distinct ballots.
+        view = self.view(key[:-1]).remove(key[-1]).deduplicate()
+
+        self._views[key] = view
+        while len(self._views) > self.max_size:
+            self._views.popitem(last=False)
+        return view
+
+
+@dataclass(frozen=True, eq=False)
+class CompactProfileBatch:
+    """
+    Many compact profiles over the same candidates stacked into one ragged array, so that
+    their tallies can be taken for the whole batch at once instead of profile by profile.
+    The ballots of profile ``i`` are the rows ``offsets[i]:offsets[i + 1]`` of ``ranks``
+    and ``weights``, encoded as in ``CompactProfile`` with a common unranked sentinel.
+
+    Attributes:
+        candidates (tuple[str, ...]): The candidate index table shared by every profile.
+        ranks (np.ndarray): Array of shape (n_ballots, n_candidates) with the position of each
+            candidate on each ballot of every profile.
+        weights (np.ndarray): Array of shape (n_ballots,) with the weight of each ballot.
+        offsets (np.ndarray): Array of shape (n_profiles + 1,) with the first row of each
+            profile, followed by the total number of rows.
+        max_ranking_lengths (np.ndarray): Array of shape (n_profiles,) with the maximum
+            ranking length of each source profile.
+    """
+
+    candidates: tuple[str, ...]
+    ranks: np.ndarray
+    weights: np.ndarray
+    offsets: np.ndarray
+    max_ranking_lengths: np.ndarray
+
+    @classmethod
+    def from_profiles(
+        cls,
+        profiles: Sequence[Union[PreferenceProfile, CompactProfile]],
+        deduplicate: bool = True,
+    ) -> "CompactProfileBatch":
+        """
+        Encodes and stacks the profiles.
+
+        Args:
+            profiles (Sequence[Union[PreferenceProfile, CompactProfile]]): The profiles, all
+                with the same candidates in the same order.
+            deduplicate (bool, optional): Whether to group the identical ballots of each
+                profile. Defaults to True.
+
+        Returns:
+            CompactProfileBatch: The stacked profiles.
+        """
+        compact_profiles = [
+            (
+                profile
+                if isinstance(profile, CompactProfile)
+                else CompactProfile.from_profile(profile)
+            )
+            for profile in profiles
+        ]
+        if deduplicate:
+            compact_profiles = [profile.deduplicate() for profile in compact_profiles]
+        if not compact_profiles:
+            raise ValueError("A batch needs at least one profile.")
+        candidates = compact_profiles[0].candidates
+        if any(profile.candidates != candidates for profile in compact_profiles):
+            raise ValueError("Every profile in a batch must have the same candidates.")
+
+        max_ranking_lengths = np.array(
+            [profile.max_ranking_length for profile in compact_profiles], dtype=np.int64
+        )
+        dtype = _rank_dtype(int(max_ranking_lengths.max()))
+        unranked = np.iinfo(dtype).max
+        ranks = np.concatenate(
+            [
+                np.where(
+                    profile.ranks == profile.unranked, unranked, profile.ranks
+                ).astype(dtype)
+                for profile in compact_profiles
+            ]
+        )
+        n_ballots = [profile.n_ballots for profile in compact_profiles]
+
+        return cls(
+            candidates=candidates,
+            ranks=ranks,
+            weights=np.concatenate([profile.weights for profile in compact_profiles]),
+            offsets=np.concatenate([[0], np.cumsum(n_ballots)]).astype(np.int64),
+            max_ranking_lengths=max_ranking_lengths,
+        )
+
+    @property
+    def unranked(self) -> int:
+        return int(np.iinfo(self.ranks.dtype).max)
+
+    @property
+    def n_profiles(self) -> int:
+        return len(self.offsets) - 1
+
+    @property
+    def n_candidates(self) -> int:
+        return len(self.candidates)
+
+    @cached_property
+    def profile_index(self) -> np.ndarray:
+        """
+        The profile each ballot belongs to, as an array of shape (n_ballots,).
+        """
+        return np.repeat(np.arange(self.n_profiles), np.diff(self.offsets))
+
+    @cached_property
+    def total_weights(self) -> np.ndarray:
+        """
+        The total ballot weight of each profile, as an array of shape (n_profiles,).
+        """
+        return np.bincount(
+            self.profile_index, weights=self.weights, minlength=self.n_profiles
+        )
+
+    @cached_property
+    def has_ties(self) -> bool:
+        """
+        Whether any ballot in the batch ranks two candidates at the same position.
+        """
+        return CompactProfile(
+            self.candidates, self.ranks, self.weights, int(self.max_ranking_lengths.max())
+        ).has_ties
+
+    def profile(self, i: int) -> CompactProfile:
+        """
+        The i-th profile of the batch. Its rows are a view of the batch arrays.
+
+        Args:
+            i (int): Index of the profile.
+
+        Returns:
+            CompactProfile: The profile.
+        """
+        rows = slice(self.offsets[i], self.offsets[i + 1])
+        return CompactProfile(
+            candidates=self.candidates,
+            ranks=self.ranks[rows],
+            weights=self.weights[rows],
+            max_ranking_length=int(self.max_ranking_lengths[i]),
+        )
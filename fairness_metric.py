@@ -1,16 +1,89 @@
 from votekit import PreferenceProfile
 from votekit.cleaning import remove_and_condense_ranked_profile
+from votekit.elections import STV
+from collections import OrderedDict
+from dataclasses import dataclass
 from math import comb
-from itertools import combinations, product
+from itertools import combinations, islice
+from joblib import Parallel, delayed
 import numpy as np
-from typing import Any, Sequence
-from math import pi, sqrt, asin
-from voting_rules import ElectionConstructor
+import weakref
+from typing import Any, Optional, Sequence, Union
+from math import pi, sqrt, asin, log
+from statistics import NormalDist
+import time
+from array_elections import (
+    MAX_PACKED_CANDIDATES,
+    ArrayElection,
+    BallotTypes,
+    BatchPositionCounts,
+    RemovalPositionCounts,
+    STVCheckpoints,
+    approval_elections_for_subsets,
+    batch_ranking_orders,
+    bernstein_radius,
+    certified_stv_ranking,
+    positional_elections_for_seats,
+    positional_elections_without_each,
+    positional_family_elections,
+    positional_family_elections_without_each,
+    positional_scores,
+    ranking_blocks,
+    removal_gain_bounds,
+    score_vector_matrix,
+    tiebreak_score_vector,
+)
+from compact_profile import CompactProfile, CompactProfileBatch, SubsetViewCache
+from voting_rules import (
+    ElectionConstructor,
+    NativeVotingRule,
+    positional_voting_rule,
+)
+
+AnyProfile = Union[PreferenceProfile, CompactProfile]
+
+
+def _count_inversions(sequence: list[int]) -> int:
+    """
+    Counts the pairs i < j with sequence[i] > sequence[j] using a bottom-up merge sort.
+
+    Args:
+        sequence (list[int]): The sequence to count inversions in.
+
+    Returns:
+        int: The number of inversions.
+    """
+    inversions = 0
+    width = 1
+    n = len(sequence)
+    current = list(sequence)
+
+    while width < n:
+        merged = []
+        for lo in range(0, n, 2 * width):
+            left = current[lo : lo + width]
+            right = current[lo + width : lo + 2 * width]
+            i = j = 0
+            while i < len(left) and j < len(right):
+                if right[j] < left[i]:
+                    # right[j] jumps ahead of everything still waiting in left
+                    inversions += len(left) - i
+                    merged.append(right[j])
+                    j += 1
+                else:
+                    merged.append(left[i])
+                    i += 1
+            merged.extend(left[i:])
+            merged.extend(right[j:])
+        current = merged
+        width *= 2
+
+    return inversions
 
 
 def kendall_tau_distance(list1: Sequence[Any], list2: Sequence[Any]) -> int:
     """
-    Compute Kendall Tau distance between two rankings (lists).
+    Compute Kendall Tau distance between two rankings (lists) in O(n log n) time.
 
     Args:
         list1 (list): First ranking (ordered list of candidates).
@@ -25,24 +98,76 @@ def kendall_tau_distance(list1: Sequence[Any], list2: Sequence[Any]) -> int:
         list2
     ), f"Lists must have the same size, found {len(list1)} and {len(list2)} for {list1} and {list2}"
 
-    distance = 0
-    n = len(list1)
-
-    # Build position maps for fast lookup
+    # Reading list2 through the positions of list1 turns every disagreeing pair into an
+    # inversion.
     pos1 = {candidate: idx for idx, candidate in enumerate(list1)}
-    pos2 = {candidate: idx for idx, candidate in enumerate(list2)}
 
-    # Check all pairs
-    for i in range(n):
-        for j in range(i + 1, n):
-            cand_i = list1[i]
-            cand_j = list1[j]
+    return _count_inversions([pos1[candidate] for candidate in list2])
+
 
-            # Compare relative order
-            if (pos1[cand_i] - pos1[cand_j]) * (pos2[cand_i] - pos2[cand_j]) < 0:
-                distance += 1
+def kendall_tau_distances(
+    reference: Sequence[Any],
+    rankings: Union[np.ndarray, Sequence[Sequence[Any]]],
+    max_chunk_entries: int = 1 << 22,
+) -> np.ndarray:
+    """
+    Compute the Kendall Tau distance between one reference ranking and many rankings at once.
 
-    return distance
+    Every row of ``rankings`` lists items of ``reference`` and its distance is the number of
+    pairs of its items that it orders differently from ``reference``. A row that is a
+    permutation of ``reference`` therefore gets exactly ``kendall_tau_distance(reference, row)``,
+    and a row over a subset of the items is compared against ``reference`` restricted to them.
+
+    Args:
+        reference (Sequence[Any]): The reference ranking.
+        rankings (Union[np.ndarray, Sequence[Sequence[Any]]]): Array of shape
+            (n_rankings, ranking_length) of rankings. When both ``reference`` and ``rankings``
+            hold integers, the lookup is done without leaving numpy.
+        max_chunk_entries (int, optional): Upper bound on the number of pair comparisons held
+            in memory at once. Defaults to 2**22.
+
+    Returns:
+        np.ndarray: Array of shape (n_rankings,) with the distances.
+    """
+    reference = list(reference)
+    int_reference = np.asarray(reference)
+    int_rankings = np.asarray(rankings) if isinstance(rankings, np.ndarray) else None
+
+    if (
+        int_rankings is not None
+        and int_rankings.dtype.kind in "iu"
+        and int_reference.dtype.kind in "iu"
+    ):
+        if int_rankings.size and (
+            int_rankings.min() < 0 or int_rankings.max() > int_reference.max(initial=-1)
+        ):
+            raise ValueError("Rankings contain items that are not in the reference.")
+        lookup = np.full(int_reference.max(initial=-1) + 1, -1, dtype=np.int64)
+        lookup[int_reference] = np.arange(len(reference))
+        positions = lookup[int_rankings]
+    else:
+        pos = {item: idx for idx, item in enumerate(reference)}
+        positions = np.array(
+            [[pos.get(item, -1) for item in row] for row in rankings], dtype=np.int64
+        )
+
+    if positions.ndim != 2:
+        positions = positions.reshape(len(positions), -1)
+    if (positions < 0).any():
+        raise ValueError("Rankings contain items that are not in the reference.")
+
+    n_rankings, ranking_length = positions.shape
+    above, below = np.triu_indices(ranking_length, k=1)
+    chunk_size = max(1, max_chunk_entries // max(1, len(above)))
+
+    distances = np.zeros(n_rankings, dtype=np.int64)
+    for start in range(0, n_rankings, chunk_size):
+        chunk = positions[start : start + chunk_size]
+        distances[start : start + chunk_size] = (chunk[:, above] > chunk[:, below]).sum(
+            axis=1
+        )
+
+    return distances
 
 
 def __unpack_ranking_with_lexicographic_tiebreak(
@@ -94,52 +219,536 @@ def determine_weighted_ranking_vector_XAB(
     return xab_vector * weight_vector
 
 
+class ElectionCache:
+    """
+    A bounded memo of election outcomes shared by the metric functions, keyed by profile,
+    voting rule, seat count and the set of removed candidates. Only the ranking and the
+    elected candidates are kept, so entries stay small however large the profile. The least
+    recently used entries are evicted once ``max_size`` is exceeded.
+
+    Profiles are identified by object identity and held through weak references, so an
+    entry is never returned for a different profile that happens to reuse the address of a
+    collected one, and the entries of a profile are dropped once it is collected. The
+    compact encodings and pairwise preference matrices of the profiles are memoized the
+    same way, so every metric run on a profile shares one ``CompactProfile``, one pairwise
+    matrix and its elections.
+
+    Args:
+        max_size (int, optional): Maximum number of election outcomes kept. Defaults to
+            65536.
+        max_profiles (int, optional): Maximum number of compact encodings and pairwise
+            matrices kept. Defaults to 4.
+
+    Attributes:
+        hits (int): Number of lookups answered from the cache.
+        misses (int): Number of lookups that had to run an election.
+        pruned (int): Number of elections ``sigma_IIA_winner_set`` skipped because the
+            winner set provably could not change.
+    """
+
+    def __init__(self, max_size: int = 1 << 16, max_profiles: int = 4):
+        self.max_size = max_size
+        self.max_profiles = max_profiles
+        self.hits = 0
+        self.misses = 0
+        self.pruned = 0
+        self._elections: OrderedDict = OrderedDict()
+        self._compact_profiles: OrderedDict = OrderedDict()
+        self._pairwise_matrices: OrderedDict = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._elections)
+
+    def clear(self) -> None:
+        """
+        Drops every cached outcome, compact encoding and pairwise matrix and resets the
+        counters.
+        """
+        self._elections.clear()
+        self._compact_profiles.clear()
+        self._pairwise_matrices.clear()
+        self.hits = 0
+        self.misses = 0
+        self.pruned = 0
+
+    @staticmethod
+    def _lookup(entries: OrderedDict, key: tuple, profile: AnyProfile) -> Optional[Any]:
+        entry = entries.get(key)
+        if entry is None or entry[0]() is not profile:
+            return None
+        entries.move_to_end(key)
+        return entry[1]
+
+    @staticmethod
+    def _insert(
+        entries: OrderedDict, key: tuple, profile: AnyProfile, value: Any, max_size: int
+    ) -> None:
+        def evict(ref: weakref.ref) -> None:
+            # Drops the entry once its profile is collected, unless the key was reused.
+            entry = entries.get(key)
+            if entry is not None and entry[0] is ref:
+                del entries[key]
+
+        entries[key] = (weakref.ref(profile, evict), value)
+        entries.move_to_end(key)
+        while len(entries) > max_size:
+            entries.popitem(last=False)
+
+    def compact(self, profile: AnyProfile) -> CompactProfile:
+        """
+        The compact encoding of a profile, with identical ballots grouped, built once per
+        profile.
+
+        Args:
+            profile (AnyProfile): The profile to encode.
+
+        Returns:
+            CompactProfile: The encoded profile.
+        """
+        if isinstance(profile, CompactProfile):
+            return profile
+        key = (id(profile),)
+        compact_profile = self._lookup(self._compact_profiles, key, profile)
+        if compact_profile is None:
+            compact_profile = CompactProfile.from_profile(profile, deduplicate=True)
+            self._insert(
+                self._compact_profiles, key, profile, compact_profile, self.max_profiles
+            )
+        return compact_profile
+
+    def pairwise_matrix(self, profile: AnyProfile) -> np.ndarray:
+        """
+        The ``pairwise_preference_matrix`` of a profile, computed once per profile.
+
+        Args:
+            profile (AnyProfile): The profile.
+
+        Returns:
+            np.ndarray: The pairwise preference matrix. It must not be modified.
+        """
+        compact_profile = self.compact(profile)
+        key = (id(compact_profile),)
+        matrix = self._lookup(self._pairwise_matrices, key, compact_profile)
+        if matrix is None:
+            matrix = pairwise_preference_matrix(compact_profile)
+            matrix.flags.writeable = False
+            self._insert(
+                self._pairwise_matrices, key, compact_profile, matrix, self.max_profiles
+            )
+        return matrix
+
+    def get(
+        self,
+        profile: AnyProfile,
+        voting_rule: ElectionConstructor,
+        m: int,
+        removed: Sequence[str] = (),
+    ) -> Optional[ArrayElection]:
+        """
+        The cached outcome of an election, or None if it has not been run.
+        """
+        key = (id(profile), voting_rule, m, frozenset(removed))
+        election = self._lookup(self._elections, key, profile)
+        if election is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return election
+
+    def put(
+        self,
+        profile: AnyProfile,
+        voting_rule: ElectionConstructor,
+        m: int,
+        removed: Sequence[str],
+        election: Any,
+    ) -> ArrayElection:
+        """
+        Stores the ranking and elected candidates of an election outcome.
+
+        Returns:
+            ArrayElection: The stored outcome.
+        """
+        outcome = ArrayElection(
+            ranking=tuple(election.get_ranking()),
+            elected=tuple(election.get_elected()),
+        )
+        key = (id(profile), voting_rule, m, frozenset(removed))
+        self._insert(self._elections, key, profile, outcome, self.max_size)
+        return outcome
+
+    def election(
+        self,
+        profile: AnyProfile,
+        voting_rule: ElectionConstructor,
+        m: int,
+        removed: Sequence[str] = (),
+    ) -> ArrayElection:
+        """
+        Runs the voting rule on the profile without the removed candidates, unless the same
+        election has already been run.
+
+        Args:
+            profile (AnyProfile): The full profile.
+            voting_rule (ElectionConstructor): The voting rule.
+            m (int): Number of seats to elect.
+            removed (Sequence[str], optional): Candidates removed before the election.
+                Defaults to none.
+
+        Returns:
+            ArrayElection: The ranking and elected candidates of the election.
+        """
+        election = self.get(profile, voting_rule, m, removed)
+        if election is None:
+            reduced = _remove_candidates(list(removed), profile) if removed else profile
+            election = self.put(
+                profile, voting_rule, m, removed, voting_rule(reduced, m=m)
+            )
+        return election
+
+
+# Used by the metric functions when they are not handed a cache of their own.
+default_election_cache = ElectionCache()
+
+
+def _as_compact(profile: AnyProfile) -> CompactProfile:
+    if isinstance(profile, CompactProfile):
+        return profile
+    return CompactProfile.from_profile(profile)
+
+
+def _profile_for_rule(
+    profile: AnyProfile, voting_rule: ElectionConstructor, cache: ElectionCache
+) -> AnyProfile:
+    """
+    Native rules run on compact profiles, so they are handed one that is built up front and
+    then condensed with array operations for every removal.
+    """
+    if isinstance(voting_rule, NativeVotingRule):
+        return cache.compact(profile)
+    return profile
+
+
+def _remove_candidates(removed: Union[Any, list], profile: AnyProfile) -> AnyProfile:
+    """
+    Removes the given candidate(s) from either kind of profile and condenses the rankings.
+    Compact profiles are regrouped afterwards, since condensing makes ballots that differed
+    only in the removed candidates identical.
+    """
+    if isinstance(profile, CompactProfile):
+        return profile.remove(removed).deduplicate()
+    return remove_and_condense_ranked_profile(removed, profile)
+
+
+def _has_exact_positional_scores(
+    profile: CompactProfile, score_vectors: Sequence[Optional[Sequence[float]]]
+) -> bool:
+    """
+    Whether the positional scores of a profile are integers, so that they come out the same
+    however the points are summed and tie exactly as in the condensed profiles.
+    """
+    return np.array_equal(profile.weights, np.round(profile.weights)) and all(
+        score_vector is None
+        or all(float(points).is_integer() for points in score_vector)
+        for score_vector in score_vectors
+    )
+
+
+def _elections_without_each(
+    profile: AnyProfile,
+    voting_rule: ElectionConstructor,
+    seats: list[Optional[int]],
+    cache: ElectionCache,
+) -> list:
+    """
+    Runs the voting rule on the profile without each candidate in turn, electing
+    ``seats[i]`` seats when ``profile.candidates[i]`` is removed and skipping the candidates
+    whose seat count is None. Native positional rules on integer weights read every outcome
+    off a single ``RemovalPositionCounts`` instead of condensing the profile C times, and
+    native STV restarts each removal from the recorded rounds of an ``STVCheckpoints``.
+    """
+    cached = [
+        None if m is None else cache.get(profile, voting_rule, m, (candidate,))
+        for candidate, m in zip(profile.candidates, seats)
+    ]
+    missing = [
+        None if m is None or election is not None else m
+        for m, election in zip(seats, cached)
+    ]
+    if all(m is None for m in missing):
+        return cached
+
+    if (
+        isinstance(voting_rule, NativeVotingRule)
+        and voting_rule.is_positional
+        and not profile.has_ties
+        and _has_exact_positional_scores(profile, [voting_rule.score_vector])
+    ):
+        computed = positional_elections_without_each(
+            RemovalPositionCounts.from_profile(profile),
+            missing,
+            voting_rule.score_vector,
+            voting_rule.tiebreak,
+        )
+    elif (
+        isinstance(voting_rule, NativeVotingRule)
+        and voting_rule.name == "stv"
+        and not profile.has_ties
+    ):
+        # Removals sharing a seat count restart from the rounds of one recorded count.
+        checkpoints = {
+            m: STVCheckpoints.from_profile(profile, m)
+            for m in set(missing)
+            if m is not None and missing.count(m) > 1
+        }
+        computed = [
+            (
+                None
+                if m is None
+                else (
+                    checkpoints[m].election_without(candidate)
+                    if m in checkpoints
+                    else voting_rule(_remove_candidates(candidate, profile), m=m)
+                )
+            )
+            for candidate, m in zip(profile.candidates, missing)
+        ]
+    else:
+        computed = [
+            (
+                None
+                if m is None
+                else voting_rule(_remove_candidates(candidate, profile), m=m)
+            )
+            for candidate, m in zip(profile.candidates, missing)
+        ]
+
+    return [
+        (
+            cached_election
+            if m is None
+            else cache.put(profile, voting_rule, m, (candidate,), election)
+        )
+        for candidate, m, cached_election, election in zip(
+            profile.candidates, missing, cached, computed
+        )
+    ]
+
+
+def _provably_unchanged_removals(
+    profile: AnyProfile,
+    voting_rule: ElectionConstructor,
+    seats: list[Optional[int]],
+    original_winners: set[frozenset[str]],
+    cache: ElectionCache,
+) -> list[bool]:
+    """
+    Marks the removals that cannot change the winner set of a positional rule. Removing a
+    candidate never lowers a score, and raises the others by at most ``removal_gain_bounds``,
+    so if the remaining winners still lead every loser by more than that bound, they keep
+    their seats without running the election.
+    """
+    unknown = [False] * len(seats)
+    if not getattr(voting_rule, "is_positional", False):
+        return unknown
+    compact_profile = cache.compact(profile)
+    if compact_profile.has_ties:
+        return unknown
+    try:
+        bounds = removal_gain_bounds(compact_profile, voting_rule.score_vector)
+    except ValueError:
+        return unknown
+    scores = positional_scores(compact_profile, voting_rule.score_vector)
+
+    is_winner = np.array(
+        [frozenset({c}) in original_winners for c in compact_profile.candidates]
+    )
+    # Leaves room for rounding in the sums of fractional weights.
+    tolerance = 1e-9 * (1 + np.abs(scores).max(initial=0))
+    unchanged = []
+    for r, m in enumerate(seats):
+        others = np.ones(len(seats), dtype=bool)
+        others[r] = False
+        winner_scores = scores[others & is_winner]
+        loser_scores = scores[others & ~is_winner]
+        unchanged.append(
+            m is not None
+            and len(winner_scores) > 0
+            and winner_scores.min() > loser_scores.max(initial=0) + bounds[r] + tolerance
+        )
+    return unchanged
+
+
+def pairwise_preference_matrix(
+    profile: AnyProfile, max_chunk_entries: int = 1 << 22
+) -> np.ndarray:
+    """
+    Computes, in a single pass over the ballots, the weighted matrix whose (a, b) entry is the
+    total of ``determine_weighted_ranking_vector_XAB`` for candidates a and b. That is, every
+    ballot adds its weight if it ranks a strictly before b, and half its weight if a and b share
+    a position or are both absent.
+
+    Args:
+        profile (AnyProfile): The preference profile.
+        max_chunk_entries (int, optional): Upper bound on the number of ballot-pair comparisons
+            held in memory at once. Defaults to 2**22.
+
+    Returns:
+        np.ndarray: Array of shape (n_candidates, n_candidates), indexed like
+            ``CompactProfile.candidates``.
+    """
+    compact_profile = _as_compact(profile)
+    n_cands = compact_profile.n_candidates
+    chunk_size = max(1, max_chunk_entries // max(1, n_cands * n_cands))
+
+    matrix = np.zeros((n_cands, n_cands))
+    for start in range(0, compact_profile.n_ballots, chunk_size):
+        ranks = compact_profile.ranks[start : start + chunk_size]
+        weights = compact_profile.weights[start : start + chunk_size]
+
+        a_pos = ranks[:, :, None]
+        b_pos = ranks[:, None, :]
+        matrix += (weights @ (a_pos < b_pos).reshape(len(weights), -1)).reshape(
+            n_cands, n_cands
+        )
+        matrix += 0.5 * (weights @ (a_pos == b_pos).reshape(len(weights), -1)).reshape(
+            n_cands, n_cands
+        )
+
+    return matrix
+
+
+def batch_pairwise_preference_matrices(
+    batch: CompactProfileBatch, max_chunk_entries: int = 1 << 22
+) -> np.ndarray:
+    """
+    The ``pairwise_preference_matrix`` of every profile in a batch, accumulated for the
+    whole batch at once.
+
+    Args:
+        batch (CompactProfileBatch): The profiles.
+        max_chunk_entries (int, optional): Upper bound on the number of ballot-pair comparisons
+            held in memory at once. Defaults to 2**22.
+
+    Returns:
+        np.ndarray: Array of shape (n_profiles, n_candidates, n_candidates).
+    """
+    n_profiles, n_cands = batch.n_profiles, batch.n_candidates
+    chunk_size = max(1, max_chunk_entries // max(1, n_cands * n_cands))
+    pair_index = np.arange(n_cands * n_cands)
+
+    matrices = np.zeros(n_profiles * n_cands * n_cands)
+    for start in range(0, len(batch.weights), chunk_size):
+        ranks = batch.ranks[start : start + chunk_size]
+        weights = batch.weights[start : start + chunk_size]
+        profile_rows = batch.profile_index[start : start + chunk_size]
+
+        a_pos = ranks[:, :, None]
+        b_pos = ranks[:, None, :]
+        preference = (a_pos < b_pos) + 0.5 * (a_pos == b_pos)
+        matrices += np.bincount(
+            (profile_rows[:, None] * n_cands * n_cands + pair_index).ravel(),
+            weights=(preference.reshape(len(weights), -1) * weights[:, None]).ravel(),
+            minlength=len(matrices),
+        )
+
+    return matrices.reshape(n_profiles, n_cands, n_cands)
+
+
+def replicate_pairwise_preference_matrices(
+    profile: AnyProfile, weights: np.ndarray, max_chunk_entries: int = 1 << 22
+) -> np.ndarray:
+    """
+    The ``pairwise_preference_matrix`` of many reweightings of the same ballots, such as
+    bootstrap replicates, as one product of the weight matrix with the pairwise comparisons
+    of the ballots.
+
+    Args:
+        profile (AnyProfile): The ballots.
+        weights (np.ndarray): Array of shape (n_replicates, n_ballots) whose row i holds the
+            ballot weights of replicate i, in the row order of the compact profile.
+        max_chunk_entries (int, optional): Upper bound on the number of ballot-pair comparisons
+            held in memory at once. Defaults to 2**22.
+
+    Returns:
+        np.ndarray: Array of shape (n_replicates, n_candidates, n_candidates).
+    """
+    compact_profile = _as_compact(profile)
+    n_cands = compact_profile.n_candidates
+    chunk_size = max(1, max_chunk_entries // max(1, n_cands * n_cands))
+
+    matrices = np.zeros((weights.shape[0], n_cands * n_cands))
+    for start in range(0, compact_profile.n_ballots, chunk_size):
+        ranks = compact_profile.ranks[start : start + chunk_size]
+        a_pos = ranks[:, :, None]
+        b_pos = ranks[:, None, :]
+        preference = (a_pos < b_pos) + 0.5 * (a_pos == b_pos)
+        matrices += weights[:, start : start + chunk_size] @ preference.reshape(
+            len(ranks), -1
+        )
+
+    return matrices.reshape(-1, n_cands, n_cands)
+
+
+def _sigma_from_misalignment(misalignment: float) -> float:
+    return float((2 / pi) * asin(sqrt(2 * misalignment)) if misalignment < 1 / 2 else 1)
+
+
 def number_of_voters(
-    profile: PreferenceProfile, voting_rule: ElectionConstructor, n_seats: int
+    profile: AnyProfile,
+    voting_rule: ElectionConstructor,
+    n_seats: int,
+    cache: Optional[ElectionCache] = None,
 ) -> float:
+    if isinstance(profile, CompactProfile):
+        return profile.total_weight
     return float(profile.df["Weight"].sum())
 
 
 def sigma_UM(
-    profile: PreferenceProfile, voting_rule: ElectionConstructor, n_seats: int
+    profile: AnyProfile,
+    voting_rule: ElectionConstructor,
+    n_seats: int,
+    cache: Optional[ElectionCache] = None,
 ) -> float:
     """
     Computes the extended Unanimity Majoritarian (UM) score, which we call sigma_UM here.
     See https://arxiv.org/pdf/2506.12961 for details.
 
     Args:
-        profile (PreferenceProfile): The preference profile to score.
+        profile (AnyProfile): The preference profile to score, either as a votekit
+            ``PreferenceProfile`` or as an already built ``CompactProfile``.
         voting_rule (Election): The voting rule to apply to the profile.
+        cache (Optional[ElectionCache], optional): Cache of election outcomes shared with
+            the other metrics. Defaults to None, which uses ``default_election_cache``.
 
     Returns:
         float: The sigma_UM score which is a value between 0 and 1.
     """
 
+    if cache is None:
+        cache = default_election_cache
+    profile = _profile_for_rule(profile, voting_rule, cache)
     original_ranking = __unpack_ranking_with_lexicographic_tiebreak(
-        voting_rule(profile=profile, m=n_seats).get_ranking()
+        cache.election(profile, voting_rule, n_seats).get_ranking()
     )
 
-    weight_vector = profile.df["Weight"].to_numpy()
-    n_voters = weight_vector.sum()
+    compact_profile = cache.compact(profile)
+    alignment = cache.pairwise_matrix(compact_profile) / compact_profile.total_weight
 
-    ranking_array = profile.df[
-        [f"Ranking_{i}" for i in range(1, profile.max_ranking_length + 1)]
-    ].to_numpy()
+    # Row i of the upper triangle pairs the i-th ranked candidate with everyone below them.
+    order = compact_profile.candidate_indices([c for s in original_ranking for c in s])
+    above, below = np.triu_indices(len(order), k=1)
+    misalignment = min(1, alignment[order[above], order[below]].min(initial=1))
 
-    misalignment = 1
-
-    for rank1, rank2 in combinations(original_ranking, 2):
-        weighted_ranking_vector = determine_weighted_ranking_vector_XAB(
-            ranking_array, weight_vector, rank1, rank2
-        )
-        alignment_IAB = (1 / n_voters) * np.linalg.norm(weighted_ranking_vector, ord=1)
-        misalignment = min(misalignment, alignment_IAB)
-
-    return float((2 / pi) * asin(sqrt(2 * misalignment)) if misalignment < 1 / 2 else 1)
+    return _sigma_from_misalignment(misalignment)
 
 
 def sigma_IIA(
-    profile: PreferenceProfile, voting_rule: ElectionConstructor, n_seats: int
+    profile: AnyProfile,
+    voting_rule: ElectionConstructor,
+    n_seats: int,
+    cache: Optional[ElectionCache] = None,
 ) -> float:
     """
     Computes the extended Independence of Irrelevant Alternatives (IIA) score,
@@ -147,27 +756,34 @@ def sigma_IIA(
     See https://arxiv.org/pdf/2506.12961 for details.
 
     Args:
-        profile (PreferenceProfile): The preference profile to score.
+        profile (AnyProfile): The preference profile to score, either as a votekit
+            ``PreferenceProfile`` or as an already built ``CompactProfile``.
         voting_rule (Election): The voting rule to apply to the profile.
+        cache (Optional[ElectionCache], optional): Cache of election outcomes shared with
+            the other metrics. Defaults to None, which uses ``default_election_cache``.
 
     Returns:
         float: The sigma_IIA score which is a value between 0 and 1.
     """
+    if cache is None:
+        cache = default_election_cache
+    profile = _profile_for_rule(profile, voting_rule, cache)
     n_candidates = len(profile.candidates)
-    ranking_before_unpaking = voting_rule(profile=profile, m=n_seats).get_ranking()
+    ranking_before_unpaking = cache.election(profile, voting_rule, n_seats).get_ranking()
     original_ranking = __unpack_ranking_with_lexicographic_tiebreak(
         ranking_before_unpaking
     )
     total_kendall_distance = 0
+    elections_without_cand = _elections_without_each(
+        profile, voting_rule, [n_seats] * n_candidates, cache
+    )
 
-    for candidate in profile.candidates:
+    for candidate, election in zip(profile.candidates, elections_without_cand):
         original_ranking_without_cand = [
             c_set for c_set in original_ranking if candidate not in c_set
         ]
 
-        voting_ranking_without_cand_before_unpacking = voting_rule(
-            remove_and_condense_ranked_profile(candidate, profile), m=n_seats
-        ).get_ranking()
+        voting_ranking_without_cand_before_unpacking = election.get_ranking()
         voting_ranking_without_cand = __unpack_ranking_with_lexicographic_tiebreak(
             voting_ranking_without_cand_before_unpacking
         )
@@ -181,8 +797,370 @@ def sigma_IIA(
     return 1 - total_kendall_distance / (n_candidates * comb(n_candidates - 1, 2))
 
 
+def _has_complete_integer_ballots(profile: CompactProfile) -> bool:
+    """
+    Whether every ballot with positive weight ranks all candidates strictly and every weight
+    is an integer, so that Borda scores can be read off the pairwise matrix exactly.
+    """
+    return (
+        not profile.has_ties
+        and bool((profile.ranks[profile.weights > 0] != profile.unranked).all())
+        and np.array_equal(profile.weights, np.round(profile.weights))
+    )
+
+
+def _borda_subset_level_distance(
+    profile: CompactProfile,
+    wins: np.ndarray,
+    original_position: np.ndarray,
+    name_order: np.ndarray,
+    n_removed: int,
+    n_seats: int,
+    max_chunk_entries: int = 1 << 22,
+) -> int:
+    """
+    Sums the Kendall tau distances between the original ranking and the native Borda
+    rankings after removing each subset of ``n_removed`` candidates, for a profile of
+    complete ballots.
+
+    On a complete ballot, removing candidates lowers the positions of the others by the
+    number of removed candidates ranked above them, so a candidate's Borda score over the
+    remaining set R is a constant plus its pairwise wins against R. The rankings of every
+    subset then follow from the pairwise matrix, with the first-place tiebreak evaluated
+    only for the subsets whose scores tie across the last seat.
+
+    Args:
+        profile (CompactProfile): Profile of complete ballots with integer weights.
+        wins (np.ndarray): The pairwise preference matrix with a zero diagonal.
+        original_position (np.ndarray): Position of each candidate in the unpacked original
+            ranking.
+        name_order (np.ndarray): Position of each candidate in lexicographic order.
+        n_removed (int): Number of candidates removed.
+        n_seats (int): Number of seats in the original election.
+        max_chunk_entries (int, optional): Upper bound on the number of subset-pair entries
+            held in memory at once. Defaults to 2**22.
+
+    Returns:
+        int: The sum of the distances over all subsets of the given size.
+    """
+    n_cands = profile.n_candidates
+    n_open = min(n_seats, n_cands - n_removed)
+    removed_subsets = np.array(list(combinations(range(n_cands), n_removed)), dtype=np.int64)
+    chunk_size = max(1, max_chunk_entries // (n_cands * n_cands))
+
+    # Pairs (a, b) with a ahead of b in the original ranking.
+    orig_before = original_position[:, None] < original_position[None, :]
+    lex_before = name_order[:, None] < name_order[None, :]
+
+    total = 0
+    for start in range(0, len(removed_subsets), chunk_size):
+        removed = removed_subsets[start : start + chunk_size]
+        n_subsets = len(removed)
+        keep = np.ones((n_subsets, n_cands), dtype=bool)
+        keep[np.arange(n_subsets)[:, None], removed] = False
+
+        scores = keep @ wins.T
+        tiebreak = np.zeros_like(scores)
+
+        if n_open < n_cands - n_removed:
+            sorted_scores = -np.sort(np.where(keep, -scores, np.inf), axis=1)
+            straddles = sorted_scores[:, n_open - 1] == sorted_scores[:, n_open]
+            for s in np.flatnonzero(straddles):
+                ranks = np.where(keep[s], profile.ranks, profile.unranked)
+                first = np.bincount(
+                    ranks.argmin(axis=1), weights=profile.weights, minlength=n_cands
+                )
+                boundary = keep[s] & (scores[s] == sorted_scores[s, n_open - 1])
+                tiebreak[s] = np.where(boundary, first, 0)
+
+        # b is placed ahead of a when it scores higher, then wins the tiebreak, then comes
+        # first lexicographically.
+        sa, sb = scores[:, :, None], scores[:, None, :]
+        ta, tb = tiebreak[:, :, None], tiebreak[:, None, :]
+        b_ahead = (sb > sa) | (
+            (sb == sa) & ((tb > ta) | ((tb == ta) & ~lex_before[None, :, :]))
+        )
+        discordant = b_ahead & orig_before[None, :, :] & keep[:, :, None] & keep[:, None, :]
+        total += int(discordant.sum())
+
+    return total
+
+
+def _subset_ranking_positions(
+    profile: AnyProfile,
+    voting_rule: ElectionConstructor,
+    n_seats: int,
+    original_ranking: tuple[frozenset, ...],
+    candidate_subset: tuple[str, ...],
+    cache: ElectionCache,
+    views: Optional[SubsetViewCache] = None,
+) -> list[int]:
+    """
+    Positions in the original ranking of the candidates, in the order of the ranking after
+    removing ``candidate_subset``. The reduced profile is taken from ``views`` when given.
+    """
+    n_remaining = sum(
+        1
+        for c_set in original_ranking
+        if not any(cand in c_set for cand in candidate_subset)
+    )
+
+    m = min(n_seats, len(profile.candidates) - len(candidate_subset))
+    election = cache.get(profile, voting_rule, m, candidate_subset)
+    if election is None:
+        reduced = (
+            views.view(candidate_subset)
+            if views is not None
+            else _remove_candidates(list(candidate_subset), profile)
+        )
+        election = cache.put(
+            profile, voting_rule, m, candidate_subset, voting_rule(reduced, m=m)
+        )
+    voting_ranking_without_cand = __unpack_ranking_with_lexicographic_tiebreak(
+        election.get_ranking()
+    )
+    assert n_remaining == len(voting_ranking_without_cand), (
+        f"Rankings must have the same size, found {n_remaining} and "
+        f"{len(voting_ranking_without_cand)} after removing {candidate_subset}"
+    )
+
+    original_position = {c_set: idx for idx, c_set in enumerate(original_ranking)}
+    return [original_position[c_set] for c_set in voting_ranking_without_cand]
+
+
+def _ranking_distances(rankings: list[list[int]], n_candidates: int) -> np.ndarray:
+    """
+    The Kendall tau distances between the original ranking and rankings given as positions
+    in it, one per ranking. Rankings are batched by length, since they are shorter when the
+    election leaves out candidates that no ballot ranks.
+    """
+    distances = np.zeros(len(rankings), dtype=np.int64)
+    by_length: dict[int, list[int]] = {}
+    for idx, ranking in enumerate(rankings):
+        by_length.setdefault(len(ranking), []).append(idx)
+
+    # Every ranking is a subsequence of the original positions, so the original ranking
+    # serves as the common reference.
+    for rows in by_length.values():
+        distances[rows] = kendall_tau_distances(
+            range(n_candidates), np.array([rankings[idx] for idx in rows], dtype=np.int64)
+        )
+    return distances
+
+
+def _level_distance(level_rankings: list[list[int]], n_candidates: int) -> int:
+    """
+    Sums the Kendall tau distances between the original ranking and rankings given as
+    positions in it.
+    """
+    return int(_ranking_distances(level_rankings, n_candidates).sum())
+
+
+def _subset_range_distance(
+    profile: AnyProfile,
+    voting_rule: ElectionConstructor,
+    n_seats: int,
+    original_ranking: tuple[frozenset, ...],
+    n_removed: int,
+    start: int,
+    stop: Optional[int],
+    cache: Optional[ElectionCache] = None,
+) -> int:
+    """
+    Sums the Kendall tau distances between the original ranking and the rankings after
+    removing the subsets of ``n_removed`` candidates with indices ``start`` to ``stop`` in
+    the order of ``itertools.combinations``. Compact profiles are condensed through a
+    ``SubsetViewCache``, so consecutive subsets sharing all but their last candidate start
+    from the same parent view.
+    """
+    if cache is None:
+        cache = ElectionCache()
+    views = SubsetViewCache(profile) if isinstance(profile, CompactProfile) else None
+
+    level_rankings = [
+        _subset_ranking_positions(
+            profile, voting_rule, n_seats, original_ranking, candidate_subset, cache, views
+        )
+        for candidate_subset in islice(
+            combinations(profile.candidates, n_removed), start, stop
+        )
+    ]
+    return _level_distance(level_rankings, len(profile.candidates))
+
+
+def _subset_lattice_distances(
+    profile: CompactProfile,
+    voting_rule: ElectionConstructor,
+    n_seats: int,
+    original_ranking: tuple[frozenset, ...],
+    cache: ElectionCache,
+    n_levels: int,
+) -> list[int]:
+    """
+    Computes the same per-level distance sums as ``_subset_range_distance`` for the subsets
+    of 1 to ``n_levels`` candidates, walking the subset lattice depth first. Each subset is
+    condensed from the view of its parent, which the walk has just visited, so a
+    ``SubsetViewCache`` holding a few times the depth of the lattice serves every lookup.
+    Within each level the subsets are still visited in the order of
+    ``itertools.combinations``.
+    """
+    candidates = profile.candidates
+    n_candidates = len(candidates)
+    views = SubsetViewCache(profile, max_size=2 * n_candidates)
+    level_rankings: list[list[list[int]]] = [[] for _ in range(n_levels)]
+
+    def visit(subset: tuple[str, ...], start: int):
+        if len(subset) == n_levels:
+            return
+        for k in range(start, n_candidates):
+            child = subset + (candidates[k],)
+            level_rankings[len(subset)].append(
+                _subset_ranking_positions(
+                    profile, voting_rule, n_seats, original_ranking, child, cache, views
+                )
+            )
+            visit(child, k + 1)
+
+    visit((), 0)
+    return [_level_distance(rankings, n_candidates) for rankings in level_rankings]
+
+
+def _approval_subset_level_distances(
+    profile: CompactProfile,
+    voting_rule: NativeVotingRule,
+    n_seats: int,
+    original_ranking: tuple[frozenset, ...],
+    n_levels: int,
+) -> list[int]:
+    """
+    Computes the same per-level distance sums as ``_subset_range_distance`` for a native
+    k-approval rule, running the elections on every subset of 1 to ``n_levels`` removed
+    candidates from one batched computation over the ballot types.
+    """
+    candidates = profile.candidates
+    n_candidates = len(candidates)
+    full_mask = (1 << n_candidates) - 1
+    original_position = {c_set: idx for idx, c_set in enumerate(original_ranking)}
+
+    subsets = [
+        (i, subset)
+        for i in range(1, n_levels + 1)
+        for subset in combinations(range(n_candidates), i)
+    ]
+    elections = approval_elections_for_subsets(
+        BallotTypes.from_profile(profile),
+        voting_rule.approval_depth,
+        voting_rule.tiebreak,
+        [full_mask ^ sum(1 << k for k in subset) for _, subset in subsets],
+        [min(n_seats, n_candidates - i) for i, _ in subsets],
+    )
+
+    level_rankings: list[list[list[int]]] = [[] for _ in range(n_levels)]
+    for (i, _), election in zip(subsets, elections):
+        level_rankings[i - 1].append(
+            [
+                original_position[c_set]
+                for c_set in __unpack_ranking_with_lexicographic_tiebreak(
+                    election.get_ranking()
+                )
+            ]
+        )
+    return [_level_distance(rankings, n_candidates) for rankings in level_rankings]
+
+
+def _all_subset_level_distances(
+    profile: AnyProfile,
+    voting_rule: ElectionConstructor,
+    n_seats: int,
+    original_ranking: tuple[frozenset, ...],
+    cache: ElectionCache,
+    n_jobs: int = 1,
+    max_removed: Optional[int] = None,
+    subset_chunk_size: int = 256,
+) -> list[int]:
+    """
+    For each number of removed candidates i from 1 to n_candidates - 2, or to
+    ``max_removed`` if that is smaller, sums the Kendall tau distances between the original
+    ranking and the rankings after removing each subset of i candidates. Native Borda on
+    complete ballots is evaluated in closed form from the pairwise matrix, and native
+    k-approval on strict integer ballots in one batched computation over the ballot types.
+    Everything else reruns the election on every subset, optionally splitting the subsets
+    into chunks of ``subset_chunk_size`` run by ``n_jobs`` workers.
+    """
+    n_candidates = len(profile.candidates)
+    original_position = {c_set: idx for idx, c_set in enumerate(original_ranking)}
+    n_levels = n_candidates - 2
+    if max_removed is not None:
+        n_levels = max(0, min(n_levels, max_removed))
+
+    if (
+        isinstance(voting_rule, NativeVotingRule)
+        and voting_rule.name == "borda"
+        and _has_complete_integer_ballots(profile)
+    ):
+        wins = cache.pairwise_matrix(profile).copy()
+        np.fill_diagonal(wins, 0)
+        position = np.array(
+            [original_position[frozenset({c})] for c in profile.candidates]
+        )
+        name_order = np.argsort(np.argsort(np.array(profile.candidates)))
+        return [
+            _borda_subset_level_distance(
+                profile, wins, position, name_order, i, n_seats
+            )
+            for i in range(1, n_levels + 1)
+        ]
+
+    if (
+        isinstance(voting_rule, NativeVotingRule)
+        and voting_rule.approval_depth is not None
+        and n_candidates <= MAX_PACKED_CANDIDATES
+        and not profile.has_ties
+        and np.array_equal(profile.weights, np.round(profile.weights))
+    ):
+        return _approval_subset_level_distances(
+            profile, voting_rule, n_seats, original_ranking, n_levels
+        )
+
+    if n_jobs == 1:
+        if isinstance(profile, CompactProfile):
+            return _subset_lattice_distances(
+                profile, voting_rule, n_seats, original_ranking, cache, n_levels
+            )
+        return [
+            _subset_range_distance(
+                profile, voting_rule, n_seats, original_ranking, i, 0, None, cache
+            )
+            for i in range(1, n_levels + 1)
+        ]
+
+    # The distances are integers, so the per-level sums do not depend on how the subsets
+    # are split between the workers.
+    tasks = [
+        (i, start, start + subset_chunk_size)
+        for i in range(1, n_levels + 1)
+        for start in range(0, comb(n_candidates, i), subset_chunk_size)
+    ]
+    chunk_distances = Parallel(n_jobs=n_jobs)(
+        delayed(_subset_range_distance)(
+            profile, voting_rule, n_seats, original_ranking, i, start, stop
+        )
+        for i, start, stop in tasks
+    )
+
+    level_distances = [0] * n_levels
+    for (i, _, _), distance in zip(tasks, chunk_distances):
+        level_distances[i - 1] += distance
+    return level_distances
+
+
 def sigma_IIA_all_subset(
-    profile: PreferenceProfile, voting_rule: ElectionConstructor, n_seats: int
+    profile: AnyProfile,
+    voting_rule: ElectionConstructor,
+    n_seats: int,
+    cache: Optional[ElectionCache] = None,
+    n_jobs: int = 1,
+    max_removed: Optional[int] = None,
 ) -> float:
     """
     Computes the extended Independence of Irrelevant Alternatives (IIA) score,
@@ -190,14 +1168,26 @@ def sigma_IIA_all_subset(
     See https://arxiv.org/pdf/2506.12961 for details.
 
     Args:
-        profile (PreferenceProfile): The preference profile to score.
+        profile (AnyProfile): The preference profile to score, either as a votekit
+            ``PreferenceProfile`` or as an already built ``CompactProfile``.
         voting_rule (Election): The voting rule to apply to the profile.
+        cache (Optional[ElectionCache], optional): Cache of election outcomes shared with
+            the other metrics. Defaults to None, which uses ``default_election_cache``.
+        n_jobs (int, optional): Number of workers the subsets are split across, as in
+            ``joblib.Parallel``. The score is identical for any number of workers. Defaults
+            to 1.
+        max_removed (Optional[int], optional): Largest number of removed candidates to
+            enumerate. Larger subsets are left out of the sum, as if their distances were 0.
+            Defaults to None, which enumerates every subset.
 
     Returns:
         float: The sigma_IIA score which is a value between 0 and 1.
     """
+    if cache is None:
+        cache = default_election_cache
+    profile = _profile_for_rule(profile, voting_rule, cache)
     n_candidates = len(profile.candidates)
-    ranking_before_unpaking = voting_rule(profile=profile, m=n_seats).get_ranking()
+    ranking_before_unpaking = cache.election(profile, voting_rule, n_seats).get_ranking()
     original_ranking = __unpack_ranking_with_lexicographic_tiebreak(
         ranking_before_unpaking
     )
@@ -208,30 +1198,14 @@ def sigma_IIA_all_subset(
     # candidate remaining, the Kendall-Tau distance will always be 0. So we start
     # with subsets of size 1 and go up to n_candidates - 2.
     # So, we will take the distance in these cases to be 0.
-    for i in range(1, n_candidates - 1):
+    level_distances = _all_subset_level_distances(
+        profile, voting_rule, n_seats, original_ranking, cache, n_jobs, max_removed
+    )
+    for i, level_distance in enumerate(level_distances, start=1):
         # NOTE: The maximum Kendall-Tau distance for a subset of size n_candidates - i is
         # comb(n_candidates - i, 2)
         subset_divisor = comb(n_candidates - i, 2)
-        for candidate_subset in combinations(profile.candidates, i):
-            original_ranking_without_cand = [
-                c_set
-                for c_set in original_ranking
-                if not any(cand in c_set for cand in candidate_subset)
-            ]
-
-            voting_ranking_without_cand_before_unpacking = voting_rule(
-                remove_and_condense_ranked_profile(list(candidate_subset), profile),
-                m=min(n_seats, n_candidates - i),
-            ).get_ranking()
-            voting_ranking_without_cand = __unpack_ranking_with_lexicographic_tiebreak(
-                voting_ranking_without_cand_before_unpacking
-            )
-
-            new_dist = kendall_tau_distance(
-                original_ranking_without_cand, voting_ranking_without_cand
-            )
-
-            total_distance += new_dist / subset_divisor
+        total_distance += level_distance / subset_divisor
 
     # NOTE: This is also a viable divisor since the other subsets are trivial.
     # n_subsets = (
@@ -241,8 +1215,58 @@ def sigma_IIA_all_subset(
     return 1 - total_distance / n_subsets
 
 
+def sigma_IIA_by_depth(
+    profile: AnyProfile,
+    voting_rule: ElectionConstructor,
+    n_seats: int,
+    max_removed: Optional[int] = None,
+    cache: Optional[ElectionCache] = None,
+    n_jobs: int = 1,
+) -> list[float]:
+    """
+    Computes the IIA score separately for each number of removed candidates. The score at
+    depth i is one minus the mean over the subsets of i removed candidates of the Kendall
+    tau distance normalized by ``comb(n_candidates - i, 2)``, so depth 1 is ``sigma_IIA``
+    and the depths together are the levels summed by ``sigma_IIA_all_subset``.
+
+    Args:
+        profile (AnyProfile): The preference profile to score, either as a votekit
+            ``PreferenceProfile`` or as an already built ``CompactProfile``.
+        voting_rule (Election): The voting rule to apply to the profile.
+        n_seats (int): Number of seats to elect.
+        max_removed (Optional[int], optional): Deepest level to compute. Defaults to None,
+            which computes every level up to n_candidates - 2.
+        cache (Optional[ElectionCache], optional): Cache of election outcomes shared with
+            the other metrics. Defaults to None, which uses ``default_election_cache``.
+        n_jobs (int, optional): Number of workers the subsets are split across, as in
+            ``joblib.Parallel``. Defaults to 1.
+
+    Returns:
+        list[float]: The score for 1, 2, ... removed candidates, each between 0 and 1.
+    """
+    if cache is None:
+        cache = default_election_cache
+    profile = _profile_for_rule(profile, voting_rule, cache)
+    n_candidates = len(profile.candidates)
+    original_ranking = __unpack_ranking_with_lexicographic_tiebreak(
+        cache.election(profile, voting_rule, n_seats).get_ranking()
+    )
+
+    level_distances = _all_subset_level_distances(
+        profile, voting_rule, n_seats, original_ranking, cache, n_jobs, max_removed
+    )
+    return [
+        1 - level_distance / (comb(n_candidates, i) * comb(n_candidates - i, 2))
+        for i, level_distance in enumerate(level_distances, start=1)
+    ]
+
+
 def sigma_IIA_all_subset_v2(
-    profile: PreferenceProfile, voting_rule: ElectionConstructor, n_seats: int
+    profile: AnyProfile,
+    voting_rule: ElectionConstructor,
+    n_seats: int,
+    cache: Optional[ElectionCache] = None,
+    n_jobs: int = 1,
 ) -> float:
     """
     Computes the extended Independence of Irrelevant Alternatives (IIA) score,
@@ -250,14 +1274,23 @@ def sigma_IIA_all_subset_v2(
     See https://arxiv.org/pdf/2506.12961 for details.
 
     Args:
-        profile (PreferenceProfile): The preference profile to score.
+        profile (AnyProfile): The preference profile to score, either as a votekit
+            ``PreferenceProfile`` or as an already built ``CompactProfile``.
         voting_rule (Election): The voting rule to apply to the profile.
+        cache (Optional[ElectionCache], optional): Cache of election outcomes shared with
+            the other metrics. Defaults to None, which uses ``default_election_cache``.
+        n_jobs (int, optional): Number of workers the subsets are split across, as in
+            ``joblib.Parallel``. The score is identical for any number of workers. Defaults
+            to 1.
 
     Returns:
         float: The sigma_IIA score which is a value between 0 and 1.
     """
+    if cache is None:
+        cache = default_election_cache
+    profile = _profile_for_rule(profile, voting_rule, cache)
     n_candidates = len(profile.candidates)
-    ranking_before_unpaking = voting_rule(profile=profile, m=n_seats).get_ranking()
+    ranking_before_unpaking = cache.election(profile, voting_rule, n_seats).get_ranking()
     original_ranking = __unpack_ranking_with_lexicographic_tiebreak(
         ranking_before_unpaking
     )
@@ -269,31 +1302,15 @@ def sigma_IIA_all_subset_v2(
     # with subsets of size 1 and go up to n_candidates - 2.
     # So, we will take the distance in these cases to be 0.
     count = 0
-    for i in range(1, n_candidates - 1):
+    level_distances = _all_subset_level_distances(
+        profile, voting_rule, n_seats, original_ranking, cache, n_jobs
+    )
+    for i, level_distance in enumerate(level_distances, start=1):
         # NOTE: The maximum Kendall-Tau distance for a subset of size i is
         # comb(n_candidates - i, 2)
         subset_divisor = comb(n_candidates - i, 2)
-        for candidate_subset in combinations(profile.candidates, i):
-            count += 1
-            original_ranking_without_cand = [
-                c_set
-                for c_set in original_ranking
-                if not any(cand in c_set for cand in candidate_subset)
-            ]
-
-            voting_ranking_without_cand_before_unpacking = voting_rule(
-                remove_and_condense_ranked_profile(list(candidate_subset), profile),
-                m=min(n_seats, n_candidates - i),
-            ).get_ranking()
-            voting_ranking_without_cand = __unpack_ranking_with_lexicographic_tiebreak(
-                voting_ranking_without_cand_before_unpacking
-            )
-
-            new_dist = kendall_tau_distance(
-                original_ranking_without_cand, voting_ranking_without_cand
-            )
-
-            total_distance += new_dist / subset_divisor
+        count += comb(n_candidates, i)
+        total_distance += level_distance / subset_divisor
 
     # NOTE: This is also a viable divisor since the other subsets are trivial.
     # Remove the empty subset, the full set, and the singleton sets.
@@ -307,84 +1324,597 @@ def sigma_IIA_all_subset_v2(
     return 1 - total_distance / n_subsets
 
 
+@dataclass(frozen=True)
+class IntervalEstimate:
+    """
+    An estimate of a metric together with a confidence interval around it.
+
+    Attributes:
+        value (float): The estimate.
+        lower (float): Lower end of the confidence interval.
+        upper (float): Upper end of the confidence interval.
+        n_samples (int): Number of samples the estimate was computed from.
+    """
+
+    value: float
+    lower: float
+    upper: float
+    n_samples: int
+
+
+def sigma_IIA_all_subset_sampled(
+    profile: AnyProfile,
+    voting_rule: ElectionConstructor,
+    n_seats: int,
+    n_samples: Optional[int] = 2000,
+    time_budget: Optional[float] = None,
+    confidence: float = 0.95,
+    seed: Optional[int] = None,
+    cache: Optional[ElectionCache] = None,
+) -> IntervalEstimate:
+    """
+    Estimates ``sigma_IIA_all_subset`` from a sample of the removed subsets instead of all
+    of them. The subsets are sampled without replacement, stratified by the number of
+    removed candidates: every size gets at least two samples, and after that each sample
+    goes to the size with the smallest sampled fraction. The sampled distances of a size
+    are normalized by ``comb(n_candidates - i, 2)`` and their mean stands in for the mean
+    over all subsets of that size, so the estimate equals the exact score once every subset
+    has been sampled. The confidence interval is the normal interval of the stratified
+    mean, with the finite population correction of each size.
+
+    Args:
+        profile (AnyProfile): The preference profile to score, either as a votekit
+            ``PreferenceProfile`` or as an already built ``CompactProfile``.
+        voting_rule (Election): The voting rule to apply to the profile.
+        n_seats (int): Number of seats to elect.
+        n_samples (Optional[int], optional): Number of subsets to sample. None samples until
+            ``time_budget`` runs out. Defaults to 2000.
+        time_budget (Optional[float], optional): Wall-clock budget in seconds after which no
+            more subsets are sampled. None samples ``n_samples`` subsets. When both are
+            given, sampling stops at whichever is reached first. Defaults to None.
+        confidence (float, optional): Confidence level of the interval. Defaults to 0.95.
+        seed (Optional[int], optional): Seed of the subset sampler. Defaults to None.
+        cache (Optional[ElectionCache], optional): Cache of election outcomes shared with
+            the other metrics. Defaults to None, which uses ``default_election_cache``.
+
+    Returns:
+        IntervalEstimate: The estimated score and its confidence interval.
+    """
+    if n_samples is None and time_budget is None:
+        raise ValueError("Either n_samples or time_budget must be given.")
+    deadline = None if time_budget is None else time.perf_counter() + time_budget
+
+    if cache is None:
+        cache = default_election_cache
+    profile = _profile_for_rule(profile, voting_rule, cache)
+    candidates = profile.candidates
+    n_candidates = len(candidates)
+    original_ranking = __unpack_ranking_with_lexicographic_tiebreak(
+        cache.election(profile, voting_rule, n_seats).get_ranking()
+    )
+
+    # Same levels as sigma_IIA_all_subset: subsets of 1 to n_candidates - 2 candidates.
+    levels = list(range(1, n_candidates - 1))
+    level_sizes = np.array([comb(n_candidates, i) for i in levels])
+    rng = np.random.default_rng(seed)
+    sampled: list[dict[tuple[str, ...], list[int]]] = [{} for _ in levels]
+
+    def draw(level_index: int):
+        n_removed = levels[level_index]
+        while True:
+            indices = np.sort(rng.choice(n_candidates, n_removed, replace=False))
+            subset = tuple(candidates[k] for k in indices)
+            if subset not in sampled[level_index]:
+                break
+        sampled[level_index][subset] = _subset_ranking_positions(
+            profile, voting_rule, n_seats, original_ranking, subset, cache
+        )
+
+    for level_index in range(len(levels)):
+        for _ in range(min(2, level_sizes[level_index])):
+            draw(level_index)
+
+    n_drawn = np.array([len(level) for level in sampled])
+    while (
+        (n_samples is None or n_drawn.sum() < n_samples)
+        and (deadline is None or time.perf_counter() < deadline)
+        and (n_drawn < level_sizes).any()
+    ):
+        fraction_drawn = np.where(n_drawn < level_sizes, n_drawn / level_sizes, np.inf)
+        level_index = int(np.argmin(fraction_drawn))
+        draw(level_index)
+        n_drawn[level_index] += 1
+
+    estimate = 1.0
+    variance = 0.0
+    for level_index, n_removed in enumerate(levels):
+        distances = _ranking_distances(
+            list(sampled[level_index].values()), n_candidates
+        ) / comb(n_candidates - n_removed, 2)
+        # NOTE: Each subset weighs 1 / 2**n_candidates in the exact score, as in
+        # sigma_IIA_all_subset.
+        level_weight = level_sizes[level_index] / 2**n_candidates
+        estimate -= level_weight * distances.mean()
+
+        n_level = len(distances)
+        if n_level < level_sizes[level_index]:
+            variance += (
+                level_weight**2
+                * distances.var(ddof=1)
+                / n_level
+                * (1 - n_level / level_sizes[level_index])
+            )
+
+    half_width = NormalDist().inv_cdf((1 + confidence) / 2) * sqrt(variance)
+    return IntervalEstimate(
+        value=float(estimate),
+        lower=float(max(0.0, estimate - half_width)),
+        upper=float(min(1.0, estimate + half_width)),
+        n_samples=int(n_drawn.sum()),
+    )
+
+
+def _native_rule(voting_rule: ElectionConstructor) -> NativeVotingRule:
+    """
+    The native counterpart of a positional or STV rule, whose counts can be inspected.
+    """
+    if isinstance(voting_rule, NativeVotingRule):
+        return voting_rule
+    if getattr(voting_rule, "is_positional", False):
+        return positional_voting_rule(voting_rule.score_vector, voting_rule.tiebreak)
+    if getattr(voting_rule, "election_type", None) is STV:
+        return NativeVotingRule("stv", None, "borda")
+    raise ValueError("Subsampling supports positional rules and STV.")
+
+
+def _block_positions(
+    blocks: Optional[list[frozenset[str]]], candidates: Sequence[str]
+) -> Optional[np.ndarray]:
+    """
+    The block of every candidate in a bounded ranking, or None if some candidate is missing
+    from it.
+    """
+    if blocks is None:
+        return None
+    position = {c: i for i, block in enumerate(blocks) for c in block}
+    if any(c not in position for c in candidates):
+        return None
+    return np.array([position[c] for c in candidates])
+
+
+def _subsample_interval(
+    profile: CompactProfile,
+    sample: CompactProfile,
+    voting_rule: NativeVotingRule,
+    n_seats: int,
+    metric: str,
+    failure: float,
+) -> tuple[float, float, float]:
+    """
+    Scores a sample of the ballots of a profile and bounds the score of the full profile.
+    An empirical Bernstein bound, with a union bound over every tally and pairwise share the
+    bound relies on, puts each sampled share within its ``bernstein_radius`` of the
+    profile's share with probability at least ``1 - failure``. The radii fix the order of
+    the candidate pairs whose scores are far enough apart in each ranking, positional scores
+    directly and STV through ``certified_stv_ranking``, and the metric is bounded over every
+    order of the other pairs.
+
+    Returns:
+        tuple[float, float, float]: The score of the sample and the lower and upper bounds.
+    """
+    candidates = profile.candidates
+    n_cands = len(candidates)
+    n_drawn = sample.total_weight
+    cache = ElectionCache()
+    with_removals = metric == "sigma_IIA"
+    n_elections = 1 + (n_cands if with_removals else 0)
+
+    if voting_rule.is_positional:
+        n_tallies = n_elections * n_cands
+    else:
+        # An STV count has at most one round per candidate and the final tallies, and in
+        # every round the k lowest candidates may be excluded together.
+        n_tallies = n_elections * ((n_cands + 1) * n_cands + n_cands**3)
+    if not with_removals:
+        n_tallies += n_cands * (n_cands - 1)
+    log_term = log(4 * n_tallies / failure)
+
+    # The candidates some ballot ranks are known from the profile itself, and they are the
+    # ones every ranking holds.
+    on_ballot = profile.ranks != profile.unranked
+    cast = (on_ballot & (profile.weights > 0)[:, None]).any(axis=0)
+    ranked = [candidates[c] for c in np.flatnonzero(cast)]
+    others = [np.delete(np.arange(n_cands), r) for r in range(n_cands)]
+    if voting_rule.is_positional:
+        points = score_vector_matrix(
+            [voting_rule.score_vector], profile.max_ranking_length
+        )[0]
+        # Each ballot gives a candidate between least and most points, zero if unranked.
+        least = min(points.min(), 0)
+        spread = points.max() - least
+        counts = RemovalPositionCounts.from_profile(sample)
+
+        def bounded_ranking(scores: np.ndarray, eligible: np.ndarray):
+            eligible = eligible[cast[eligible]]
+            if not counts.cast[eligible].all():
+                return None
+            scores = scores / n_drawn
+            radius = spread * bernstein_radius(
+                (scores - least) / spread, n_drawn, log_term
+            )
+            order = eligible[np.argsort(-scores[eligible], kind="stable")]
+            return ranking_blocks(candidates, order, scores - radius, scores + radius)
+
+        original = bounded_ranking(
+            counts.scores(voting_rule.score_vector), np.arange(n_cands)
+        )
+        without = (
+            [
+                bounded_ranking(scores, others[r])
+                for r, scores in enumerate(
+                    counts.scores_without(voting_rule.score_vector)
+                )
+            ]
+            if with_removals
+            else []
+        )
+    else:
+        total_weight = profile.total_weight
+        bullet = on_ballot.sum(axis=1) == 1
+        bullet_weights = profile.weights[bullet] @ on_ballot[bullet]
+
+        def bounded_ranking(removed: tuple[str, ...], population_weight: float):
+            reduced = _remove_candidates(list(removed), sample) if removed else sample
+            checkpoints = STVCheckpoints.from_profile(reduced, n_seats)
+            # The metric below reads its elections off the recorded counts.
+            cache.put(sample, voting_rule, n_seats, removed, checkpoints.election)
+            quota = int(population_weight / (n_seats + 1) + 1)
+            return certified_stv_ranking(
+                checkpoints,
+                cast[[c not in removed for c in candidates]],
+                quota / total_weight,
+                n_drawn,
+                log_term,
+            )
+
+        original = bounded_ranking((), total_weight)
+        without = (
+            [
+                bounded_ranking((c,), total_weight - bullet_weights[r])
+                for r, c in enumerate(candidates)
+            ]
+            if with_removals
+            else []
+        )
+
+    positions = _block_positions(original, ranked)
+    if with_removals:
+        value = sigma_IIA(sample, voting_rule, n_seats, cache=cache)
+        certain = 0
+        uncertain = 0
+        for r, blocks in enumerate(without):
+            kept = [c != candidates[r] for c in ranked]
+            above, below = np.triu_indices(sum(kept), k=1)
+            removal_positions = _block_positions(
+                blocks, [c for c in ranked if c != candidates[r]]
+            )
+            if positions is None or removal_positions is None:
+                uncertain += len(above)
+                continue
+            before_positions = positions[kept]
+            before = np.sign(before_positions[above] - before_positions[below])
+            after = np.sign(removal_positions[above] - removal_positions[below])
+            known = (before != 0) & (after != 0)
+            certain += int((known & (before != after)).sum())
+            uncertain += int((~known).sum())
+        n_pairs = n_cands * comb(n_cands - 1, 2)
+        return value, 1 - (certain + uncertain) / n_pairs, 1 - certain / n_pairs
+
+    value = sigma_UM(sample, voting_rule, n_seats, cache=cache)
+    if positions is None:
+        return value, 0.0, 1.0
+    alignment = cache.pairwise_matrix(sample)[np.ix_(cast, cast)] / n_drawn
+    first, second = np.triu_indices(len(ranked), k=1)
+    forward = alignment[first, second]
+    backward = alignment[second, first]
+    forward_radius = bernstein_radius(forward, n_drawn, log_term)
+    backward_radius = bernstein_radius(backward, n_drawn, log_term)
+    # Pairs within a block may come in either order.
+    ahead = positions[first] - positions[second]
+    lowest = np.where(
+        ahead < 0,
+        forward - forward_radius,
+        np.where(
+            ahead > 0,
+            backward - backward_radius,
+            np.minimum(forward - forward_radius, backward - backward_radius),
+        ),
+    )
+    highest = np.where(
+        ahead < 0,
+        forward + forward_radius,
+        np.where(
+            ahead > 0,
+            backward + backward_radius,
+            np.maximum(forward + forward_radius, backward + backward_radius),
+        ),
+    )
+    lower = min(1, max(0, lowest.min(initial=1)))
+    upper = min(1, max(0, highest.min(initial=1)))
+    return value, _sigma_from_misalignment(lower), _sigma_from_misalignment(upper)
+
+
+def _subsampled_estimate(
+    profile: AnyProfile,
+    voting_rule: ElectionConstructor,
+    n_seats: int,
+    metric: str,
+    tolerance: float,
+    confidence: float,
+    initial_sample: int,
+    seed: Optional[int],
+    cache: Optional[ElectionCache],
+) -> IntervalEstimate:
+    if cache is None:
+        cache = default_election_cache
+    compact_profile = cache.compact(profile)
+    if compact_profile.has_ties:
+        raise ValueError("Subsampling requires ballots without ties.")
+    native_rule = _native_rule(voting_rule)
+
+    total_weight = compact_profile.total_weight
+    shares = compact_profile.weights / total_weight
+    rng = np.random.default_rng(seed)
+    draws = np.zeros(compact_profile.n_ballots, dtype=np.int64)
+    n_drawn = 0
+    n_target = initial_sample
+    n_looks = 0
+    while n_target < total_weight:
+        draws += rng.multinomial(n_target - n_drawn, shares)
+        n_drawn = n_target
+        n_looks += 1
+        kept = np.flatnonzero(draws)
+        sample = CompactProfile(
+            compact_profile.candidates,
+            compact_profile.ranks[kept],
+            draws[kept].astype(np.float64),
+            compact_profile.max_ranking_length,
+        )
+        # Halving the failure probability at every look keeps the chance that any of the
+        # intervals misses under 1 - confidence.
+        value, lower, upper = _subsample_interval(
+            compact_profile,
+            sample,
+            native_rule,
+            n_seats,
+            metric,
+            (1 - confidence) / 2**n_looks,
+        )
+        if max(value - lower, upper - value) <= tolerance:
+            return IntervalEstimate(
+                value=float(value),
+                lower=float(lower),
+                upper=float(upper),
+                n_samples=n_drawn,
+            )
+        n_target *= 2
+
+    # A sample as large as the profile saves nothing over scoring the profile itself.
+    score_function = sigma_IIA if metric == "sigma_IIA" else sigma_UM
+    value = score_function(profile, voting_rule, n_seats, cache=cache)
+    return IntervalEstimate(
+        value=float(value),
+        lower=float(value),
+        upper=float(value),
+        n_samples=int(round(total_weight)),
+    )
+
+
+def sigma_UM_subsampled(
+    profile: AnyProfile,
+    voting_rule: ElectionConstructor,
+    n_seats: int,
+    tolerance: float = 0.01,
+    confidence: float = 0.95,
+    initial_sample: int = 10_000,
+    seed: Optional[int] = None,
+    cache: Optional[ElectionCache] = None,
+) -> IntervalEstimate:
+    """
+    Estimates ``sigma_UM`` from ballots drawn at random, with replacement and in proportion
+    to their weight, for profiles too large to score in full. The interval comes from a
+    concentration bound rather than a normal approximation: by an empirical Bernstein bound
+    every pairwise share and every tally behind the ranking is within a radius of its value
+    in the full profile, the radii fix the order of the candidates far enough apart, and the
+    interval covers every order of the rest. The sample is doubled until the estimate is
+    within ``tolerance`` of both ends of the interval. Once it would be as large as the
+    total weight, the profile is scored exactly instead, with a zero-width interval.
+
+    Only positional rules and STV are supported, and the sample is counted with the native
+    engine, which reproduces the votekit rankings.
+
+    Args:
+        profile (AnyProfile): The preference profile to score, either as a votekit
+            ``PreferenceProfile`` or as an already built ``CompactProfile``. Must not contain
+            tied rankings.
+        voting_rule (Election): The voting rule to apply to the profile.
+        n_seats (int): Number of seats to elect.
+        tolerance (float, optional): Largest distance between the estimate and either end of
+            the interval. Defaults to 0.01.
+        confidence (float, optional): Probability that the interval holds the exact score,
+            across all sample sizes tried. Defaults to 0.95.
+        initial_sample (int, optional): Number of ballots drawn first. Defaults to 10000.
+        seed (Optional[int], optional): Seed of the ballot sampler. Defaults to None.
+        cache (Optional[ElectionCache], optional): Cache of election outcomes shared with
+            the other metrics. Defaults to None, which uses ``default_election_cache``.
+
+    Returns:
+        IntervalEstimate: The estimated score, its interval and the number of ballots drawn.
+    """
+    return _subsampled_estimate(
+        profile,
+        voting_rule,
+        n_seats,
+        "sigma_UM",
+        tolerance,
+        confidence,
+        initial_sample,
+        seed,
+        cache,
+    )
+
+
+def sigma_IIA_subsampled(
+    profile: AnyProfile,
+    voting_rule: ElectionConstructor,
+    n_seats: int,
+    tolerance: float = 0.01,
+    confidence: float = 0.95,
+    initial_sample: int = 10_000,
+    seed: Optional[int] = None,
+    cache: Optional[ElectionCache] = None,
+) -> IntervalEstimate:
+    """
+    Estimates ``sigma_IIA`` from ballots drawn at random, as ``sigma_UM_subsampled`` does.
+    The score only depends on the rankings, so the interval counts the candidate pairs
+    whose order is fixed by the radii in both the original ranking and the ranking
+    without a candidate, and lets every other pair go either way. The election without each
+    candidate is run on the sample only.
+
+    Args:
+        profile (AnyProfile): The preference profile to score, either as a votekit
+            ``PreferenceProfile`` or as an already built ``CompactProfile``. Must not contain
+            tied rankings.
+        voting_rule (Election): The voting rule to apply to the profile.
+        n_seats (int): Number of seats to elect.
+        tolerance (float, optional): Largest distance between the estimate and either end of
+            the interval. Defaults to 0.01.
+        confidence (float, optional): Probability that the interval holds the exact score,
+            across all sample sizes tried. Defaults to 0.95.
+        initial_sample (int, optional): Number of ballots drawn first. Defaults to 10000.
+        seed (Optional[int], optional): Seed of the ballot sampler. Defaults to None.
+        cache (Optional[ElectionCache], optional): Cache of election outcomes shared with
+            the other metrics. Defaults to None, which uses ``default_election_cache``.
+
+    Returns:
+        IntervalEstimate: The estimated score, its interval and the number of ballots drawn.
+    """
+    return _subsampled_estimate(
+        profile,
+        voting_rule,
+        n_seats,
+        "sigma_IIA",
+        tolerance,
+        confidence,
+        initial_sample,
+        seed,
+        cache,
+    )
+
+
 def sigma_UM_winner_set(
-    profile: PreferenceProfile, voting_rule: ElectionConstructor, n_seats: int
+    profile: AnyProfile,
+    voting_rule: ElectionConstructor,
+    n_seats: int,
+    cache: Optional[ElectionCache] = None,
 ) -> float:
     """
     Computes the extended Unanimity Majoritarian (UM) score with respect to the winner set.
     See https://arxiv.org/pdf/2506.12961 for details.
 
     Args:
-        profile (PreferenceProfile): The preference profile to score.
+        profile (AnyProfile): The preference profile to score, either as a votekit
+            ``PreferenceProfile`` or as an already built ``CompactProfile``.
         voting_rule (Election): The voting rule to apply to the profile.
+        cache (Optional[ElectionCache], optional): Cache of election outcomes shared with
+            the other metrics. Defaults to None, which uses ``default_election_cache``.
 
     Returns:
         float: The sigma_UM score which is a value between 0 and 1.
     """
 
+    if cache is None:
+        cache = default_election_cache
+    profile = _profile_for_rule(profile, voting_rule, cache)
     original_ranking = __unpack_ranking_with_lexicographic_tiebreak(
-        voting_rule(profile=profile, m=n_seats).get_ranking()
+        cache.election(profile, voting_rule, n_seats).get_ranking()
     )
 
-    weight_vector = profile.df["Weight"].to_numpy()
-    n_voters = weight_vector.sum()
-
-    ranking_array = profile.df[
-        [f"Ranking_{i}" for i in range(1, profile.max_ranking_length + 1)]
-    ].to_numpy()
+    compact_profile = cache.compact(profile)
+    alignment = cache.pairwise_matrix(compact_profile) / compact_profile.total_weight
 
-    misalignment = 1
+    order = compact_profile.candidate_indices([c for s in original_ranking for c in s])
+    winners = order[:n_seats]
+    losers = order[n_seats:]
 
-    winners = original_ranking[:n_seats]
-    losers = original_ranking[n_seats:]
+    misalignment = min(1, alignment[np.ix_(winners, losers)].min(initial=1))
 
-    for rank1, rank2 in product(winners, losers):
-        weighted_ranking_vector = determine_weighted_ranking_vector_XAB(
-            ranking_array, weight_vector, rank1, rank2
-        )
-        alignment_IAB = (1 / n_voters) * np.linalg.norm(weighted_ranking_vector, ord=1)
-        misalignment = min(misalignment, alignment_IAB)
-
-    return float((2 / pi) * asin(sqrt(2 * misalignment)) if misalignment < 1 / 2 else 1)
+    return _sigma_from_misalignment(misalignment)
 
 
 def sigma_IIA_winner_set(
-    profile: PreferenceProfile, voting_rule: ElectionConstructor, n_seats: int
+    profile: AnyProfile,
+    voting_rule: ElectionConstructor,
+    n_seats: int,
+    cache: Optional[ElectionCache] = None,
 ) -> float:
     """
     Computes the extended Independence of Irrelevant Alternatives (IIA) score
-    with respect to the winner set.
+    with respect to the winner set. Under a positional rule, removals that provably cannot
+    change the winner set are counted as full overlap without running the election, and
+    are tallied in ``cache.pruned``.
     See https://arxiv.org/pdf/2506.12961 for details.
 
     Args:
-        profile (PreferenceProfile): The preference profile to score.
+        profile (AnyProfile): The preference profile to score, either as a votekit
+            ``PreferenceProfile`` or as an already built ``CompactProfile``.
         voting_rule (Election): The voting rule to apply to the profile.
+        cache (Optional[ElectionCache], optional): Cache of election outcomes shared with
+            the other metrics. Defaults to None, which uses ``default_election_cache``.
 
     Returns:
         float: The sigma_IIA score which is a value between 0 and 1.
     """
+    if cache is None:
+        cache = default_election_cache
+    profile = _profile_for_rule(profile, voting_rule, cache)
     original_winners_set = set(
         __unpack_ranking_with_lexicographic_tiebreak(
-            voting_rule(profile=profile, m=n_seats).get_elected()
+            cache.election(profile, voting_rule, n_seats).get_elected()
         )
     )
 
+    # In the n == 1 case, removing the winner always scores 1, so no election is needed.
+    seats = [
+        (
+            (None if n_seats == 1 else n_seats - 1)
+            if frozenset({candidate}) in original_winners_set
+            else n_seats
+        )
+        for candidate in profile.candidates
+    ]
+    unchanged = _provably_unchanged_removals(
+        profile, voting_rule, seats, original_winners_set, cache
+    )
+    cache.pruned += sum(unchanged)
+    elections_without_cand = _elections_without_each(
+        profile,
+        voting_rule,
+        [None if skip else m for m, skip in zip(seats, unchanged)],
+        cache,
+    )
+
     total_distance = 0
-    for candidate in profile.candidates:
-        if n_seats == 1 and frozenset({candidate}) in original_winners_set:
+    for new_available_seats, skip, election in zip(
+        seats, unchanged, elections_without_cand
+    ):
+        # The winner set is unchanged, so its overlap is full.
+        if new_available_seats is None or skip:
             total_distance += 1
             continue
 
-        # In the n == 1 case, this will always be 1
-        new_available_seats = (
-            n_seats - 1 if frozenset({candidate}) in original_winners_set else n_seats
-        )
-
         new_winner_set = __unpack_ranking_with_lexicographic_tiebreak(
-            voting_rule(
-                remove_and_condense_ranked_profile(candidate, profile),
-                m=new_available_seats,
-            ).get_elected()
+            election.get_elected()
         )
 
         total_distance += (
@@ -392,3 +1922,566 @@ def sigma_IIA_winner_set(
         )
 
     return total_distance / len(profile.candidates)
+
+
+METRIC_FUNCTIONS = {
+    "n_voters": number_of_voters,
+    "sigma_UM": sigma_UM,
+    "sigma_IIA": sigma_IIA,
+    "sigma_IIA_all_subset": sigma_IIA_all_subset,
+    "sigma_UM_winner_set": sigma_UM_winner_set,
+    "sigma_IIA_winner_set": sigma_IIA_winner_set,
+}
+
+
+def compute_all_metrics(
+    profile: AnyProfile,
+    voting_rule: ElectionConstructor,
+    n_seats: int,
+    metrics: Sequence[str] = (
+        "sigma_UM",
+        "sigma_IIA",
+        "sigma_UM_winner_set",
+        "sigma_IIA_winner_set",
+    ),
+    cache: Optional[ElectionCache] = None,
+    n_jobs: int = 1,
+) -> dict[str, float]:
+    """
+    Computes several metrics on one profile in a single pass. The compact encoding, the
+    base election, the pairwise preference matrix and the elections on the reduced
+    profiles are built once and shared by every requested metric.
+
+    Args:
+        profile (AnyProfile): The preference profile to score, either as a votekit
+            ``PreferenceProfile`` or as an already built ``CompactProfile``.
+        voting_rule (Election): The voting rule to apply to the profile.
+        n_seats (int): Number of seats to elect.
+        metrics (Sequence[str], optional): Names of the metrics to compute, from the keys of
+            ``METRIC_FUNCTIONS``. Defaults to sigma_UM, sigma_IIA and their winner set
+            versions.
+        cache (Optional[ElectionCache], optional): Cache to share the intermediates through.
+            Defaults to None, which uses a fresh cache for this call.
+        n_jobs (int, optional): Number of workers ``sigma_IIA_all_subset`` splits the subsets
+            across. Defaults to 1.
+
+    Returns:
+        dict[str, float]: The score of each requested metric, in the requested order.
+    """
+    unknown = [name for name in metrics if name not in METRIC_FUNCTIONS]
+    if unknown:
+        raise ValueError(f"Metrics {unknown} not recognized.")
+
+    if cache is None:
+        cache = ElectionCache()
+    scores = {}
+    for name in metrics:
+        kwargs = {"n_jobs": n_jobs} if name == "sigma_IIA_all_subset" else {}
+        scores[name] = float(
+            METRIC_FUNCTIONS[name](profile, voting_rule, n_seats, cache=cache, **kwargs)
+        )
+    return scores
+
+
+def _seed_positional_elections(
+    profile: AnyProfile,
+    voting_rules: Sequence[ElectionConstructor],
+    seat_counts: Sequence[int],
+    cache: ElectionCache,
+) -> None:
+    """
+    Fills the cache with the full and single-removal elections of the positional rules for
+    every seat count in a sweep and every seat count one lower, which the winner set metric
+    elects after removing a winner. The scores do not depend on the number of seats, so the
+    profile is scored once and a single ``RemovalPositionCounts`` gives every removal under
+    every score vector; only the tie across the last seat is broken per seat count. Votekit
+    positional rules are scored by the array engine, which reproduces their rankings.
+    """
+    positional_rules = [
+        voting_rule
+        for voting_rule in voting_rules
+        if getattr(voting_rule, "is_positional", False)
+    ]
+    compact_profile = cache.compact(profile)
+    if not positional_rules or compact_profile.has_ties:
+        return
+    rule_profiles = [
+        _profile_for_rule(profile, voting_rule, cache) for voting_rule in positional_rules
+    ]
+    score_vectors = [voting_rule.score_vector for voting_rule in positional_rules]
+    tiebreaks = [voting_rule.tiebreak for voting_rule in positional_rules]
+
+    n_cast = len(compact_profile.candidates_cast)
+    full_seats = sorted({m for m in seat_counts if 1 <= m <= n_cast})
+    exact = _has_exact_positional_scores(compact_profile, score_vectors)
+    if exact:
+        full_elections = positional_family_elections(
+            compact_profile, score_vectors, tiebreaks, full_seats
+        )
+    else:
+        # Inexact scores must be summed in ballot order, as votekit sums them.
+        full_elections = [
+            positional_elections_for_seats(
+                compact_profile, full_seats, voting_rule.score_vector, voting_rule.tiebreak
+            )
+            for voting_rule in positional_rules
+        ]
+    for voting_rule, rule_profile, elections in zip(
+        positional_rules, rule_profiles, full_elections
+    ):
+        for m, election in zip(full_seats, elections):
+            cache.put(rule_profile, voting_rule, m, (), election)
+
+    if not exact:
+        return
+    counts = RemovalPositionCounts.from_profile(compact_profile)
+    for m in sorted({s for m in seat_counts for s in (m, m - 1) if s >= 1}):
+        seats = [
+            m if m <= n_cast - int(is_cast) else None for is_cast in counts.cast
+        ]
+        family_elections = positional_family_elections_without_each(
+            counts, seats, score_vectors, tiebreaks
+        )
+        for voting_rule, rule_profile, elections in zip(
+            positional_rules, rule_profiles, family_elections
+        ):
+            for candidate, election in zip(compact_profile.candidates, elections):
+                if election is not None:
+                    cache.put(rule_profile, voting_rule, m, (candidate,), election)
+
+
+def compute_all_metrics_for_rules(
+    profile: AnyProfile,
+    voting_rules: Sequence[ElectionConstructor],
+    seat_counts: Sequence[int],
+    metrics: Sequence[str] = (
+        "sigma_UM",
+        "sigma_IIA",
+        "sigma_UM_winner_set",
+        "sigma_IIA_winner_set",
+    ),
+    cache: Optional[ElectionCache] = None,
+    n_jobs: int = 1,
+) -> list[dict[int, dict[str, float]]]:
+    """
+    Computes several metrics on one profile for each of several voting rules and seat
+    counts. The positional rules among them are evaluated as one family: every score vector
+    is a row of a single matrix product with the position counts of the full profile and of
+    every single-candidate removal, so adding a positional rule costs a matrix row rather
+    than another pass over the profile. STV is run as usual, sharing the compact encoding
+    and pairwise matrix.
+
+    Args:
+        profile (AnyProfile): The preference profile to score, either as a votekit
+            ``PreferenceProfile`` or as an already built ``CompactProfile``.
+        voting_rules (Sequence[ElectionConstructor]): The voting rules to apply to the
+            profile, for example from ``build_voting_rule`` or ``positional_voting_rule``.
+        seat_counts (Sequence[int]): Numbers of seats to elect.
+        metrics (Sequence[str], optional): Names of the metrics to compute, from the keys of
+            ``METRIC_FUNCTIONS``. Defaults to sigma_UM, sigma_IIA and their winner set
+            versions.
+        cache (Optional[ElectionCache], optional): Cache to share the intermediates through.
+            Defaults to None, which uses a fresh cache for this call.
+        n_jobs (int, optional): Number of workers ``sigma_IIA_all_subset`` splits the subsets
+            across. Defaults to 1.
+
+    Returns:
+        list[dict[int, dict[str, float]]]: For each voting rule, the scores
+            ``compute_all_metrics`` returns for each seat count, keyed by seat count.
+    """
+    if cache is None:
+        cache = ElectionCache()
+    _seed_positional_elections(profile, voting_rules, seat_counts, cache)
+    return [
+        {
+            n_seats: compute_all_metrics(
+                profile, voting_rule, n_seats, metrics=metrics, cache=cache, n_jobs=n_jobs
+            )
+            for n_seats in seat_counts
+        }
+        for voting_rule in voting_rules
+    ]
+
+
+def compute_all_metrics_for_seats(
+    profile: AnyProfile,
+    voting_rule: ElectionConstructor,
+    seat_counts: Sequence[int],
+    metrics: Sequence[str] = (
+        "sigma_UM",
+        "sigma_IIA",
+        "sigma_UM_winner_set",
+        "sigma_IIA_winner_set",
+    ),
+    cache: Optional[ElectionCache] = None,
+    n_jobs: int = 1,
+) -> dict[int, dict[str, float]]:
+    """
+    Computes several metrics on one profile for each of several seat counts. Under a
+    positional rule, the scores of the full profile and of every single-candidate removal
+    are computed once for the whole sweep, and only the tie across the last seat is broken
+    per seat count. STV, whose count depends on the number of seats, is rerun for each seat
+    count, sharing the compact encoding and pairwise matrix.
+
+    Args:
+        profile (AnyProfile): The preference profile to score, either as a votekit
+            ``PreferenceProfile`` or as an already built ``CompactProfile``.
+        voting_rule (Election): The voting rule to apply to the profile.
+        seat_counts (Sequence[int]): Numbers of seats to elect.
+        metrics (Sequence[str], optional): Names of the metrics to compute, from the keys of
+            ``METRIC_FUNCTIONS``. Defaults to sigma_UM, sigma_IIA and their winner set
+            versions.
+        cache (Optional[ElectionCache], optional): Cache to share the intermediates through.
+            Defaults to None, which uses a fresh cache for this call.
+        n_jobs (int, optional): Number of workers ``sigma_IIA_all_subset`` splits the subsets
+            across. Defaults to 1.
+
+    Returns:
+        dict[int, dict[str, float]]: The scores ``compute_all_metrics`` returns for each seat
+            count, keyed by seat count.
+    """
+    return compute_all_metrics_for_rules(
+        profile,
+        [voting_rule],
+        seat_counts,
+        metrics=metrics,
+        cache=cache,
+        n_jobs=n_jobs,
+    )[0]
+
+
+# The metrics that compute_all_metrics_batch evaluates for a whole batch at once.
+BATCH_METRICS = (
+    "n_voters",
+    "sigma_UM",
+    "sigma_IIA",
+    "sigma_UM_winner_set",
+    "sigma_IIA_winner_set",
+)
+
+
+def _batch_positional_metrics(
+    counts: BatchPositionCounts,
+    alignment: Optional[np.ndarray],
+    total_weights: np.ndarray,
+    voting_rule: ElectionConstructor,
+    n_seats: int,
+    metrics: Sequence[str],
+) -> dict[str, np.ndarray]:
+    """
+    Evaluates the ``BATCH_METRICS`` of a positional rule on every profile of a batch in
+    which all candidates are cast, reading every ranking off the batched scores. The values
+    are those of the metric functions, provided the scores are exact.
+    """
+    candidates = counts.candidates
+    n_profiles, n_cands = counts.cast.shape
+    tiebreak = tiebreak_score_vector(voting_rule.tiebreak)
+    order = batch_ranking_orders(
+        candidates,
+        counts.scores(voting_rule.score_vector),
+        counts.scores(tiebreak),
+        counts.cast,
+        n_seats,
+    )
+
+    scores: dict[str, np.ndarray] = {}
+    if "n_voters" in metrics:
+        scores["n_voters"] = total_weights
+    if "sigma_UM" in metrics or "sigma_UM_winner_set" in metrics:
+        # Entry (i, j, k) aligns the j-th and k-th ranked candidates of profile i.
+        ordered = np.take_along_axis(
+            np.take_along_axis(alignment, order[:, :, None], axis=1),
+            order[:, None, :],
+            axis=2,
+        )
+        above, below = np.triu_indices(n_cands, k=1)
+        misalignments = {
+            "sigma_UM": ordered[:, above, below].min(axis=1, initial=1),
+            "sigma_UM_winner_set": ordered[:, :n_seats, n_seats:]
+            .reshape(n_profiles, -1)
+            .min(axis=1, initial=1),
+        }
+        for name, misalignment in misalignments.items():
+            if name in metrics:
+                scores[name] = np.array(
+                    [_sigma_from_misalignment(min(1, value)) for value in misalignment]
+                )
+
+    if "sigma_IIA" not in metrics and "sigma_IIA_winner_set" not in metrics:
+        return scores
+    eligible = counts.cast[:, None, :] & ~np.eye(n_cands, dtype=bool)
+    scores_without = counts.scores_without(voting_rule.score_vector)
+    tiebreak_without = counts.scores_without(tiebreak)
+    orders_without = batch_ranking_orders(
+        candidates, scores_without, tiebreak_without, eligible, n_seats
+    )
+
+    if "sigma_IIA" in metrics:
+        # The removed candidate is last in its own ordering, so the first n - 1 entries are
+        # compared with the original positions of the same candidates.
+        position = np.argsort(order, axis=1)
+        sequences = np.take_along_axis(
+            np.broadcast_to(position[:, None, :], orders_without.shape),
+            orders_without[:, :, :-1],
+            axis=2,
+        )
+        upper = np.triu(np.ones((n_cands - 1, n_cands - 1), dtype=bool), k=1)
+        inversions = (
+            (sequences[..., :, None] > sequences[..., None, :]) & upper
+        ).sum(axis=(1, 2, 3))
+        scores["sigma_IIA"] = 1 - inversions / (n_cands * comb(n_cands - 1, 2))
+
+    if "sigma_IIA_winner_set" in metrics:
+        is_winner = np.zeros((n_profiles, n_cands), dtype=bool)
+        np.put_along_axis(is_winner, order[:, :n_seats], True, axis=1)
+        overlap = np.take_along_axis(
+            is_winner[:, None, :].repeat(n_cands, axis=1),
+            orders_without[:, :, :n_seats],
+            axis=2,
+        ).sum(axis=2) / n_seats
+        if n_seats == 1:
+            # Removing the winner always scores 1.
+            winner_overlap = np.ones_like(overlap)
+        else:
+            orders_fewer = batch_ranking_orders(
+                candidates, scores_without, tiebreak_without, eligible, n_seats - 1
+            )
+            winner_overlap = np.take_along_axis(
+                is_winner[:, None, :].repeat(n_cands, axis=1),
+                orders_fewer[:, :, : n_seats - 1],
+                axis=2,
+            ).sum(axis=2) / (n_seats - 1)
+
+        # Summed candidate by candidate, in the order sigma_IIA_winner_set sums them.
+        total_distance = np.zeros(n_profiles)
+        for r in range(n_cands):
+            total_distance += np.where(
+                is_winner[:, r], winner_overlap[:, r], overlap[:, r]
+            )
+        scores["sigma_IIA_winner_set"] = total_distance / n_cands
+
+    return scores
+
+
+def compute_all_metrics_batch(
+    batch: CompactProfileBatch,
+    voting_rules: Sequence[ElectionConstructor],
+    seat_counts: Sequence[int],
+    metrics: Sequence[str] = (
+        "sigma_UM",
+        "sigma_IIA",
+        "sigma_UM_winner_set",
+        "sigma_IIA_winner_set",
+    ),
+) -> list[list[dict[int, dict[str, float]]]]:
+    """
+    Computes several metrics for several voting rules and seat counts on every profile of a
+    batch. For positional rules, the position counts, pairwise matrices, scores, rankings
+    and the ``BATCH_METRICS`` of all the profiles are computed with array operations over
+    the whole batch, so the cost per profile is a share of a few passes over the stacked
+    ballots rather than a round of Python calls. Profiles leaving a candidate without
+    votes, batches with tied rankings or fractional weights or score vectors, other metrics
+    and STV are computed profile by profile with ``compute_all_metrics_for_rules``.
+
+    Args:
+        batch (CompactProfileBatch): The profiles to score.
+        voting_rules (Sequence[ElectionConstructor]): The voting rules to apply.
+        seat_counts (Sequence[int]): Numbers of seats to elect.
+        metrics (Sequence[str], optional): Names of the metrics to compute, from the keys of
+            ``METRIC_FUNCTIONS``. Defaults to sigma_UM, sigma_IIA and their winner set
+            versions.
+
+    Returns:
+        list[list[dict[int, dict[str, float]]]]: For each profile and each voting rule, the
+            scores ``compute_all_metrics`` returns for each seat count, keyed by seat count.
+    """
+    unknown = [name for name in metrics if name not in METRIC_FUNCTIONS]
+    if unknown:
+        raise ValueError(f"Metrics {unknown} not recognized.")
+
+    results = [
+        [{n_seats: {} for n_seats in seat_counts} for _ in voting_rules]
+        for _ in range(batch.n_profiles)
+    ]
+    batched_rules = [
+        getattr(voting_rule, "is_positional", False)
+        and all(name in BATCH_METRICS for name in metrics)
+        and not batch.has_ties
+        and _has_exact_positional_scores(batch, [voting_rule.score_vector])
+        for voting_rule in voting_rules
+    ]
+    batched_rows = np.array([], dtype=np.int64)
+    if any(batched_rules):
+        counts = BatchPositionCounts.from_batch(batch)
+        batched_rows = np.flatnonzero(counts.cast.all(axis=1))
+        counts = counts.select(batched_rows)
+        total_weights = batch.total_weights[batched_rows]
+        alignment = None
+        if "sigma_UM" in metrics or "sigma_UM_winner_set" in metrics:
+            alignment = (
+                batch_pairwise_preference_matrices(batch)[batched_rows]
+                / total_weights[:, None, None]
+            )
+
+        for rule_index, voting_rule in enumerate(voting_rules):
+            if not batched_rules[rule_index]:
+                continue
+            for n_seats in seat_counts:
+                scores = _batch_positional_metrics(
+                    counts, alignment, total_weights, voting_rule, n_seats, metrics
+                )
+                for row, i in enumerate(batched_rows):
+                    results[i][rule_index][n_seats] = {
+                        name: float(scores[name][row]) for name in metrics
+                    }
+
+    batched = set(batched_rows.tolist())
+    for i in range(batch.n_profiles):
+        rule_indices = [
+            rule_index
+            for rule_index, is_batched in enumerate(batched_rules)
+            if not (is_batched and i in batched)
+        ]
+        if not rule_indices:
+            continue
+        profile_results = compute_all_metrics_for_rules(
+            batch.profile(i),
+            [voting_rules[rule_index] for rule_index in rule_indices],
+            seat_counts,
+            metrics=metrics,
+        )
+        for rule_index, rule_results in zip(rule_indices, profile_results):
+            results[i][rule_index] = rule_results
+
+    return results
+
+
+def _replicate_metrics(
+    profile: CompactProfile,
+    weights: np.ndarray,
+    voting_rule: ElectionConstructor,
+    n_seats: int,
+    metrics: Sequence[str],
+) -> dict[str, float]:
+    replicate = CompactProfile(
+        profile.candidates, profile.ranks, weights, profile.max_ranking_length
+    ).deduplicate()
+    return compute_all_metrics(
+        replicate, voting_rule, n_seats, metrics=metrics, cache=ElectionCache()
+    )
+
+
+def bootstrap_metrics(
+    profile: AnyProfile,
+    voting_rule: ElectionConstructor,
+    n_seats: int,
+    metrics: Sequence[str] = (
+        "sigma_UM",
+        "sigma_IIA",
+        "sigma_UM_winner_set",
+        "sigma_IIA_winner_set",
+    ),
+    n_replicates: int = 200,
+    confidence: float = 0.95,
+    seed: Optional[int] = None,
+    cache: Optional[ElectionCache] = None,
+    n_jobs: int = 1,
+) -> dict[str, IntervalEstimate]:
+    """
+    Bootstraps the sampling uncertainty of several metrics by resampling the voters with
+    replacement. Each replicate draws as many voters as the profile has from its distinct
+    ballots, multinomially in proportion to their weights. For positional rules, the
+    position counts and pairwise matrices of all the replicates are one product of the
+    replicate weight matrix with the ballot indicators, and the metrics of all the
+    replicates are read off them at once. STV, and replicates that leave a candidate
+    without votes, are rerun replicate by replicate.
+
+    Args:
+        profile (AnyProfile): The preference profile to score, either as a votekit
+            ``PreferenceProfile`` or as an already built ``CompactProfile``.
+        voting_rule (Election): The voting rule to apply to the profile.
+        n_seats (int): Number of seats to elect.
+        metrics (Sequence[str], optional): Names of the metrics to bootstrap, from
+            ``BATCH_METRICS``. Defaults to sigma_UM, sigma_IIA and their winner set
+            versions.
+        n_replicates (int, optional): Number of bootstrap replicates. Defaults to 200.
+        confidence (float, optional): Coverage of the percentile intervals. Defaults to
+            0.95.
+        seed (Optional[int], optional): Seed of the resampling. Defaults to None.
+        cache (Optional[ElectionCache], optional): Cache the point estimates share with the
+            other metrics. Defaults to None, which uses a fresh cache for this call.
+        n_jobs (int, optional): Number of workers the replicates that are rerun one by one
+            are split across. Defaults to 1.
+
+    Returns:
+        dict[str, IntervalEstimate]: For each metric, its value on the profile and the
+            percentile interval of the replicates, in the requested order.
+    """
+    unknown = [name for name in metrics if name not in BATCH_METRICS]
+    if unknown:
+        raise ValueError(f"Metrics {unknown} cannot be bootstrapped.")
+
+    if cache is None:
+        cache = ElectionCache()
+    point_estimates = compute_all_metrics(
+        profile, voting_rule, n_seats, metrics=metrics, cache=cache
+    )
+    compact_profile = cache.compact(profile)
+    rng = np.random.default_rng(seed)
+    weights = rng.multinomial(
+        int(round(compact_profile.total_weight)),
+        compact_profile.weights / compact_profile.total_weight,
+        size=n_replicates,
+    ).astype(np.float64)
+
+    replicate_scores = {name: np.empty(n_replicates) for name in metrics}
+    batched_rows = np.array([], dtype=np.int64)
+    if (
+        getattr(voting_rule, "is_positional", False)
+        and not compact_profile.has_ties
+        and _has_exact_positional_scores(compact_profile, [voting_rule.score_vector])
+    ):
+        counts = BatchPositionCounts.from_replicate_weights(compact_profile, weights)
+        batched_rows = np.flatnonzero(counts.cast.all(axis=1))
+        total_weights = weights[batched_rows].sum(axis=1)
+        alignment = None
+        if "sigma_UM" in metrics or "sigma_UM_winner_set" in metrics:
+            alignment = (
+                replicate_pairwise_preference_matrices(
+                    compact_profile, weights[batched_rows]
+                )
+                / total_weights[:, None, None]
+            )
+        scores = _batch_positional_metrics(
+            counts.select(batched_rows),
+            alignment,
+            total_weights,
+            voting_rule,
+            n_seats,
+            metrics,
+        )
+        for name in metrics:
+            replicate_scores[name][batched_rows] = scores[name]
+
+    rerun_rows = np.setdiff1d(np.arange(n_replicates), batched_rows)
+    rerun_scores = Parallel(n_jobs=n_jobs)(
+        delayed(_replicate_metrics)(
+            compact_profile, weights[i], voting_rule, n_seats, metrics
+        )
+        for i in rerun_rows
+    )
+    for i, scores in zip(rerun_rows, rerun_scores):
+        for name in metrics:
+            replicate_scores[name][i] = scores[name]
+
+    tail = (1 - confidence) / 2
+    intervals = {}
+    for name in metrics:
+        lower, upper = np.quantile(replicate_scores[name], [tail, 1 - tail])
+        intervals[name] = IntervalEstimate(
+            value=point_estimates[name],
+            lower=float(lower),
+            upper=float(upper),
+            n_samples=n_replicates,
+        )
+    return intervals
@@ -9,13 +9,18 @@ from pathlib import Path
 sys.path.append(str(Path(__file__).resolve().parents[2]))
 
 from fairness_metric import (
-    sigma_IIA,
-    sigma_UM,
-    sigma_IIA_winner_set,
-    sigma_UM_winner_set,
+    ElectionCache,
+    bootstrap_metrics,
+    compute_all_metrics,
+    sigma_IIA_by_depth,
 )
 from voting_rules import build_voting_rule
 
+# Deepest number of removed candidates in the per-depth IIA scores.
+IIA_DEPTH = 3
+# Number of bootstrap replicates behind the interval reported with each sigma.
+BOOTSTRAP_REPLICATES = 200
+
 
 if __name__ == "__main__":
     # Load the data
@@ -28,12 +33,12 @@ if __name__ == "__main__":
 
     n_seats = 1
 
-    metric_function_dict = {
-        "sigma_IIA": sigma_IIA,
-        "sigma_UM": sigma_UM,
-        "sigma_IIA_winner_set": sigma_IIA_winner_set,
-        "sigma_UM_winner_set": sigma_UM_winner_set,
-    }
+    metric_names = [
+        "sigma_IIA",
+        "sigma_UM",
+        "sigma_IIA_winner_set",
+        "sigma_UM_winner_set",
+    ]
     all_election_types = ["borda", "3-approval", "2-approval", "plurality", "stv"]
 
     for election_name in all_election_types:
@@ -43,6 +48,9 @@ if __name__ == "__main__":
             "sigma_IIA": [],
             "sigma_UM_winner_set": [],
             "sigma_IIA_winner_set": [],
+            "sigma_IIA_by_depth": [],
+            "sigma_IIA_winner_set_pruned": [],
+            **{f"{metric_name}_interval": [] for metric_name in metric_names},
         }
 
         clean_profile = PreferenceProfile.from_csv(
@@ -51,10 +59,37 @@ if __name__ == "__main__":
         voting_rule = build_voting_rule(len(clean_profile.candidates), election_name)
         ny_election_stats["n_voters"].append(int(clean_profile.df["Weight"].sum()))
 
-        for metric_name, metric_function in metric_function_dict.items():
-            ny_election_stats[metric_name].append(
-                float(metric_function(clean_profile, voting_rule, n_seats=n_seats))
+        cache = ElectionCache()
+        scores = compute_all_metrics(
+            clean_profile, voting_rule, n_seats, metrics=metric_names, cache=cache
+        )
+        for metric_name, score in scores.items():
+            ny_election_stats[metric_name].append(score)
+        ny_election_stats["sigma_IIA_winner_set_pruned"].append(cache.pruned)
+
+        # Resampling is scored with the array engine, which reproduces the votekit rankings
+        # for the integer ballot weights of the cast vote records.
+        intervals = bootstrap_metrics(
+            clean_profile,
+            build_voting_rule(
+                len(clean_profile.candidates), election_name, engine="native"
+            ),
+            n_seats,
+            metrics=metric_names,
+            n_replicates=BOOTSTRAP_REPLICATES,
+            seed=0,
+            cache=cache,
+            n_jobs=-1,
+        )
+        for metric_name, interval in intervals.items():
+            ny_election_stats[f"{metric_name}_interval"].append(
+                [interval.lower, interval.upper]
+            )
+        ny_election_stats["sigma_IIA_by_depth"].append(
+            sigma_IIA_by_depth(
+                clean_profile, voting_rule, n_seats, max_removed=IIA_DEPTH, cache=cache
             )
+        )
 
         output_file = f"{output_folder_base}/{election_name}_output.json"
         with open(output_file, "w") as f:
@@ -8,14 +8,12 @@ from pathlib import Path
 
 sys.path.append(str(Path(__file__).resolve().parents[2]))
 
-from fairness_metric import (
-    sigma_IIA,
-    sigma_UM,
-    sigma_IIA_winner_set,
-    sigma_UM_winner_set,
-)
+from fairness_metric import ElectionCache, bootstrap_metrics, compute_all_metrics
 from voting_rules import build_voting_rule
 
+# Number of bootstrap replicates behind the interval reported with each sigma.
+BOOTSTRAP_REPLICATES = 200
+
 
 if __name__ == "__main__":
     # Load the data
@@ -29,12 +27,12 @@ if __name__ == "__main__":
     n_seats = 3
 
     districts = ["D1", "D2", "D3", "D4"]
-    metric_function_dict = {
-        "sigma_IIA": sigma_IIA,
-        "sigma_UM": sigma_UM,
-        "sigma_IIA_winner_set": sigma_IIA_winner_set,
-        "sigma_UM_winner_set": sigma_UM_winner_set,
-    }
+    metric_names = [
+        "sigma_IIA",
+        "sigma_UM",
+        "sigma_IIA_winner_set",
+        "sigma_UM_winner_set",
+    ]
     all_election_types = ["borda", "3-approval", "2-approval", "plurality", "stv"]
 
     for election_name in all_election_types:
@@ -45,6 +43,8 @@ if __name__ == "__main__":
                 "sigma_IIA": [],
                 "sigma_UM_winner_set": [],
                 "sigma_IIA_winner_set": [],
+                "sigma_IIA_winner_set_pruned": [],
+                **{f"{metric_name}_interval": [] for metric_name in metric_names},
             }
             for district in districts
         }
@@ -60,9 +60,34 @@ if __name__ == "__main__":
                 int(clean_profile.df["Weight"].sum())
             )
 
-            for metric_name, metric_function in metric_function_dict.items():
-                portland_election_stats[district][metric_name].append(
-                    float(metric_function(clean_profile, voting_rule, n_seats=n_seats))
+            cache = ElectionCache()
+            scores = compute_all_metrics(
+                clean_profile, voting_rule, n_seats, metrics=metric_names, cache=cache
+            )
+            for metric_name, score in scores.items():
+                portland_election_stats[district][metric_name].append(score)
+            # Removals sigma_IIA_winner_set proved could not change the winners.
+            portland_election_stats[district]["sigma_IIA_winner_set_pruned"].append(
+                cache.pruned
+            )
+
+            # Resampling is scored with the array engine, which reproduces the votekit
+            # rankings for the integer ballot weights of the cast vote records.
+            intervals = bootstrap_metrics(
+                clean_profile,
+                build_voting_rule(
+                    len(clean_profile.candidates), election_name, engine="native"
+                ),
+                n_seats,
+                metrics=metric_names,
+                n_replicates=BOOTSTRAP_REPLICATES,
+                seed=0,
+                cache=cache,
+                n_jobs=-1,
+            )
+            for metric_name, interval in intervals.items():
+                portland_election_stats[district][f"{metric_name}_interval"].append(
+                    [interval.lower, interval.upper]
                 )
 
         output_file = f"{output_folder_base}/{election_name}_output.json"
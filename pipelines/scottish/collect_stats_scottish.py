@@ -12,24 +12,38 @@ import sys
 sys.path.append(str(Path(__file__).resolve().parents[2]))
 
 from fairness_metric import (
-    number_of_voters,
-    sigma_IIA,
-    sigma_IIA_all_subset,
-    sigma_IIA_winner_set,
-    sigma_UM,
-    sigma_UM_winner_set,
+    BATCH_METRICS,
+    ElectionCache,
+    bootstrap_metrics,
+    compute_all_metrics,
+    sigma_IIA_all_subset_sampled,
+    sigma_IIA_by_depth,
 )
 from voting_rules import build_voting_rule
 
 
-def run_score(profile_file, metric_function, voting_rule):
-    with contextlib.redirect_stdout(None):
-        profile = PreferenceProfile.from_csv(profile_file)
-        score = metric_function(profile, voting_rule)
-    return score
+# Wards with at least this many candidates split sigma_IIA_all_subset across all cores
+# instead of running in a single pool worker.
+PARALLEL_SUBSET_MIN_CANDS = 12
 
+# Wards with at least this many candidates estimate sigma_IIA_all_subset from a sample of
+# the subsets, stopping after SUBSET_SAMPLES subsets or SUBSET_TIME_BUDGET seconds.
+SAMPLED_SUBSET_MIN_CANDS = 13
+SUBSET_SAMPLES = 4000
+SUBSET_TIME_BUDGET = 600
 
-def compute_results_single_file(f, election_name, metric_function_dict):
+# Deepest number of removed candidates in the per-depth IIA scores.
+IIA_DEPTH = 3
+
+# Number of bootstrap replicates behind the interval reported with each sigma.
+BOOTSTRAP_REPLICATES = 200
+
+
+def n_cands_of_file(f):
+    return int(f.split("/")[-2].split("_")[0])
+
+
+def compute_results_single_file(f, election_name, metric_names, n_jobs=1):
     file_name = str(Path(f).stem)
 
     profile, seats, _cand_list, _cand_to_party, _ward = load_scottish(f)
@@ -37,13 +51,74 @@ def compute_results_single_file(f, election_name, metric_function_dict):
     n_cands = f.split("/")[-2].split("_")[0]
     voting_rule = build_voting_rule(int(n_cands), election_name)
 
-    output_dict = {metric_name: {} for metric_name in metric_function_dict.keys()}
+    sample_subsets = (
+        "sigma_IIA_all_subset" in metric_names
+        and int(n_cands) >= SAMPLED_SUBSET_MIN_CANDS
+    )
+    exact_metric_names = [
+        metric_name
+        for metric_name in metric_names
+        if not (sample_subsets and metric_name == "sigma_IIA_all_subset")
+    ]
 
-    output_dict["n_voters"][file_name] = int(profile.df["Weight"].sum())
-    for metric_name, metric_function in metric_function_dict.items():
-        output_dict[metric_name][file_name] = float(
-            metric_function(profile, voting_rule, n_seats=seats)
+    cache = ElectionCache()
+    scores = compute_all_metrics(
+        profile,
+        voting_rule,
+        seats,
+        metrics=exact_metric_names,
+        cache=cache,
+        n_jobs=n_jobs,
+    )
+    if sample_subsets:
+        estimate = sigma_IIA_all_subset_sampled(
+            profile,
+            voting_rule,
+            seats,
+            n_samples=SUBSET_SAMPLES,
+            time_budget=SUBSET_TIME_BUDGET,
+            cache=cache,
         )
+        scores["sigma_IIA_all_subset"] = estimate.value
+
+    output_dict = {
+        metric_name: {file_name: score} for metric_name, score in scores.items()
+    }
+    output_dict["n_voters"][file_name] = int(scores["n_voters"])
+    if "sigma_IIA_winner_set" in scores:
+        output_dict["sigma_IIA_winner_set_pruned"] = {file_name: cache.pruned}
+    if "sigma_IIA_all_subset" in scores:
+        # Exact scores get a zero-width interval.
+        output_dict["sigma_IIA_all_subset_interval"] = {
+            file_name: (
+                [estimate.lower, estimate.upper]
+                if sample_subsets
+                else [scores["sigma_IIA_all_subset"]] * 2
+            )
+        }
+    # Resampling is scored with the array engine, which reproduces the votekit rankings
+    # for the integer ballot weights of the cast vote records.
+    intervals = bootstrap_metrics(
+        profile,
+        build_voting_rule(int(n_cands), election_name, engine="native"),
+        seats,
+        metrics=[
+            metric_name for metric_name in metric_names if metric_name in BATCH_METRICS
+        ],
+        n_replicates=BOOTSTRAP_REPLICATES,
+        seed=0,
+        cache=cache,
+        n_jobs=n_jobs,
+    )
+    for metric_name, interval in intervals.items():
+        output_dict[f"{metric_name}_interval"] = {
+            file_name: [interval.lower, interval.upper]
+        }
+    output_dict["sigma_IIA_by_depth"] = {
+        file_name: sigma_IIA_by_depth(
+            profile, voting_rule, seats, max_removed=IIA_DEPTH, cache=cache
+        )
+    }
     return {n_cands: output_dict}
 
 
@@ -61,14 +136,14 @@ if __name__ == "__main__":
     all_files = glob(f"{top_dir}/data/scot-elex/*/*.csv")
     # all_files = [f for f in all_files if any([f"/{i}_cands" in f for i in range(3, 9)])]
 
-    metric_function_dict = {
-        "n_voters": number_of_voters,
-        "sigma_IIA": sigma_IIA,
-        "sigma_IIA_all_subset": sigma_IIA_all_subset,
-        "sigma_IIA_winner_set": sigma_IIA_winner_set,
-        "sigma_UM": sigma_UM,
-        "sigma_UM_winner_set": sigma_UM_winner_set,
-    }
+    metric_names = [
+        "n_voters",
+        "sigma_IIA",
+        "sigma_IIA_all_subset",
+        "sigma_IIA_winner_set",
+        "sigma_UM",
+        "sigma_UM_winner_set",
+    ]
     all_election_types = ["borda", "3-approval", "2-approval", "plurality", "stv"]
     file_to_column_data_dict = {}
 
@@ -78,18 +153,41 @@ if __name__ == "__main__":
 
     for election_name in all_election_types:
         scottish_election_stats = {
-            str(cands): {metric_name: {} for metric_name in metric_function_dict.keys()}
+            str(cands): {
+                metric_name: {}
+                for metric_name in metric_names
+                + [
+                    "sigma_IIA_all_subset_interval",
+                    "sigma_IIA_by_depth",
+                    "sigma_IIA_winner_set_pruned",
+                ]
+                + [
+                    f"{metric_name}_interval"
+                    for metric_name in metric_names
+                    if metric_name in BATCH_METRICS
+                ]
+            }
             for cands in range(3, 15)
         }
 
+        small_files = [
+            f for f in all_files if n_cands_of_file(f) < PARALLEL_SUBSET_MIN_CANDS
+        ]
+        large_files = [
+            f for f in all_files if n_cands_of_file(f) >= PARALLEL_SUBSET_MIN_CANDS
+        ]
+
         with joblib_progress(
-            total=len(all_files), description=f"Collecting stats for {election_name}"
+            total=len(small_files), description=f"Collecting stats for {election_name}"
         ):
             results = Parallel(n_jobs=-1)(
-                delayed(compute_results_single_file)(
-                    f, election_name, metric_function_dict
-                )
-                for f in all_files
+                delayed(compute_results_single_file)(f, election_name, metric_names)
+                for f in small_files
+            )
+
+        for f in tqdm(large_files, desc=f"Large wards for {election_name}"):
+            results.append(
+                compute_results_single_file(f, election_name, metric_names, n_jobs=-1)
             )
 
         for output_dict in results:
@@ -108,7 +206,7 @@ if __name__ == "__main__":
         }
 
         for key, data_dict in scottish_election_stats.items():
-            if data_dict == {metric: {} for metric in metric_function_dict.keys()}:
+            if not data_dict["n_voters"]:
                 print(f"No data for {key}, skipping.")
                 continue
             n_voter_list = list(data_dict["n_voters"].values())
@@ -119,7 +217,7 @@ if __name__ == "__main__":
                 np.max(n_voter_list)
             )
 
-            for metric_name in metric_function_dict.keys():
+            for metric_name in metric_names:
                 metric_data_list = list(data_dict[metric_name].values())
                 scottish_election_interpreted_values[key][f"mean_{metric_name}"] = (
                     float(np.mean(metric_data_list))
@@ -140,7 +238,7 @@ if __name__ == "__main__":
                 "n_cands": n_cands,
             } | {
                 metric: scottish_election_stats[n_cands][metric][file_name]
-                for metric in metric_function_dict.keys()
+                for metric in metric_names
             }
 
             file_to_column_data_dict[file_name][election_name] = data
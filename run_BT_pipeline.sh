@@ -12,13 +12,16 @@ fi
 # # NOTE: Uncomment the following line to regenerate the profiles
 # python ${SCRIPT_DIR}/pipelines/bradley-terry/generate_BT_profiles.py
 
+# Every seat count and rule is scored in one pass, which reuses the seat-independent scores
+# and evaluates the positional rules as one family of score vectors.
+for n_cands in 6 7 8 9; do
+    python ${SCRIPT_DIR}/pipelines/bradley-terry/collect_stats_BT.py \
+        --n-seats 1 --n-seats 2 --n-seats 3 --n-seats 4 --n-seats 5 --n-cands $n_cands \
+        --metric sigma_IIA --metric sigma_UM --metric sigma_IIA_winner_set --metric sigma_UM_winner_set \
+        --election-type borda --election-type 3-approval --election-type 2-approval \
+        --election-type plurality --election-type stv
+done
+
 for n_seats in 1 2 3 4 5; do
-    for n_cands in 6 7 8 9; do
-        for metric in "sigma_IIA" "sigma_UM" "sigma_IIA_winner_set" "sigma_UM_winner_set"; do
-            for election_type in "borda" "3-approval" "2-approval" "plurality" "stv"; do
-                python ${SCRIPT_DIR}/pipelines/bradley-terry/collect_stats_BT.py --n-seats $n_seats --n-cands $n_cands --metric $metric --election-type $election_type
-            done
-        done
-    done
     python ${SCRIPT_DIR}/pipelines/bradley-terry/create_sigma_output.py --n-seats $n_seats
 done
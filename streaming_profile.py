@@ -0,0 +1,552 @@
+import ast
+import csv
+from dataclasses import dataclass
+from itertools import islice
+from typing import Iterator, Optional, Sequence
+import numpy as np
+from array_elections import BatchPositionCounts, RemovalPositionCounts
+from compact_profile import CompactProfile, _encode_ranking_cells, _rank_dtype
+from fairness_metric import (
+    BATCH_METRICS,
+    AnyProfile,
+    METRIC_FUNCTIONS,
+    ElectionCache,
+    _batch_positional_metrics,
+    compute_all_metrics,
+    pairwise_preference_matrix,
+)
+from voting_rules import ElectionConstructor
+
+# Rows of a votekit profile csv before the first ballot.
+_CSV_HEADER_ROWS = 9
+
+
+@dataclass(frozen=True)
+class _CSVLayout:
+    """
+    Where the candidates, rankings and weights are found in a votekit profile csv.
+    """
+
+    candidates: tuple[str, ...]
+    prefixes: dict[str, str]
+    max_ranking_length: int
+    ranking_columns: slice
+    weight_column: int
+
+
+def _parse_csv_header(header: list[list[str]]) -> _CSVLayout:
+    """
+    Reads the layout of a csv written by ``PreferenceProfile.to_csv`` from its header rows, as
+    votekit's ``from_csv`` does.
+    """
+    if len(header) < _CSV_HEADER_ROWS or header[0] != ["VoteKit PreferenceProfile"]:
+        raise ValueError("The csv is not formatted as a VoteKit PreferenceProfile.")
+
+    candidate_row = [c_tuple.strip("()").split(":") for c_tuple in header[2]]
+    prefixes = {prefix: cand for cand, prefix in candidate_row}
+    max_ranking_length = int(header[4][0])
+    if max_ranking_length == 0:
+        raise ValueError("The profile read from the csv does not contain rankings.")
+
+    break_indices = [i for i, name in enumerate(header[8]) if name == "&"]
+    return _CSVLayout(
+        candidates=tuple(prefixes.values()),
+        prefixes=prefixes,
+        max_ranking_length=max_ranking_length,
+        ranking_columns=slice(break_indices[0] + 1, break_indices[1]),
+        weight_column=break_indices[1] + 1,
+    )
+
+
+def _parse_ranking_cell(cell: str, prefixes: dict[str, str]) -> Optional[frozenset]:
+    """
+    Parses a ranking cell as votekit's ``from_csv`` does. Empty cells, which pad short
+    ballots, give None and "{}", a skipped position, gives the empty set.
+    """
+    if cell == "":
+        return None
+    names = cell.strip("{}").split(", ")
+    if names == [""]:
+        return frozenset()
+    return frozenset(prefixes[name.strip("'")] for name in names)
+
+
+def _parse_weight(cell: str) -> float:
+    """
+    Parses a "numerator/denominator" weight cell as votekit's ``from_csv`` does.
+    """
+    try:
+        num, denom = cell.split("/")
+        return float(ast.literal_eval(num)) / float(ast.literal_eval(denom))
+    except Exception:
+        raise ValueError(f"Invalid weight format in ballot row: {cell}")
+
+
+def _encode_csv_rows(rows: list[list[str]], layout: _CSVLayout) -> CompactProfile:
+    """
+    Encodes a chunk of ballot rows as a ``CompactProfile``, parsing each distinct cell once.
+    """
+    cand_index = {c: i for i, c in enumerate(layout.candidates)}
+    texts = np.array([row[layout.ranking_columns] for row in rows], dtype=object)
+    texts = texts.reshape(len(rows), -1)
+    cell_texts, codes = np.unique(texts, return_inverse=True)
+    parsed = np.empty(len(cell_texts), dtype=object)
+    for i, cell in enumerate(cell_texts):
+        parsed[i] = _parse_ranking_cell(cell, layout.prefixes)
+
+    weight_texts, weight_codes = np.unique(
+        [row[layout.weight_column] for row in rows], return_inverse=True
+    )
+    weights = np.array([_parse_weight(cell) for cell in weight_texts])
+
+    return CompactProfile(
+        candidates=layout.candidates,
+        ranks=_encode_ranking_cells(
+            parsed[codes.reshape(texts.shape)], cand_index, layout.max_ranking_length
+        ),
+        weights=weights[weight_codes.ravel()],
+        max_ranking_length=layout.max_ranking_length,
+    )
+
+
+def read_csv_chunks(fpath: str, chunk_size: int = 100_000) -> Iterator[CompactProfile]:
+    """
+    Reads a csv written by ``PreferenceProfile.to_csv`` a chunk of ballots at a time, so that
+    at most ``chunk_size`` rows are held in memory. Each chunk is a ``CompactProfile`` over all
+    the candidates of the file with its maximum ranking length, and together the chunks hold
+    the ballots of ``PreferenceProfile.from_csv(fpath)`` in file order.
+
+    Args:
+        fpath (str): Path to the csv.
+        chunk_size (int, optional): Number of ballot rows per chunk. Defaults to 100_000.
+
+    Returns:
+        Iterator[CompactProfile]: The chunks of ballots.
+    """
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be positive.")
+    with open(fpath, "r", newline="") as file:
+        reader = csv.reader(file)
+        layout = _parse_csv_header(list(islice(reader, _CSV_HEADER_ROWS)))
+        while rows := list(islice(reader, chunk_size)):
+            yield _encode_csv_rows(rows, layout)
+
+
+@dataclass(frozen=True, eq=False)
+class StreamedProfile:
+    """
+    The statistics the metrics need from a profile, accumulated from a votekit csv a chunk
+    of ballots at a time, so that profiles too large to load as a ``PreferenceProfile`` can
+    still be scored. The pairwise preference matrix and the position counts take memory in
+    the number of candidates only, and suffice for the ``BATCH_METRICS`` of positional rules.
+    Other rules and metrics are computed on the table of distinct ballots, whose size is the
+    number of distinct rankings rather than the number of voters.
+
+    Attributes:
+        candidates (tuple[str, ...]): The candidate index table.
+        max_ranking_length (int): The maximum ranking length of the profile.
+        total_weight (float): The total weight of the ballots, including those that rank
+            no candidate.
+        pairwise (np.ndarray): The ``pairwise_preference_matrix`` of the profile.
+        position_counts (Optional[RemovalPositionCounts]): The position counts of the
+            profile, or None if a ballot with weight ranks candidates at the same position.
+        ballots (Optional[CompactProfile]): The distinct ballots with their summed weights,
+            including one ranking no candidate if there are empty ballots, or None if the
+            table was not kept.
+        has_integer_weights (bool): Whether every ballot weight is an integer.
+    """
+
+    candidates: tuple[str, ...]
+    max_ranking_length: int
+    total_weight: float
+    pairwise: np.ndarray
+    position_counts: Optional[RemovalPositionCounts]
+    ballots: Optional[CompactProfile]
+    has_integer_weights: bool
+
+    @classmethod
+    def from_csv(
+        cls, fpath: str, chunk_size: int = 100_000, keep_ballots: bool = True
+    ) -> "StreamedProfile":
+        """
+        Accumulates the statistics of a csv written by ``PreferenceProfile.to_csv`` in one
+        pass over its ballots.
+
+        Args:
+            fpath (str): Path to the csv.
+            chunk_size (int, optional): Number of ballot rows held in memory at once.
+                Defaults to 100_000.
+            keep_ballots (bool, optional): Whether to keep the table of distinct ballots,
+                which STV and the metrics outside ``BATCH_METRICS`` need. Defaults to True.
+
+        Returns:
+            StreamedProfile: The statistics of the profile.
+        """
+        scorer = None
+        for chunk in read_csv_chunks(fpath, chunk_size):
+            if scorer is None:
+                scorer = IncrementalScorer(
+                    chunk.candidates, chunk.max_ranking_length, keep_ballots
+                )
+            scorer.add_ballots(chunk)
+        if scorer is None:
+            raise ValueError("The csv does not contain any ballots.")
+        return scorer.to_streamed_profile()
+
+    def _scores_from_counts(
+        self, voting_rule: ElectionConstructor, metrics: Sequence[str]
+    ) -> bool:
+        """
+        Whether the metrics of a rule can be read off the position counts and pairwise
+        matrix, with the same values as the metric functions on the full profile.
+        """
+        score_vector = getattr(voting_rule, "score_vector", None)
+        return (
+            getattr(voting_rule, "is_positional", False)
+            and all(name in BATCH_METRICS for name in metrics)
+            and self.position_counts is not None
+            and bool(self.position_counts.cast.all())
+            and self.has_integer_weights
+            and (
+                score_vector is None
+                or all(float(points).is_integer() for points in score_vector)
+            )
+        )
+
+    def compute_metrics(
+        self,
+        voting_rule: ElectionConstructor,
+        n_seats: int,
+        metrics: Sequence[str] = (
+            "sigma_UM",
+            "sigma_IIA",
+            "sigma_UM_winner_set",
+            "sigma_IIA_winner_set",
+        ),
+        cache: Optional[ElectionCache] = None,
+    ) -> dict[str, float]:
+        """
+        Computes several metrics on the streamed profile, with the values
+        ``compute_all_metrics`` gives on the full profile. For positional rules with integer
+        weights and score vectors, the ``BATCH_METRICS`` come from the position counts and
+        pairwise matrix alone. Otherwise the metrics are computed on the table of distinct
+        ballots.
+
+        Args:
+            voting_rule (ElectionConstructor): The voting rule to apply to the profile.
+            n_seats (int): Number of seats to elect.
+            metrics (Sequence[str], optional): Names of the metrics to compute, from the keys
+                of ``METRIC_FUNCTIONS``. Defaults to sigma_UM, sigma_IIA and their winner set
+                versions.
+            cache (Optional[ElectionCache], optional): Cache shared with the metrics computed
+                on the table of distinct ballots. Defaults to None, which uses a fresh cache.
+
+        Returns:
+            dict[str, float]: The score of each requested metric, in the requested order.
+        """
+        unknown = [name for name in metrics if name not in METRIC_FUNCTIONS]
+        if unknown:
+            raise ValueError(f"Metrics {unknown} not recognized.")
+
+        if self._scores_from_counts(voting_rule, metrics):
+            counts = self.position_counts
+            scores = _batch_positional_metrics(
+                BatchPositionCounts(
+                    candidates=self.candidates,
+                    counts=counts.counts[None],
+                    above=counts.above[None],
+                    cast=counts.cast[None],
+                    max_ranking_lengths=np.array([self.max_ranking_length]),
+                ),
+                (self.pairwise / self.total_weight)[None],
+                np.array([self.total_weight]),
+                voting_rule,
+                n_seats,
+                metrics,
+            )
+            return {name: float(scores[name][0]) for name in metrics}
+
+        if self.ballots is None:
+            raise ValueError(
+                "These metrics need the table of distinct ballots. Read the profile with "
+                "keep_ballots=True."
+            )
+        return compute_all_metrics(
+            self.ballots, voting_rule, n_seats, metrics=metrics, cache=cache
+        )
+
+
+class IncrementalScorer:
+    """
+    The statistics of a ``StreamedProfile`` kept up to date as ballots are added to or
+    removed from a profile, so that it can be rescored after every batch of results without
+    revisiting the ballots already counted. Each delta updates the pairwise matrix, the
+    position counts and the distinct-ballot table in time proportional to its own number of
+    ballots, and the ``BATCH_METRICS`` of positional rules are then read off the matrix and
+    counts in time independent of the number of voters.
+
+    STV and the metrics outside ``BATCH_METRICS`` cannot be updated this way. For those, the
+    first scoring after an update rebuilds the distinct-ballot table as a ``CompactProfile``
+    and reruns every election the metrics need on it, from the full profile through each
+    candidate removal, along with its pairwise matrix. Later scorings until the next update
+    share the table, its pairwise matrix and its elections through the scorer's cache.
+
+    Args:
+        candidates (Sequence[str]): The candidates of the profile.
+        max_ranking_length (int): The maximum ranking length of the profile, which sets the
+            Borda vector.
+        keep_ballots (bool, optional): Whether to keep the table of distinct ballots, which
+            STV and the metrics outside ``BATCH_METRICS`` need. Defaults to True.
+
+    Attributes:
+        total_weight (float): The total weight of the ballots.
+        pairwise (np.ndarray): The ``pairwise_preference_matrix`` of the profile.
+        counts (np.ndarray): The ``RemovalPositionCounts.counts`` of the ballots without
+            ties.
+        above (np.ndarray): The ``RemovalPositionCounts.above`` of the ballots without
+            ties.
+        tied_weight (float): The total weight of the ballots with ties, which are left out
+            of the position counts.
+        n_fractional_ballots (int): The number of ballots counted with a fractional weight.
+    """
+
+    def __init__(
+        self,
+        candidates: Sequence[str],
+        max_ranking_length: int,
+        keep_ballots: bool = True,
+    ):
+        self.candidates = tuple(candidates)
+        self.max_ranking_length = max_ranking_length
+        self.keep_ballots = keep_ballots
+        n_cands = len(self.candidates)
+
+        self.total_weight = 0.0
+        self.pairwise = np.zeros((n_cands, n_cands))
+        self.counts = np.zeros((n_cands, max_ranking_length))
+        self.above = np.zeros((n_cands, n_cands, max_ranking_length))
+        self.tied_weight = 0.0
+        self.n_fractional_ballots = 0
+        self._dtype = _rank_dtype(max_ranking_length)
+        self._ballot_weights: dict[bytes, float] = {}
+        self._statistics: Optional[StreamedProfile] = None
+        self._profile: Optional[StreamedProfile] = None
+        self._cache = ElectionCache()
+
+    @classmethod
+    def from_profile(
+        cls, profile: AnyProfile, keep_ballots: bool = True
+    ) -> "IncrementalScorer":
+        """
+        Builds a scorer holding the ballots of a profile.
+
+        Args:
+            profile (AnyProfile): The initial profile.
+            keep_ballots (bool, optional): Whether to keep the table of distinct ballots.
+                Defaults to True.
+
+        Returns:
+            IncrementalScorer: The scorer.
+        """
+        if not isinstance(profile, CompactProfile):
+            profile = CompactProfile.from_profile(profile)
+        scorer = cls(profile.candidates, profile.max_ranking_length, keep_ballots)
+        scorer.add_ballots(profile)
+        return scorer
+
+    def _encode(self, ballots: AnyProfile) -> CompactProfile:
+        """
+        Encodes a delta over the candidate index table and maximum ranking length of the
+        scorer.
+        """
+        if not isinstance(ballots, CompactProfile):
+            ballots = CompactProfile.from_profile(ballots)
+        unknown = set(ballots.candidates) - set(self.candidates)
+        if unknown:
+            raise ValueError(f"Candidates {sorted(unknown)} are not in the profile.")
+        if ballots.max_ranking_length > self.max_ranking_length:
+            raise ValueError(
+                "The ballots are longer than the maximum ranking length of the profile."
+            )
+
+        unranked = np.iinfo(self._dtype).max
+        ranks = np.full((ballots.n_ballots, len(self.candidates)), unranked, self._dtype)
+        source = {c: i for i, c in enumerate(ballots.candidates)}
+        for j, c in enumerate(self.candidates):
+            if c in source:
+                column = ballots.ranks[:, source[c]]
+                ranks[:, j] = np.where(column == ballots.unranked, unranked, column)
+        return CompactProfile(
+            candidates=self.candidates,
+            ranks=ranks,
+            weights=ballots.weights,
+            max_ranking_length=self.max_ranking_length,
+        )
+
+    def _update(self, ballots: AnyProfile, sign: int) -> None:
+        """
+        Adds (sign 1) or removes (sign -1) a delta of ballots.
+        """
+        delta = self._encode(ballots)
+        rows = delta.weights != 0
+        ranks = np.ascontiguousarray(delta.ranks[rows])
+        weights = delta.weights[rows]
+
+        if self.keep_ballots:
+            row_keys = ranks.view(
+                np.dtype((np.void, ranks.dtype.itemsize * ranks.shape[1]))
+            ).ravel()
+            keys, inverse = np.unique(row_keys, return_inverse=True)
+            key_weights = np.bincount(
+                inverse.ravel(), weights=weights, minlength=len(keys)
+            )
+            entries = [(key.tobytes(), weight) for key, weight in zip(keys, key_weights)]
+            if sign < 0:
+                # Check every removal before changing anything.
+                for key, weight in entries:
+                    held = self._ballot_weights.get(key, 0.0)
+                    if weight > held and not np.isclose(weight, held):
+                        raise ValueError("Cannot remove ballots that are not in the profile.")
+            for key, weight in entries:
+                remaining = self._ballot_weights.get(key, 0.0) + sign * weight
+                if remaining <= 0 or np.isclose(remaining, 0):
+                    self._ballot_weights.pop(key, None)
+                else:
+                    self._ballot_weights[key] = remaining
+
+        sorted_ranks = np.sort(ranks, axis=1)
+        is_tied = (
+            (sorted_ranks[:, 1:] == sorted_ranks[:, :-1])
+            & (sorted_ranks[:, 1:] != np.iinfo(self._dtype).max)
+        ).any(axis=1)
+        strict = CompactProfile(
+            candidates=self.candidates,
+            ranks=ranks[~is_tied],
+            weights=weights[~is_tied],
+            max_ranking_length=self.max_ranking_length,
+        )
+        strict_counts = RemovalPositionCounts.from_profile(strict)
+
+        self.total_weight += sign * float(weights.sum())
+        self.pairwise += sign * pairwise_preference_matrix(
+            CompactProfile(
+                candidates=self.candidates,
+                ranks=ranks,
+                weights=weights,
+                max_ranking_length=self.max_ranking_length,
+            )
+        )
+        self.counts += sign * strict_counts.counts
+        self.above += sign * strict_counts.above
+        self.tied_weight += sign * float(weights[is_tied].sum())
+        self.n_fractional_ballots += sign * int(
+            np.count_nonzero(weights != np.round(weights))
+        )
+        self._statistics = None
+        self._profile = None
+
+    def add_ballots(self, ballots: AnyProfile) -> None:
+        """
+        Adds ballots to the profile.
+
+        Args:
+            ballots (AnyProfile): The ballots to add, over candidates of the profile and no
+                longer than its maximum ranking length.
+        """
+        self._update(ballots, 1)
+
+    def remove_ballots(self, ballots: AnyProfile) -> None:
+        """
+        Removes ballots from the profile. Removing ballots that were never added raises a
+        ValueError if the distinct-ballot table is kept, and is not detected otherwise.
+
+        Args:
+            ballots (AnyProfile): The ballots to remove, over candidates of the profile and
+                no longer than its maximum ranking length.
+        """
+        self._update(ballots, -1)
+
+    def to_streamed_profile(self, include_ballots: bool = True) -> StreamedProfile:
+        """
+        A snapshot of the statistics, built once per update.
+
+        Args:
+            include_ballots (bool, optional): Whether to build the table of distinct ballots,
+                which takes time in the number of distinct ballots. Ignored if the table is
+                not kept. Defaults to True.
+
+        Returns:
+            StreamedProfile: The statistics of the current profile.
+        """
+        include_ballots = include_ballots and self.keep_ballots
+        if include_ballots and self._profile is not None:
+            return self._profile
+        if not include_ballots and self._statistics is not None:
+            return self._statistics
+
+        ballots = None
+        if include_ballots:
+            keys = list(self._ballot_weights)
+            ballots = CompactProfile(
+                candidates=self.candidates,
+                ranks=np.frombuffer(b"".join(keys), dtype=self._dtype).reshape(
+                    len(keys), len(self.candidates)
+                ),
+                weights=np.array(list(self._ballot_weights.values()), dtype=np.float64),
+                max_ranking_length=self.max_ranking_length,
+            )
+        position_counts = None
+        if np.isclose(self.tied_weight, 0):
+            position_counts = RemovalPositionCounts(
+                candidates=self.candidates,
+                counts=self.counts.copy(),
+                above=self.above.copy(),
+                cast=self.counts.sum(axis=1) > 0,
+                max_ranking_length=self.max_ranking_length,
+            )
+
+        profile = StreamedProfile(
+            candidates=self.candidates,
+            max_ranking_length=self.max_ranking_length,
+            total_weight=self.total_weight,
+            pairwise=self.pairwise.copy(),
+            position_counts=position_counts,
+            ballots=ballots,
+            has_integer_weights=self.n_fractional_ballots == 0,
+        )
+        if include_ballots:
+            self._profile = profile
+        else:
+            self._statistics = profile
+        return profile
+
+    def compute_metrics(
+        self,
+        voting_rule: ElectionConstructor,
+        n_seats: int,
+        metrics: Sequence[str] = (
+            "sigma_UM",
+            "sigma_IIA",
+            "sigma_UM_winner_set",
+            "sigma_IIA_winner_set",
+        ),
+    ) -> dict[str, float]:
+        """
+        Computes several metrics on the current profile, as ``StreamedProfile.compute_metrics``
+        does. The distinct-ballot table is only rebuilt when the metrics cannot be read off the
+        position counts and pairwise matrix.
+
+        Args:
+            voting_rule (ElectionConstructor): The voting rule to apply to the profile.
+            n_seats (int): Number of seats to elect.
+            metrics (Sequence[str], optional): Names of the metrics to compute, from the keys
+                of ``METRIC_FUNCTIONS``. Defaults to sigma_UM, sigma_IIA and their winner set
+                versions.
+
+        Returns:
+            dict[str, float]: The score of each requested metric, in the requested order.
+        """
+        profile = self.to_streamed_profile(include_ballots=False)
+        if not profile._scores_from_counts(voting_rule, metrics):
+            profile = self.to_streamed_profile()
+        return profile.compute_metrics(voting_rule, n_seats, metrics, cache=self._cache)
@@ -0,0 +1,367 @@
+from votekit import PreferenceProfile, Ballot
+from array_elections import (
+    BallotTypes,
+    RemovalPositionCounts,
+    STVCheckpoints,
+    approval_elections_for_subsets,
+    approval_scores_for_all_subsets,
+    borda_scores_for_all_subsets,
+    position_counts,
+    positional_election,
+    positional_elections_without_each,
+    positional_family_elections,
+    positional_family_elections_without_each,
+    positional_scores,
+    stv_election,
+)
+from compact_profile import CompactProfile
+from voting_rules import build_voting_rule, positional_voting_rule
+from fairness_metric import (
+    sigma_IIA,
+    sigma_IIA_all_subset,
+    sigma_UM,
+    sigma_IIA_winner_set,
+    sigma_UM_winner_set,
+)
+from test_compact_profile import make_seeded_profile
+from itertools import combinations
+import numpy as np
+import pytest
+
+POSITIONAL_RULES = ["borda", "3-approval", "2-approval", "plurality"]
+
+
+def assert_same_outcome(profile, rule_name, n_cands, m):
+    votekit_election = build_voting_rule(n_cands, rule_name)(profile, m=m)
+    native_election = build_voting_rule(n_cands, rule_name, engine="native")(
+        profile, m=m
+    )
+
+    assert native_election.get_ranking() == votekit_election.get_ranking()
+    assert native_election.get_elected() == votekit_election.get_elected()
+
+
+@pytest.mark.parametrize("rule_name", POSITIONAL_RULES)
+def test_positional_engine_matches_votekit(rule_name):
+    cand_list = ["A", "B", "C", "D", "E", "F"]
+    for seed in range(5):
+        profile = make_seeded_profile(60, cand_list, seed=seed)
+        for m in [1, 2, 3]:
+            assert_same_outcome(profile, rule_name, len(cand_list), m)
+
+
+# Profiles in which the scores tie across the last seat for at least two seat counts, and
+# the tiebreak scores separate the tied candidates.
+TIED_SCORE_BALLOTS = {
+    "borda": [("BACD", 3), ("ABCD", 2), ("CABD", 2), ("CBAD", 2), ("CABD", 1)],
+    "3-approval": [("ADCB", 2), ("CBAD", 3), ("CADB", 1), ("BDCA", 3), ("DBAC", 1)],
+    "2-approval": [("CABD", 1), ("CADB", 1), ("DBCA", 2), ("ACDB", 2), ("ACBD", 1)],
+    "plurality": [("BACD", 1), ("BDCA", 3), ("BDAC", 2), ("CBAD", 3), ("CDBA", 3)],
+}
+
+
+@pytest.mark.parametrize("rule_name", POSITIONAL_RULES)
+def test_positional_engine_breaks_ties_like_votekit(rule_name):
+    profile = PreferenceProfile(
+        ballots=tuple(
+            Ballot(ranking=tuple(frozenset({c}) for c in ranking), weight=w)
+            for ranking, w in TIED_SCORE_BALLOTS[rule_name]
+        )
+    )
+    for m in [1, 2, 3]:
+        assert_same_outcome(profile, rule_name, 4, m)
+
+
+def test_stv_engine_matches_votekit():
+    cand_list = ["A", "B", "C", "D", "E", "F"]
+    for seed in range(5):
+        profile = make_seeded_profile(60, cand_list, seed=seed)
+        for m in [1, 2, 3]:
+            assert_same_outcome(profile, "stv", len(cand_list), m)
+
+
+def test_stv_engine_sums_transfers_in_votekit_order():
+    # B reaches the quota of 6 exactly after the first round of transfers, which only holds
+    # if the fractional tallies are summed in the same order as votekit sums them.
+    ballots = [
+        ("BE", 2), ("DBECA", 1), ("FEBD", 2), ("EF", 2), ("B", 2), ("DCEB", 1),
+        ("FECAB", 3), ("CDE", 2), ("EAF", 3), ("A", 2), ("FDCEAB", 3), ("EAD", 2),
+        ("BECA", 1), ("CE", 2), ("FBCE", 1),
+    ]
+    profile = PreferenceProfile(
+        ballots=tuple(
+            Ballot(ranking=tuple(frozenset({c}) for c in ranking), weight=w)
+            for ranking, w in ballots
+        ),
+        candidates=("A", "B", "C", "D", "E", "F"),
+    )
+    assert_same_outcome(profile, "stv", 6, 4)
+
+
+def test_stv_checkpoints_replay_removals():
+    cand_list = ["A", "B", "C", "D", "E", "F", "G"]
+    n_skipped = 0
+    for seed in range(6):
+        compact = CompactProfile.from_profile(
+            make_seeded_profile(100, cand_list, seed=seed)
+        )
+        if seed % 2:
+            # Fractional weights exercise the trust margin of the replayed decisions.
+            compact = CompactProfile(
+                compact.candidates,
+                compact.ranks,
+                compact.weights / 7,
+                compact.max_ranking_length,
+            )
+        for m in [1, 2, 3]:
+            checkpoints = STVCheckpoints.from_profile(compact, m)
+            for candidate in cand_list:
+                expected = stv_election(compact.remove(candidate), m)
+                replayed = checkpoints.election_without(candidate)
+                assert replayed.get_ranking() == expected.get_ranking()
+                assert replayed.get_elected() == expected.get_elected()
+                assert replayed.scores == expected.scores
+                n_skipped += checkpoints.resume_round(candidate)
+
+    assert n_skipped > 0
+
+
+def test_positional_scores_are_weighted_position_counts():
+    profile = PreferenceProfile(
+        ballots=(
+            Ballot(ranking=tuple(map(frozenset, [{"A"}, {"B"}])), weight=2),
+            Ballot(ranking=tuple(map(frozenset, [{"B"}, {"C"}, {"A"}])), weight=5),
+        ),
+        candidates=("A", "B", "C"),
+    )
+    compact = CompactProfile.from_profile(profile)
+
+    assert positional_scores(compact, None).tolist() == [2 * 3 + 5 * 1, 2 * 2 + 5 * 3, 5 * 2]
+    assert positional_scores(compact, [1]).tolist() == [2, 5, 0]
+
+
+def test_removal_counts_give_scores_without_each_candidate():
+    compact = CompactProfile.from_profile(
+        make_seeded_profile(50, ["A", "B", "C", "D", "E"], seed=3)
+    )
+    counts = RemovalPositionCounts.from_profile(compact)
+
+    for score_vector in [None, [1], [1, 1, 0, 0, 0], [5, 3, 2, 1]]:
+        assert counts.scores(score_vector).tolist() == (
+            positional_scores(compact, score_vector).tolist()
+        )
+        scores_without = counts.scores_without(score_vector)
+        for r, candidate in enumerate(compact.candidates):
+            expected = positional_scores(compact.remove(candidate), score_vector)
+            assert np.delete(scores_without[r], r).tolist() == expected.tolist()
+
+
+@pytest.mark.parametrize("rule_name", POSITIONAL_RULES)
+def test_elections_without_each_match_removal(rule_name):
+    rule = build_voting_rule(4, rule_name, engine="native")
+    profile = PreferenceProfile(
+        ballots=tuple(
+            Ballot(ranking=tuple(frozenset({c}) for c in ranking), weight=w)
+            for ranking, w in TIED_SCORE_BALLOTS[rule_name]
+        )
+    )
+    compact = CompactProfile.from_profile(profile)
+    counts = RemovalPositionCounts.from_profile(compact)
+
+    for m in [1, 2]:
+        elections = positional_elections_without_each(
+            counts, [m, None, m, m], rule.score_vector, rule.tiebreak
+        )
+        assert elections[1] is None
+        for candidate, election in zip(compact.candidates, elections):
+            if election is None:
+                continue
+            expected = rule(compact.remove(candidate), m=m)
+            assert election.get_ranking() == expected.get_ranking()
+            assert election.get_elected() == expected.get_elected()
+
+
+# Borda, plurality, 2-approval, truncated Borda and Dowdall scaled to integers.
+SCORE_VECTOR_FAMILY = [None, [1], [1, 1], [3, 2, 1], [60, 30, 20, 15, 12]]
+
+
+def test_family_elections_match_each_score_vector():
+    compact = CompactProfile.from_profile(
+        make_seeded_profile(80, ["A", "B", "C", "D", "E"], seed=10)
+    )
+    tiebreaks = ["first_place", "borda", "first_place", "borda", "first_place"]
+
+    counts = position_counts(compact)
+    assert counts.sum(axis=1).tolist() == [
+        compact.weights[compact.ranks[:, c] != compact.unranked].sum()
+        for c in range(compact.n_candidates)
+    ]
+
+    family = positional_family_elections(compact, SCORE_VECTOR_FAMILY, tiebreaks, [1, 2, 3])
+    removal_counts = RemovalPositionCounts.from_profile(compact)
+    for m in [1, 2]:
+        family_without = positional_family_elections_without_each(
+            removal_counts, [m] * 5, SCORE_VECTOR_FAMILY, tiebreaks
+        )
+        for v, (score_vector, tiebreak) in enumerate(zip(SCORE_VECTOR_FAMILY, tiebreaks)):
+            for i, seats in enumerate([1, 2, 3]):
+                expected = positional_election(compact, seats, score_vector, tiebreak)
+                assert family[v][i].get_ranking() == expected.get_ranking()
+                assert family[v][i].get_elected() == expected.get_elected()
+            for candidate, election in zip(compact.candidates, family_without[v]):
+                expected = positional_election(
+                    compact.remove(candidate), m, score_vector, tiebreak
+                )
+                assert election.get_ranking() == expected.get_ranking()
+                assert election.get_elected() == expected.get_elected()
+
+
+# D and E both score 51/10 under the Dowdall vector, but summing their points position by
+# position gives 5.1 and 5.099999999999999.
+DOWDALL_TIED_BALLOTS = [
+    "DE",
+    "DAE",
+    "ADE",
+    "ADE",
+    "ABDCE",
+    "ABDCE",
+    "ABCDE",
+    "ABCD",
+    "ABCFD",
+    "EABCD",
+    "EABCD",
+    "AEBCFD",
+    "AEBCFD",
+]
+
+
+def test_fractional_score_vector_ties_do_not_depend_on_summation_order():
+    profile = PreferenceProfile(
+        ballots=tuple(
+            Ballot(ranking=tuple(frozenset({c}) for c in ranking))
+            for ranking in DOWDALL_TIED_BALLOTS
+        ),
+        candidates=("A", "B", "C", "D", "E", "F"),
+    )
+    dowdall = positional_voting_rule([1, 1 / 2, 1 / 3, 1 / 4, 1 / 5, 1 / 6])
+    compact = CompactProfile.from_profile(profile)
+
+    for candidate_profile in [profile, compact, compact.deduplicate()]:
+        assert dowdall(candidate_profile, m=1).get_ranking()[1] == frozenset({"D", "E"})
+        # Both have two first-place votes, so the lexicographic fallback elects D.
+        assert dowdall(candidate_profile, m=2).get_elected() == (
+            frozenset({"A"}),
+            frozenset({"D"}),
+        )
+    assert sigma_IIA_winner_set(profile, dowdall, 2) == sigma_IIA_winner_set(
+        compact.deduplicate(), dowdall, 2
+    )
+
+
+def test_native_ties_match_votekit_only_for_integer_scores():
+    # A and B both have 5/3 of first place votes, but votekit's running float sums give A
+    # 1.6666666666666665 and B 1.6666666666666667, so only the array engine ties them and
+    # breaks the tie for A.
+    rows = [("ABCD", 1 / 3), ("ACBD", 1 / 3), ("ACDB", 1 / 3), ("ABDC", 1 / 3)]
+    rows += [("ADBC", 1 / 3), ("BACD", 5 / 3), ("CDAB", 1), ("DCBA", 1)]
+    profile = PreferenceProfile(
+        ballots=tuple(
+            Ballot(ranking=tuple(frozenset({c}) for c in ranking), weight=weight)
+            for ranking, weight in rows
+        ),
+        candidates=("A", "B", "C", "D"),
+    )
+    native = build_voting_rule(4, "plurality", engine="native")
+    votekit = build_voting_rule(4, "plurality")
+
+    assert votekit(profile, m=1).get_elected() == (frozenset({"B"}),)
+    assert native(profile, m=1).get_elected() == (frozenset({"A"}),)
+
+    # Integer scores are compared exactly, however large.
+    compact = CompactProfile.from_profile(
+        PreferenceProfile(
+            ballots=(
+                Ballot(ranking=(frozenset({"C"}),), weight=3 * 10**10),
+                Ballot(ranking=(frozenset({"A"}),), weight=10**10),
+                Ballot(ranking=(frozenset({"B"}),), weight=10**10 + 1),
+            )
+        )
+    )
+    assert native(compact, m=1).get_ranking() == votekit(compact, m=1).get_ranking()
+
+
+def test_positional_engine_rejects_ties():
+    profile = PreferenceProfile(
+        ballots=(Ballot(ranking=tuple(map(frozenset, [{"A", "B"}, {"C"}]))),)
+    )
+    with pytest.raises(ValueError):
+        positional_election(CompactProfile.from_profile(profile), 1, None, "first_place")
+
+
+@pytest.mark.parametrize("rule_name", POSITIONAL_RULES + ["stv"])
+def test_metrics_agree_across_engines(rule_name):
+    cand_list = ["A", "B", "C", "D", "E"]
+    profile = make_seeded_profile(80, cand_list, seed=7)
+    votekit_rule = build_voting_rule(len(cand_list), rule_name)
+    native_rule = build_voting_rule(len(cand_list), rule_name, engine="native")
+
+    for metric in [sigma_IIA, sigma_UM, sigma_IIA_winner_set, sigma_UM_winner_set]:
+        for n_seats in [1, 2]:
+            assert metric(profile, native_rule, n_seats) == pytest.approx(
+                metric(profile, votekit_rule, n_seats)
+            )
+
+
+def test_ballot_type_scores_match_condensed_profiles():
+    cand_list = ["A", "B", "C", "D", "E"]
+    compact = CompactProfile.from_profile(make_seeded_profile(80, cand_list, seed=8))
+    types = BallotTypes.from_profile(compact)
+    borda_scores = borda_scores_for_all_subsets(types)
+
+    for k in [1, 2, 3]:
+        approval_scores = approval_scores_for_all_subsets(types, k)
+        for n_removed in range(len(cand_list)):
+            for removed in combinations(range(len(cand_list)), n_removed):
+                mask = sum(1 << i for i in range(len(cand_list)) if i not in removed)
+                kept = [i for i in range(len(cand_list)) if i not in removed]
+                reduced = compact.remove([cand_list[i] for i in removed])
+                assert approval_scores[mask, kept].tolist() == (
+                    positional_scores(reduced, [1] * k).tolist()
+                )
+                assert borda_scores[mask, kept].tolist() == (
+                    positional_scores(reduced, None).tolist()
+                )
+
+
+@pytest.mark.parametrize("rule_name", ["3-approval", "2-approval", "plurality"])
+def test_subset_approval_elections_match_removal(rule_name):
+    rule = build_voting_rule(4, rule_name, engine="native")
+    profile = PreferenceProfile(
+        ballots=tuple(
+            Ballot(ranking=tuple(frozenset({c}) for c in ranking), weight=w)
+            for ranking, w in TIED_SCORE_BALLOTS[rule_name]
+        )
+    )
+    compact = CompactProfile.from_profile(profile)
+    subsets = [s for i in [1, 2] for s in combinations(range(4), i)]
+
+    elections = approval_elections_for_subsets(
+        BallotTypes.from_profile(compact),
+        rule.approval_depth,
+        rule.tiebreak,
+        [15 ^ sum(1 << i for i in subset) for subset in subsets],
+        [min(2, 4 - len(subset)) for subset in subsets],
+    )
+    for subset, election in zip(subsets, elections):
+        expected = rule(
+            compact.remove([compact.candidates[i] for i in subset]),
+            m=min(2, 4 - len(subset)),
+        )
+        assert election.get_ranking() == expected.get_ranking()
+        assert election.get_elected() == expected.get_elected()
+
+    cand_list = ["A", "B", "C", "D", "E", "F"]
+    seeded = make_seeded_profile(80, cand_list, seed=9)
+    assert sigma_IIA_all_subset(
+        seeded, build_voting_rule(6, rule_name, engine="native"), 2
+    ) == pytest.approx(sigma_IIA_all_subset(seeded, build_voting_rule(6, rule_name), 2))
@@ -0,0 +1,213 @@
+from votekit import PreferenceProfile, Ballot
+from votekit.cleaning import remove_and_condense_ranked_profile
+from compact_profile import (
+    CompactProfile,
+    CompactProfileBatch,
+    CompactProfileView,
+    SubsetViewCache,
+)
+from voting_rules import build_voting_rule
+from fairness_metric import sigma_IIA, sigma_UM, sigma_UM_winner_set
+from itertools import combinations
+import numpy as np
+
+
+def make_seeded_profile(
+    n_ballots: int, cand_list: list[str], seed: int
+) -> PreferenceProfile:
+    rng = np.random.default_rng(seed)
+    ballot_list = []
+    for _ in range(n_ballots):
+        ranking = rng.choice(
+            cand_list, size=rng.integers(1, len(cand_list) + 1), replace=False
+        )
+        ballot_list.append(
+            Ballot(
+                ranking=tuple(frozenset({str(c)}) for c in ranking),
+                weight=int(rng.integers(1, 1000)),
+            )
+        )
+
+    return PreferenceProfile(ballots=tuple(ballot_list), candidates=tuple(cand_list))
+
+
+def rankings_of(profile: PreferenceProfile) -> list[tuple[tuple[frozenset, ...], float]]:
+    return sorted(
+        (tuple(s for s in b.ranking if s != frozenset({"~"})), b.weight)
+        for b in profile.ballots
+    )
+
+
+def test_ranks_and_sentinel():
+    profile = PreferenceProfile(
+        ballots=(
+            Ballot(ranking=tuple(map(frozenset, [{"B"}, {"A"}])), weight=3),
+            Ballot(ranking=tuple(map(frozenset, [{"C"}])), weight=2),
+        ),
+        candidates=("A", "B", "C"),
+    )
+    compact = CompactProfile.from_profile(profile)
+
+    u = compact.unranked
+    assert compact.ranks.dtype == np.int8
+    assert compact.ranks.tolist() == [[1, 0, u], [u, u, 0]]
+    assert compact.weights.tolist() == [3.0, 2.0]
+    assert compact.candidates_cast == ("A", "B", "C")
+    assert not compact.has_ties
+
+
+def test_ties_share_a_position():
+    profile = PreferenceProfile(
+        ballots=(Ballot(ranking=tuple(map(frozenset, [{"A", "B"}, {"C"}]))),),
+    )
+    compact = CompactProfile.from_profile(profile)
+
+    a, b, c = compact.candidate_indices(["A", "B", "C"])
+    assert compact.has_ties
+    assert compact.ranks[0, a] == compact.ranks[0, b] == 0
+    assert compact.ranks[0, c] == 1
+
+
+def test_round_trip():
+    profile = make_seeded_profile(50, ["A", "B", "C", "D", "E"], seed=0)
+    decoded = CompactProfile.from_profile(profile).to_profile()
+
+    assert rankings_of(decoded) == rankings_of(profile)
+    assert decoded.max_ranking_length == profile.max_ranking_length
+
+
+def test_remove_matches_votekit():
+    profile = make_seeded_profile(50, ["A", "B", "C", "D", "E"], seed=1)
+    compact = CompactProfile.from_profile(profile)
+
+    for removed in ["A", ["B", "D"], ["A", "C", "E"]]:
+        expected = remove_and_condense_ranked_profile(removed, profile)
+        reduced = compact.remove(removed)
+
+        assert rankings_of(reduced.to_profile()) == rankings_of(expected)
+        assert reduced.total_weight == expected.total_ballot_wt
+        assert reduced.max_ranking_length == profile.max_ranking_length
+
+
+def test_view_shares_ballots_and_chains_removals():
+    profile = make_seeded_profile(50, ["A", "B", "C", "D", "E"], seed=4)
+    compact = CompactProfile.from_profile(profile)
+
+    view = compact.remove("B").remove(["D", "A"])
+    expected = remove_and_condense_ranked_profile(["A", "B", "D"], profile)
+
+    assert isinstance(view, CompactProfileView)
+    assert view.base is compact
+    assert view.candidates == ("C", "E")
+    assert "ranks" not in view.__dict__
+    assert rankings_of(view.to_profile()) == rankings_of(expected)
+    assert view.total_weight == expected.total_ballot_wt
+    # Ballots left empty stay in place without weight.
+    assert view.n_ballots == compact.n_ballots
+    assert view.weights[~view.is_nonempty].sum() == 0
+
+
+def test_deduplicate_groups_identical_ballots():
+    profile = PreferenceProfile(
+        ballots=(
+            Ballot(ranking=tuple(map(frozenset, [{"A"}, {"B"}, {"C"}])), weight=2),
+            Ballot(ranking=tuple(map(frozenset, [{"C"}, {"A"}])), weight=1),
+            Ballot(ranking=tuple(map(frozenset, [{"B"}, {"C"}, {"A"}])), weight=4),
+            Ballot(ranking=tuple(map(frozenset, [{"A"}, {"B"}, {"C"}])), weight=3),
+        ),
+        candidates=("A", "B", "C"),
+    )
+    compact = CompactProfile.from_profile(profile, deduplicate=True)
+
+    # Groups keep the order in which their ballots first appear.
+    u = compact.unranked
+    assert compact.ranks.tolist() == [[0, 1, 2], [1, u, 0], [2, 0, 1]]
+    assert compact.weights.tolist() == [5.0, 1.0, 4.0]
+
+    # Condensing makes new duplicates, which are regrouped, and empty ballots are dropped.
+    regrouped = compact.remove("B").deduplicate()
+    assert regrouped.ranks.tolist() == [[0, 1], [1, 0]]
+    assert regrouped.weights.tolist() == [5.0, 5.0]
+    only_b = compact.remove(["A", "C"]).deduplicate()
+    assert only_b.ranks.tolist() == [[0]]
+    assert only_b.weights.tolist() == [9.0]
+
+
+def test_view_condenses_tied_rankings():
+    profile = PreferenceProfile(
+        ballots=(
+            Ballot(ranking=tuple(map(frozenset, [{"A", "B"}, {"C"}, {"D"}]))),
+            Ballot(ranking=tuple(map(frozenset, [{"C"}, {"A"}, {"B", "D"}]))),
+        ),
+    )
+    compact = CompactProfile.from_profile(profile)
+
+    for removed in [["A"], ["A", "B"], ["C"], ["B", "D"]]:
+        expected = remove_and_condense_ranked_profile(removed, profile)
+        assert rankings_of(compact.remove(removed).to_profile()) == rankings_of(expected)
+
+
+def test_subset_view_cache_condenses_and_regroups_from_parents():
+    profile = make_seeded_profile(50, ["A", "B", "C", "D", "E"], seed=5)
+    compact = CompactProfile.from_profile(profile)
+    views = SubsetViewCache(compact, max_size=4)
+
+    for n_removed in [1, 2, 3]:
+        for subset in combinations(compact.candidates, n_removed):
+            expected = {}
+            for ranking, weight in rankings_of(
+                remove_and_condense_ranked_profile(list(subset), profile)
+            ):
+                expected[ranking] = expected.get(ranking, 0) + weight
+            assert dict(rankings_of(views.view(subset).to_profile())) == expected
+            assert len(views) <= 4
+
+    assert views.hits > 0
+
+
+def test_metrics_accept_compact_profile():
+    profile = make_seeded_profile(40, ["A", "B", "C", "D"], seed=2)
+    compact = CompactProfile.from_profile(profile)
+    voting_rule = build_voting_rule(4, "borda")
+
+    for metric in [sigma_UM, sigma_UM_winner_set, sigma_IIA]:
+        assert abs(metric(compact, voting_rule, 2) - metric(profile, voting_rule, 2)) < 1e-12
+
+
+def test_batch_stacks_grouped_profiles():
+    profiles = [
+        make_seeded_profile(30, ["A", "B", "C", "D"], seed=seed) for seed in range(3)
+    ]
+    batch = CompactProfileBatch.from_profiles(profiles)
+
+    assert batch.n_profiles == 3
+    assert batch.offsets[-1] == len(batch.weights)
+    for i, profile in enumerate(profiles):
+        expected = CompactProfile.from_profile(profile, deduplicate=True)
+        unpacked = batch.profile(i)
+        assert dict(rankings_of(unpacked.to_profile())) == dict(
+            rankings_of(expected.to_profile())
+        )
+        assert batch.total_weights[i] == profile.total_ballot_wt
+
+
+def test_deduplicate_keeps_the_weight_of_empty_ballots():
+    profile = PreferenceProfile(
+        ballots=(
+            Ballot(ranking=tuple(map(frozenset, [{"A"}, {"B"}, {"C"}])), weight=3),
+            Ballot(ranking=tuple(map(frozenset, [{"B"}, {"C"}, {"A"}])), weight=2),
+            Ballot(ranking=(), weight=0.5),
+            Ballot(ranking=(), weight=0.5),
+        ),
+        candidates=("A", "B", "C"),
+    )
+    compact = CompactProfile.from_profile(profile)
+    grouped = compact.deduplicate()
+
+    # The empty ballots count half their weight towards every pair in the UM metrics.
+    u = compact.unranked
+    assert grouped.ranks.tolist() == [[0, 1, 2], [2, 0, 1], [u, u, u]]
+    assert grouped.weights.tolist() == [3.0, 2.0, 1.0]
+    voting_rule = build_voting_rule(3, "borda", engine="native")
+    for metric in [sigma_UM, sigma_UM_winner_set]:
+        assert metric(profile, voting_rule, 1) == metric(compact, voting_rule, 1)
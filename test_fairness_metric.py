@@ -1,12 +1,32 @@
 from votekit import PreferenceProfile, Ballot
-from voting_rules import build_voting_rule
+from voting_rules import build_voting_rule, positional_voting_rule
 from fairness_metric import (
+    ElectionCache,
+    bootstrap_metrics,
+    compute_all_metrics,
+    compute_all_metrics_batch,
+    compute_all_metrics_for_rules,
+    compute_all_metrics_for_seats,
+    determine_weighted_ranking_vector_XAB,
+    kendall_tau_distance,
+    kendall_tau_distances,
+    number_of_voters,
+    pairwise_preference_matrix,
     sigma_IIA,
+    sigma_IIA_all_subset,
+    sigma_IIA_all_subset_sampled,
+    sigma_IIA_by_depth,
+    sigma_IIA_subsampled,
     sigma_UM,
+    sigma_UM_subsampled,
     sigma_IIA_winner_set,
     sigma_UM_winner_set,
 )
+from compact_profile import CompactProfile, CompactProfileBatch
+from math import comb
+import gc
 import numpy as np
+import pytest
 
 
 condorcet_profile = PreferenceProfile(
@@ -447,3 +467,468 @@ def test_UM_Plurality_low():
 
     voting_rule = build_voting_rule(4, "plurality")
     assert abs(sigma_UM(profile, voting_rule, 1) - 0.436) < 1e-3
+
+
+def test_pairwise_preference_matrix_matches_XAB():
+    np.random.seed(0)
+    cand_list = ["A", "B", "C", "D", "E"]
+    profile = make_random_profile(200, cand_list)
+
+    matrix = pairwise_preference_matrix(profile)
+
+    ranking_array = profile.df[
+        [f"Ranking_{i}" for i in range(1, profile.max_ranking_length + 1)]
+    ].to_numpy()
+    weight_vector = profile.df["Weight"].to_numpy()
+    for i, a in enumerate(profile.candidates):
+        for j, b in enumerate(profile.candidates):
+            if a == b:
+                continue
+            expected = determine_weighted_ranking_vector_XAB(
+                ranking_array, weight_vector, frozenset({a}), frozenset({b})
+            ).sum()
+            assert abs(matrix[i, j] - expected) < 1e-9
+
+
+def brute_force_kendall_tau(list1, list2):
+    pos2 = {c: i for i, c in enumerate(list2)}
+    return sum(
+        1
+        for i in range(len(list1))
+        for j in range(i + 1, len(list1))
+        if pos2[list1[i]] > pos2[list1[j]]
+    )
+
+
+def test_kendall_tau_distance_matches_brute_force():
+    rng = np.random.default_rng(0)
+    for n in [0, 1, 2, 5, 9, 16]:
+        list1 = [frozenset({f"c{i}"}) for i in range(n)]
+        for _ in range(20):
+            list2 = [list1[i] for i in rng.permutation(n)]
+            assert kendall_tau_distance(list1, list2) == brute_force_kendall_tau(
+                list1, list2
+            )
+
+
+def test_kendall_tau_distances_batch():
+    rng = np.random.default_rng(1)
+    reference = ["D", "A", "C", "B", "E"]
+    rankings = [[reference[i] for i in rng.permutation(5)] for _ in range(30)]
+
+    expected = [kendall_tau_distance(reference, r) for r in rankings]
+    assert kendall_tau_distances(reference, rankings).tolist() == expected
+
+    index = {c: i for i, c in enumerate("ABCDE")}
+    int_rankings = np.array([[index[c] for c in r] for r in rankings])
+    int_reference = [index[c] for c in reference]
+    assert kendall_tau_distances(int_reference, int_rankings).tolist() == expected
+
+
+def test_IIA_all_subset_Borda_closed_form_matches_elections():
+    rng = np.random.default_rng(2)
+    cand_list = ["A", "B", "C", "D", "E", "F"]
+    for _ in range(5):
+        # Few ballots with small weights, so that ties across the last seat are common.
+        profile = CompactProfile.from_profile(
+            PreferenceProfile(
+                ballots=tuple(
+                    Ballot(
+                        ranking=tuple(frozenset({str(c)}) for c in rng.permutation(cand_list)),
+                        weight=int(rng.integers(1, 3)),
+                    )
+                    for _ in range(8)
+                )
+            )
+        )
+        borda = build_voting_rule(len(cand_list), "borda", engine="native")
+
+        def rerun_borda(profile, m):
+            return borda(profile, m=m)
+
+        for n_seats in [1, 2, 3]:
+            assert sigma_IIA_all_subset(profile, borda, n_seats) == sigma_IIA_all_subset(
+                profile, rerun_borda, n_seats
+            )
+
+
+def test_IIA_all_subset_with_a_candidate_no_ballot_ranks():
+    # D is listed but never ranked, so the rankings of a level do not all have one length.
+    profile = PreferenceProfile(
+        ballots=(
+            Ballot(ranking=(frozenset({"A"}), frozenset({"B"}), frozenset({"C"})), weight=3),
+            Ballot(ranking=(frozenset({"B"}), frozenset({"C"}), frozenset({"A"})), weight=2),
+            Ballot(ranking=(frozenset({"C"}), frozenset({"A"})), weight=4),
+        ),
+        candidates=("A", "B", "C", "D"),
+        max_ranking_length=3,
+    )
+
+    for rule_name, expected in [("borda", 1.0), ("stv", 11 / 12), ("plurality", 11 / 12)]:
+        for engine in ["votekit", "native"]:
+            voting_rule = build_voting_rule(4, rule_name, engine=engine)
+            assert sigma_IIA_all_subset(
+                profile, voting_rule, 1, cache=ElectionCache()
+            ) == pytest.approx(expected)
+            assert sigma_IIA_all_subset(
+                profile, voting_rule, 1, cache=ElectionCache(), n_jobs=2
+            ) == pytest.approx(expected)
+            # Compact profiles walk the subset lattice instead.
+            assert sigma_IIA_all_subset(
+                CompactProfile.from_profile(profile), voting_rule, 1, cache=ElectionCache()
+            ) == pytest.approx(expected)
+            estimate = sigma_IIA_all_subset_sampled(profile, voting_rule, 1, n_samples=10)
+            assert estimate.value == pytest.approx(expected)
+
+            depths = sigma_IIA_by_depth(profile, voting_rule, 1, cache=ElectionCache())
+            assert depths[0] == pytest.approx(sigma_IIA(profile, voting_rule, 1))
+            assert 1 - sum(
+                comb(4, i) * (1 - depth) / 2**4 for i, depth in enumerate(depths, start=1)
+            ) == pytest.approx(expected)
+
+
+def test_election_cache_runs_each_election_once():
+    np.random.seed(3)
+    profile = make_random_profile(200, ["A", "B", "C", "D", "E"])
+    borda = build_voting_rule(5, "borda")
+    calls = []
+
+    def counting_borda(profile, m):
+        calls.append(m)
+        return borda(profile, m=m)
+
+    cache = ElectionCache()
+    uncached = [
+        metric(profile, borda, 2)
+        for metric in [sigma_UM, sigma_IIA, sigma_UM_winner_set, sigma_IIA_winner_set]
+    ]
+    cached = [
+        metric(profile, counting_borda, 2, cache=cache)
+        for metric in [sigma_UM, sigma_IIA, sigma_UM_winner_set, sigma_IIA_winner_set]
+    ]
+
+    assert cached == uncached
+    # The full election, the five removals for sigma_IIA, and the removals of the two
+    # winners with one seat fewer for sigma_IIA_winner_set.
+    assert len(calls) == 1 + 5 + 2
+    assert len(cache) == len(calls)
+    assert cache.misses == len(calls)
+
+
+def test_election_cache_evicts_least_recently_used():
+    np.random.seed(4)
+    profile = make_random_profile(100, ["A", "B", "C", "D"])
+    borda = build_voting_rule(4, "borda")
+    cache = ElectionCache(max_size=2)
+
+    cache.election(profile, borda, 1)
+    cache.election(profile, borda, 1, ["A"])
+    cache.election(profile, borda, 1)
+    cache.election(profile, borda, 1, ["B"])
+
+    assert len(cache) == 2
+    assert cache.get(profile, borda, 1) is not None
+    assert cache.get(profile, borda, 1, ["A"]) is None
+    assert cache.get(profile, borda, 1, ["B"]) is not None
+
+
+def test_election_cache_drops_entries_of_collected_profiles():
+    np.random.seed(4)
+    borda = build_voting_rule(4, "borda")
+    cache = ElectionCache()
+    kept = make_random_profile(100, ["A", "B", "C", "D"])
+    sigma_UM(kept, borda, 1, cache=cache)
+    n_kept = len(cache)
+
+    for _ in range(3):
+        profile = make_random_profile(100, ["A", "B", "C", "D"])
+        sigma_UM(profile, borda, 1, cache=cache)
+        sigma_IIA(profile, borda, 1, cache=cache)
+        del profile
+    gc.collect()
+
+    assert len(cache) == n_kept
+    assert len(cache._compact_profiles) == 1
+    assert len(cache._pairwise_matrices) == 1
+    assert sigma_UM(kept, borda, 1, cache=cache) == sigma_UM(kept, borda, 1)
+
+
+def test_compute_all_metrics_matches_individual_metrics():
+    np.random.seed(5)
+    profile = make_random_profile(200, ["A", "B", "C", "D", "E"])
+    stv = build_voting_rule(5, "stv")
+    calls = []
+
+    def counting_stv(profile, m):
+        calls.append(m)
+        return stv(profile, m=m)
+
+    metric_functions = {
+        "n_voters": number_of_voters,
+        "sigma_IIA_all_subset": sigma_IIA_all_subset,
+        "sigma_UM": sigma_UM,
+        "sigma_IIA": sigma_IIA,
+        "sigma_UM_winner_set": sigma_UM_winner_set,
+        "sigma_IIA_winner_set": sigma_IIA_winner_set,
+    }
+    scores = compute_all_metrics(profile, counting_stv, 2, metrics=list(metric_functions))
+
+    assert list(scores) == list(metric_functions)
+    for name, metric in metric_functions.items():
+        assert scores[name] == metric(profile, stv, 2, cache=ElectionCache())
+    # The full election, the removals of every subset of one to three candidates, and the
+    # removals of the two winners with one seat fewer.
+    assert len(calls) == 1 + (5 + 10 + 10) + 2
+
+
+def test_IIA_all_subset_is_identical_for_any_number_of_workers():
+    np.random.seed(6)
+    profile = make_random_profile(150, ["A", "B", "C", "D", "E", "F"])
+
+    for voting_rule in [
+        build_voting_rule(6, "plurality", engine="native"),
+        build_voting_rule(6, "stv"),
+    ]:
+        serial = sigma_IIA_all_subset(profile, voting_rule, 2, cache=ElectionCache())
+        for n_jobs in [2, 3]:
+            assert serial == sigma_IIA_all_subset(
+                profile, voting_rule, 2, cache=ElectionCache(), n_jobs=n_jobs
+            )
+
+
+def test_IIA_all_subset_sampled_brackets_the_exact_score():
+    np.random.seed(7)
+    profile = make_random_profile(200, ["A", "B", "C", "D", "E", "F", "G"])
+    voting_rule = build_voting_rule(7, "stv", engine="native")
+    exact = sigma_IIA_all_subset(profile, voting_rule, 2, cache=ElectionCache())
+
+    estimate = sigma_IIA_all_subset_sampled(profile, voting_rule, 2, n_samples=40, seed=1)
+    assert estimate.n_samples == 40
+    assert estimate.lower <= exact <= estimate.upper
+
+    # Once every subset is sampled the estimate is the exact score.
+    exhaustive = sigma_IIA_all_subset_sampled(
+        profile, voting_rule, 2, n_samples=None, time_budget=60
+    )
+    assert exhaustive.n_samples == 2**7 - 2 - 7
+    assert exhaustive.value == pytest.approx(exact)
+    assert exhaustive.lower == exhaustive.upper == exhaustive.value
+
+    with pytest.raises(ValueError):
+        sigma_IIA_all_subset_sampled(profile, voting_rule, 2, n_samples=None)
+
+
+def test_IIA_by_depth_levels_make_up_the_all_subset_score():
+    np.random.seed(8)
+    profile = make_random_profile(200, ["A", "B", "C", "D", "E", "F"])
+    n_cands = 6
+
+    for voting_rule in [
+        build_voting_rule(n_cands, "stv", engine="native"),
+        build_voting_rule(n_cands, "plurality"),
+    ]:
+        depths = sigma_IIA_by_depth(profile, voting_rule, 2, cache=ElectionCache())
+        assert len(depths) == n_cands - 2
+        assert depths[0] == pytest.approx(
+            sigma_IIA(profile, voting_rule, 2, cache=ElectionCache())
+        )
+        assert sigma_IIA_by_depth(
+            profile, voting_rule, 2, max_removed=2, cache=ElectionCache()
+        ) == depths[:2]
+
+        # Each level weighs comb(n_cands, i) / 2**n_cands in the all-subset score.
+        def truncated_score(max_removed):
+            return 1 - sum(
+                comb(n_cands, i) * (1 - depth) / 2**n_cands
+                for i, depth in enumerate(depths[:max_removed], start=1)
+            )
+
+        for max_removed in [1, 3, None]:
+            assert sigma_IIA_all_subset(
+                profile, voting_rule, 2, cache=ElectionCache(), max_removed=max_removed
+            ) == pytest.approx(truncated_score(max_removed))
+
+
+def test_IIA_winner_set_prunes_removals_that_cannot_change_the_winners():
+    np.random.seed(9)
+    cand_list = ["A", "B", "C", "D", "E"]
+    random_ballots = make_random_profile(100, cand_list).ballots
+    # A and B lead by far more than any removal can transfer to the others.
+    profile = PreferenceProfile(
+        ballots=random_ballots
+        + (
+            Ballot(ranking=tuple(map(frozenset, [{"A"}, {"B"}, {"C"}])), weight=500),
+            Ballot(ranking=tuple(map(frozenset, [{"B"}, {"A"}, {"D"}])), weight=400),
+        ),
+        candidates=tuple(cand_list),
+    )
+
+    for rule_name in ["borda", "2-approval", "plurality"]:
+        for engine in ["votekit", "native"]:
+            voting_rule = build_voting_rule(5, rule_name, engine=engine)
+
+            def unpruned_rule(profile, m):
+                return voting_rule(profile, m=m)
+
+            for n_seats in [1, 2]:
+                cache = ElectionCache()
+                assert sigma_IIA_winner_set(
+                    profile, voting_rule, n_seats, cache=cache
+                ) == sigma_IIA_winner_set(
+                    profile, unpruned_rule, n_seats, cache=ElectionCache()
+                )
+                assert cache.pruned > 0
+
+
+def test_seat_sweep_matches_each_seat_count_and_reuses_positional_elections():
+    np.random.seed(10)
+    profile = make_random_profile(200, ["A", "B", "C", "D", "E", "F"])
+    metrics = ["sigma_UM", "sigma_IIA", "sigma_UM_winner_set", "sigma_IIA_winner_set"]
+    seat_counts = [1, 2, 3, 4]
+
+    for rule_name in ["borda", "2-approval", "plurality", "stv"]:
+        for engine in ["votekit", "native"]:
+            voting_rule = build_voting_rule(6, rule_name, engine=engine)
+            cache = ElectionCache()
+            sweep = compute_all_metrics_for_seats(
+                profile, voting_rule, seat_counts, metrics=metrics, cache=cache
+            )
+
+            assert list(sweep) == seat_counts
+            for n_seats in seat_counts:
+                assert sweep[n_seats] == compute_all_metrics(
+                    profile, voting_rule, n_seats, metrics=metrics
+                )
+            # Every positional election was read off the scores computed for the sweep.
+            if rule_name != "stv":
+                assert cache.misses == 0
+
+
+def test_rule_family_matches_each_rule():
+    np.random.seed(11)
+    profile = make_random_profile(200, ["A", "B", "C", "D", "E", "F"])
+    voting_rules = [
+        build_voting_rule(6, "borda"),
+        build_voting_rule(6, "3-approval", engine="native"),
+        build_voting_rule(6, "stv", engine="native"),
+        positional_voting_rule([4, 3, 2, 1], name="truncated_borda"),
+        positional_voting_rule([60, 30, 20, 15, 12, 10], tiebreak="borda", name="dowdall"),
+    ]
+    family = compute_all_metrics_for_rules(profile, voting_rules, [1, 2])
+
+    for voting_rule, scores in zip(voting_rules, family):
+        for n_seats in [1, 2]:
+            assert scores[n_seats] == compute_all_metrics(profile, voting_rule, n_seats)
+
+    # The positional rules run no elections of their own.
+    cache = ElectionCache()
+    positional_rules = [rule for rule in voting_rules if rule.is_positional]
+    compute_all_metrics_for_rules(profile, positional_rules, [1, 2], cache=cache)
+    assert cache.misses == 0
+
+
+def test_batch_metrics_match_each_profile():
+    np.random.seed(12)
+    cand_list = ["A", "B", "C", "D", "E"]
+    profiles = [make_random_profile(60, cand_list) for _ in range(6)]
+    # A profile leaving a candidate without votes is scored on its own.
+    profiles.append(
+        PreferenceProfile(
+            ballots=make_random_profile(60, cand_list[:4]).ballots,
+            candidates=tuple(cand_list),
+        )
+    )
+    voting_rules = [
+        build_voting_rule(5, "borda"),
+        build_voting_rule(5, "plurality", engine="native"),
+        build_voting_rule(5, "stv", engine="native"),
+    ]
+    metrics = ["n_voters", "sigma_UM", "sigma_IIA", "sigma_UM_winner_set", "sigma_IIA_winner_set"]
+    results = compute_all_metrics_batch(
+        CompactProfileBatch.from_profiles(profiles), voting_rules, [1, 2, 3], metrics
+    )
+
+    for profile, profile_results in zip(profiles, results):
+        for voting_rule, rule_results in zip(voting_rules, profile_results):
+            for n_seats in [1, 2, 3]:
+                assert rule_results[n_seats] == compute_all_metrics(
+                    profile, voting_rule, n_seats, metrics=metrics
+                )
+
+
+def test_bootstrap_intervals_match_rerunning_each_replicate():
+    np.random.seed(13)
+    profile = make_random_profile(150, ["A", "B", "C", "D", "E"])
+    compact = CompactProfile.from_profile(profile, deduplicate=True)
+    metrics = ["sigma_UM", "sigma_IIA", "sigma_UM_winner_set", "sigma_IIA_winner_set"]
+
+    for voting_rule in [
+        build_voting_rule(5, "borda"),
+        build_voting_rule(5, "stv", engine="native"),
+    ]:
+        intervals = bootstrap_metrics(
+            profile, voting_rule, 2, metrics=metrics, n_replicates=30, seed=0
+        )
+
+        replicate_weights = np.random.default_rng(0).multinomial(
+            int(compact.total_weight), compact.weights / compact.total_weight, size=30
+        )
+        replicates = [
+            compute_all_metrics(
+                CompactProfile(
+                    compact.candidates, compact.ranks, weights, compact.max_ranking_length
+                ).deduplicate(),
+                voting_rule,
+                2,
+                metrics=metrics,
+            )
+            for weights in replicate_weights.astype(float)
+        ]
+        for name in metrics:
+            values = [scores[name] for scores in replicates]
+            assert intervals[name].value == compute_all_metrics(
+                profile, voting_rule, 2, metrics=[name]
+            )[name]
+            assert intervals[name].lower == pytest.approx(np.quantile(values, 0.025))
+            assert intervals[name].upper == pytest.approx(np.quantile(values, 0.975))
+            assert intervals[name].n_samples == 30
+
+
+def test_subsampled_scores_bound_the_exact_score():
+    profile = PreferenceProfile(
+        ballots=tuple(
+            Ballot(ranking=ballot.ranking, weight=ballot.weight * 20000)
+            for ballot in profile_5_cand_ub.ballots
+        )
+    )
+
+    for voting_rule in [build_voting_rule(5, "borda"), build_voting_rule(5, "stv")]:
+        for subsampled, metric in [
+            (sigma_UM_subsampled, sigma_UM),
+            (sigma_IIA_subsampled, sigma_IIA),
+        ]:
+            exact = metric(profile, voting_rule, 2, cache=ElectionCache())
+            estimate = subsampled(
+                profile, voting_rule, 2, tolerance=0.05, seed=0, cache=ElectionCache()
+            )
+            assert estimate.n_samples < profile.total_ballot_wt
+            assert estimate.lower <= exact <= estimate.upper
+            assert estimate.lower <= estimate.value <= estimate.upper
+            assert max(
+                estimate.value - estimate.lower, estimate.upper - estimate.value
+            ) <= 0.05
+
+    # A bound no sample can meet falls back to scoring the whole profile.
+    voting_rule = build_voting_rule(5, "stv")
+    exact = sigma_UM(profile, voting_rule, 2, cache=ElectionCache())
+    estimate = sigma_UM_subsampled(
+        profile, voting_rule, 2, tolerance=0, seed=0, cache=ElectionCache()
+    )
+    assert estimate.n_samples == profile.total_ballot_wt
+    assert estimate.lower == estimate.value == estimate.upper == exact
+
+    tied = PreferenceProfile(
+        ballots=(Ballot(ranking=tuple(map(frozenset, [{"A", "B"}, {"C"}]))),)
+    )
+    with pytest.raises(ValueError):
+        sigma_IIA_subsampled(tied, build_voting_rule(3, "borda"), 1)
@@ -0,0 +1,120 @@
+from votekit import PreferenceProfile, Ballot
+from voting_rules import build_voting_rule
+from fairness_metric import compute_all_metrics, pairwise_preference_matrix
+from compact_profile import CompactProfile
+from streaming_profile import IncrementalScorer, StreamedProfile, read_csv_chunks
+import numpy as np
+import pytest
+
+
+def write_seeded_profile(path, n_ballots: int, seed: int) -> PreferenceProfile:
+    rng = np.random.default_rng(seed)
+    cand_list = ["Ann", "Bo", "Cy", "Di", "Ed"]
+    ballot_list = []
+    for _ in range(n_ballots):
+        ranking = rng.choice(
+            cand_list, size=rng.integers(1, len(cand_list) + 1), replace=False
+        )
+        ballot_list.append(
+            Ballot(
+                ranking=tuple(frozenset({str(c)}) for c in ranking),
+                weight=int(rng.integers(1, 1000)),
+            )
+        )
+    PreferenceProfile(ballots=tuple(ballot_list), candidates=tuple(cand_list)).to_csv(
+        str(path)
+    )
+    return PreferenceProfile.from_csv(str(path))
+
+
+def test_chunks_hold_the_ballots_of_the_csv(tmp_path):
+    path = tmp_path / "profile.csv"
+    profile = write_seeded_profile(path, 60, seed=0)
+    chunks = list(read_csv_chunks(str(path), chunk_size=25))
+    expected = CompactProfile.from_profile(profile)
+
+    assert [chunk.n_ballots for chunk in chunks] == [25, 25, 10]
+    assert np.array_equal(np.concatenate([c.ranks for c in chunks]), expected.ranks)
+    assert np.array_equal(np.concatenate([c.weights for c in chunks]), expected.weights)
+
+
+def test_streamed_metrics_match_the_loaded_profile(tmp_path):
+    path = tmp_path / "profile.csv"
+    profile = write_seeded_profile(path, 200, seed=1)
+    streamed = StreamedProfile.from_csv(str(path), chunk_size=30)
+    counts_only = StreamedProfile.from_csv(str(path), chunk_size=30, keep_ballots=False)
+
+    assert streamed.total_weight == profile.total_ballot_wt
+    assert np.allclose(streamed.pairwise, pairwise_preference_matrix(profile))
+    assert streamed.ballots.total_weight == profile.total_ballot_wt
+
+    metrics = (
+        "n_voters",
+        "sigma_UM",
+        "sigma_IIA",
+        "sigma_UM_winner_set",
+        "sigma_IIA_winner_set",
+    )
+    for rule_name in ["borda", "plurality", "stv"]:
+        voting_rule = build_voting_rule(5, rule_name)
+        for n_seats in [1, 2]:
+            expected = compute_all_metrics(profile, voting_rule, n_seats, metrics=metrics)
+            scores = streamed.compute_metrics(voting_rule, n_seats, metrics=metrics)
+            assert scores == pytest.approx(expected, abs=1e-12)
+            if rule_name != "stv":
+                assert counts_only.compute_metrics(
+                    voting_rule, n_seats, metrics=metrics
+                ) == pytest.approx(expected, abs=1e-12)
+
+    with pytest.raises(ValueError):
+        counts_only.compute_metrics(build_voting_rule(5, "stv"), 1)
+
+
+def test_incremental_scorer_tracks_added_and_removed_ballots(tmp_path):
+    profile = write_seeded_profile(tmp_path / "profile.csv", 150, seed=2)
+    ballots = profile.ballots
+    first, second, late = ballots[:60], ballots[60:120], ballots[120:]
+    scorer = IncrementalScorer.from_profile(
+        PreferenceProfile(ballots=first, candidates=profile.candidates)
+    )
+
+    metrics = ("n_voters", "sigma_UM", "sigma_IIA", "sigma_IIA_winner_set")
+    updates = [
+        (scorer.add_ballots, second, first + second),
+        (scorer.add_ballots, late, first + second + late),
+        (scorer.remove_ballots, first, second + late),
+    ]
+    for update, delta, current in updates:
+        update(PreferenceProfile(ballots=delta, candidates=profile.candidates))
+        expected_profile = PreferenceProfile(ballots=current, candidates=profile.candidates)
+        for rule_name in ["borda", "stv"]:
+            voting_rule = build_voting_rule(5, rule_name)
+            expected = compute_all_metrics(expected_profile, voting_rule, 2, metrics=metrics)
+            assert scorer.compute_metrics(voting_rule, 2, metrics=metrics) == pytest.approx(
+                expected, abs=1e-12
+            )
+
+    with pytest.raises(ValueError):
+        scorer.remove_ballots(PreferenceProfile(ballots=first, candidates=profile.candidates))
+
+
+def test_streamed_profile_counts_empty_ballots(tmp_path):
+    path = tmp_path / "profile.csv"
+    write_seeded_profile(path, 20, seed=3)
+    with open(path, "a") as file:
+        # Ballots that rank no candidate leave every ranking cell empty.
+        file.write("&,,,,,,&,18/1,&\n&,,,,,,&,2/1,&\n")
+    profile = PreferenceProfile.from_csv(str(path))
+    compact = CompactProfile.from_profile(profile)
+
+    chunks = list(read_csv_chunks(str(path), chunk_size=1))
+    assert np.array_equal(np.concatenate([c.ranks for c in chunks]), compact.ranks)
+
+    streamed = StreamedProfile.from_csv(str(path), chunk_size=1)
+    assert streamed.total_weight == profile.total_ballot_wt
+    assert np.allclose(streamed.pairwise, pairwise_preference_matrix(profile))
+    for rule_name in ["borda", "plurality"]:
+        voting_rule = build_voting_rule(5, rule_name, engine="native")
+        assert streamed.compute_metrics(voting_rule, 2) == pytest.approx(
+            compute_all_metrics(compact, voting_rule, 2), abs=1e-12
+        )
@@ -1,53 +1,178 @@
-from typing import Callable, Literal, TypeAlias
+from dataclasses import dataclass
+from typing import Callable, Literal, Optional, Sequence, TypeAlias, Union
+from votekit import PreferenceProfile
 from votekit.elections import Borda, STV, Plurality, Election
+from array_elections import ArrayElection, Tiebreak, positional_election, stv_election
+from compact_profile import CompactProfile
 
-ElectionConstructor: TypeAlias = Callable[..., Election]
+ElectionConstructor: TypeAlias = Callable[..., Union[Election, ArrayElection]]
 AllowedRule = Literal["borda", "3-approval", "2-approval", "plurality", "stv"]
+Engine = Literal["votekit", "native"]
+
+
+@dataclass(frozen=True)
+class NativeVotingRule:
+    """
+    A voting rule run by the array engines in ``array_elections`` instead of votekit. Calling it
+    mirrors the votekit factories: ``rule(profile, m=n_seats)`` returns an election exposing
+    ``get_ranking()`` and ``get_elected()``. It accepts a ``CompactProfile`` directly, so the
+    metrics can skip building a ``PreferenceProfile`` for every election.
+
+    Attributes:
+        name (str): Name of the rule. "stv" runs STV, any other name a positional rule.
+        score_vector (Optional[tuple[float, ...]]): Score vector of a positional rule. None is
+            the conventional Borda vector of the profile's maximum ranking length. Unused by
+            STV.
+        tiebreak (Tiebreak): Tiebreak used when a tie straddles the last seat. Unused by STV,
+            which breaks elimination ties by initial first-place votes as votekit does.
+    """
+
+    name: str
+    score_vector: Optional[tuple[float, ...]]
+    tiebreak: Tiebreak
+
+    @property
+    def is_positional(self) -> bool:
+        """
+        Whether the rule ranks candidates by a positional score vector.
+        """
+        return self.name != "stv"
+
+    @property
+    def approval_depth(self) -> Optional[int]:
+        """
+        The number of approved positions if the score vector is a k-approval vector
+        (plurality is 1), otherwise None.
+        """
+        if self.score_vector is None:
+            return None
+        k = next(
+            (i for i, points in enumerate(self.score_vector) if points != 1),
+            len(self.score_vector),
+        )
+        if k == 0 or any(points != 0 for points in self.score_vector[k:]):
+            return None
+        return k
+
+    def __call__(
+        self, profile: Union[PreferenceProfile, CompactProfile], m: int = 1
+    ) -> ArrayElection:
+        if not isinstance(profile, CompactProfile):
+            profile = CompactProfile.from_profile(profile)
+        if self.name == "stv":
+            return stv_election(profile, m)
+        return positional_election(profile, m, self.score_vector, self.tiebreak)
+
+
+def _votekit_factory(
+    election_type: type[Election],
+    positional_score_vector: Union[None, tuple[float, ...], Literal["borda"]] = None,
+    **rule_kwargs,
+) -> ElectionConstructor:
+    """
+    Wraps a votekit election class so that it can also be run on a ``CompactProfile``, which is
+    decoded back into a ``PreferenceProfile`` first. Positional rules are tagged with the same
+    ``is_positional``, ``score_vector`` and ``tiebreak`` attributes as a ``NativeVotingRule``,
+    with "borda" standing for the conventional Borda vector, and every rule records its
+    votekit class as ``election_type``.
+    """
+
+    def factory(
+        profile: Union[PreferenceProfile, CompactProfile], *args, **kwargs
+    ) -> Election:
+        if isinstance(profile, CompactProfile):
+            profile = profile.to_profile()
+        return election_type(profile, *args, **rule_kwargs, **kwargs)
+
+    factory.is_positional = positional_score_vector is not None
+    factory.score_vector = (
+        None if positional_score_vector == "borda" else positional_score_vector
+    )
+    factory.tiebreak = rule_kwargs.get("tiebreak")
+    factory.election_type = election_type
+    return factory
 
 
 def build_voting_rule(
-    n_cands: int, voting_rule_name: AllowedRule
+    n_cands: int, voting_rule_name: AllowedRule, engine: Engine = "votekit"
 ) -> ElectionConstructor:
-    if voting_rule_name == "borda":
+    """
+    Builds the election constructor for a named voting rule.
+
+    Args:
+        n_cands (int): Number of candidates in the profiles the rule will be run on.
+        voting_rule_name (AllowedRule): Name of the voting rule.
+        engine (Engine, optional): "votekit" runs the votekit election classes, "native" runs
+            the array engines on compact profiles. Both produce the same rankings for integer
+            weights. With fractional weights or score vectors, the native engine treats scores
+            equal up to rounding as tied where votekit may not. Defaults to "votekit".
+
+    Returns:
+        ElectionConstructor: Callable taking a profile and ``m`` and returning an election.
+    """
+    if engine not in ("votekit", "native"):
+        raise ValueError(f"Engine {engine!r} not recognized.")
 
-        def factory(*args, **kwargs) -> Election:
-            return Borda(*args, tiebreak="first_place", **kwargs)
-
-        return factory
+    if voting_rule_name == "borda":
+        if engine == "native":
+            return NativeVotingRule("borda", None, "first_place")
+        return _votekit_factory(Borda, "borda", tiebreak="first_place")
 
     elif voting_rule_name == "3-approval":
         if n_cands < 3:
             raise ValueError("3-approval requires at least 3 candidates.")
         sv = [1] * 3 + [0] * (n_cands - 3)
-
-        def factory(*args, **kwargs) -> Election:
-            return Borda(*args, tiebreak="first_place", score_vector=sv, **kwargs)
-
-        return factory
+        if engine == "native":
+            return NativeVotingRule("3-approval", tuple(sv), "first_place")
+        return _votekit_factory(
+            Borda, tuple(sv), tiebreak="first_place", score_vector=sv
+        )
 
     elif voting_rule_name == "2-approval":
         if n_cands < 2:
             raise ValueError("2-approval requires at least 2 candidates.")
         sv = [1] * 2 + [0] * (n_cands - 2)
-
-        def factory(*args, **kwargs) -> Election:
-            return Borda(*args, tiebreak="first_place", score_vector=sv, **kwargs)
-
-        return factory
+        if engine == "native":
+            return NativeVotingRule("2-approval", tuple(sv), "first_place")
+        return _votekit_factory(
+            Borda, tuple(sv), tiebreak="first_place", score_vector=sv
+        )
 
     elif voting_rule_name == "plurality":
-
-        def factory(*args, **kwargs) -> Election:
-            return Plurality(*args, tiebreak="borda", **kwargs)
-
-        return factory
+        if engine == "native":
+            return NativeVotingRule("plurality", (1,), "borda")
+        return _votekit_factory(Plurality, (1,), tiebreak="borda")
 
     elif voting_rule_name == "stv":
-
-        def factory(*args, **kwargs) -> Election:
-            return STV(*args, tiebreak="borda", **kwargs)
-
-        return factory
+        if engine == "native":
+            return NativeVotingRule("stv", None, "borda")
+        return _votekit_factory(STV, tiebreak="borda")
 
     else:
         raise ValueError(f"Voting rule {voting_rule_name!r} not recognized.")
+
+
+def positional_voting_rule(
+    score_vector: Optional[Sequence[float]],
+    tiebreak: Tiebreak = "first_place",
+    name: str = "positional",
+) -> NativeVotingRule:
+    """
+    Builds a native positional rule from any non-standard score vector, such as a truncated
+    Borda or Dowdall vector, so that it can be scored alongside the named rules.
+
+    Args:
+        score_vector (Optional[Sequence[float]]): Points awarded to each position, padded with
+            zeros. None is the conventional Borda vector.
+        tiebreak (Tiebreak, optional): Tiebreak used when a tie straddles the last seat.
+            Defaults to "first_place".
+        name (str, optional): Name of the rule. Must not be "stv". Defaults to "positional".
+
+    Returns:
+        NativeVotingRule: The voting rule.
+    """
+    if name == "stv":
+        raise ValueError("A positional rule cannot be named 'stv'.")
+    return NativeVotingRule(
+        name, None if score_vector is None else tuple(score_vector), tiebreak
+    )